@@ -0,0 +1,295 @@
+# acronyms.py
+"""
+SILVINA Editorial Assistant - Acronym Index
+Finds where every acronym is defined ("Estado Mayor Conjunto (EMCO)")
+and first used, across body and footnotes in reading order, and reports
+acronyms used before their definition, never defined or defined twice
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from heapq import merge
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import re
+import unicodedata
+
+
+# Areas of the manuscript an occurrence belongs to (same names as typography)
+BODY, NOTE = "cuerpo", "nota"
+
+# Spanish plural abbreviations with doubled letters, spaced or not (EE. UU., FF.AA.),
+# or two or more capitals with optional trailing digits (COVID19) and plural s (ONGs);
+# the lookahead rejects most positions before either branch is tried
+ACRONYM = re.compile(r'\b(?=[A-ZÁÉÍÓÚÜÑ]{2})'
+                     r'(?:(?P<doubled>(?:(?P<x>[A-ZÁÉÍÓÚÜÑ])(?P=x)\.[ \u00a0]?)+(?P<y>[A-ZÁÉÍÓÚÜÑ])(?P=y)\.)'
+                     r'|(?P<plain>[A-ZÁÉÍÓÚÜÑ]{2,}\d*)s?\b)')
+ROMAN = re.compile(r'[IVXLCDM]+$')
+LOWERCASE = re.compile(r'[a-záéíóúüñ]')
+DOUBLED = re.compile(r'(\w)\1')  # FFAA: Fuerzas Armadas, EE.UU.
+SPACING = re.compile(r'\.[ \u00a0]?(?=\w)')
+
+# Abbreviations read without a definition (RAE: "EE. UU." is an abbreviation, not a sigla)
+WELL_KNOWN = frozenset({"EE. UU."})
+
+# "... (EMCO)", "... (en adelante, EMCO)", "... (NATO, por sus siglas en inglés)"
+OPENS_DEFINITION = re.compile(r'\((?:en adelante,?\s*|en lo sucesivo,?\s*)?$', re.I)
+CLOSES_DEFINITION = re.compile(r'(?:[,;][^()]{0,60})?\)')
+# "OTAN (Organización del Tratado del Atlántico Norte)"
+EXPANSION_AFTER = re.compile(r'\s*\(([^()]{3,200})\)')
+
+CONTEXT = 300  # characters looked at before the parenthesis for the long form
+
+RULES = {
+    "sigla.uso_antes_de_definir": "Sigla usada antes de su definición",
+    "sigla.sin_definir": "Sigla nunca definida: desarróllela en su primer uso",
+    "sigla.definida_dos_veces": "Sigla definida más de una vez",
+}
+
+
+@dataclass
+class Occurrence:
+    """Where an acronym appears; offsets are characters of the paragraph (or note) text."""
+
+    area: str
+    paragraph: int
+    start: int
+    end: int
+
+
+@dataclass
+class AcronymEntry:
+    acronym: str
+    long_form: str = ""
+    definitions: List[Occurrence] = field(default_factory=list)
+    first_use: Optional[Occurrence] = None
+    uses: int = 0
+    used_before_definition: bool = False
+
+
+@dataclass
+class AcronymProblem:
+    acronym: str
+    rule: str
+    occurrence: Occurrence
+    definition: Optional[Occurrence] = None  # first definition, when there is one
+
+    @property
+    def message(self) -> str:
+        return RULES[self.rule]
+
+
+def acronym_key(token: str) -> str:
+    """One spelling per acronym: "EE.UU." and "EE.\u00a0UU." index as "EE. UU."."""
+    return SPACING.sub('. ', token)
+
+
+def _fold(text: str) -> str:
+    """Lowercase without accents, same length as `text`."""
+    return "".join(unicodedata.normalize("NFD", ch)[0] for ch in text.lower())
+
+
+def long_form(acronym: str, text: str) -> Optional[str]:
+    """
+    Shortest tail of `text` that the acronym abbreviates (Schwartz & Hearst).
+
+    Letters are matched right to left, each somewhere in the text and the
+    first one at the start of a word. Spanish doubled plurals (FFAA, EE.UU.)
+    are tried with one letter per word too.
+    """
+    words = text.split()
+    limit = min(len(acronym) + 5, 2 * len(acronym))
+    text = " ".join(words[-limit:])
+    folded = _fold(text)
+    letters = "".join(ch for ch in _fold(acronym) if ch.isalpha())  # COVID19: COVID
+    for letters in dict.fromkeys((letters, DOUBLED.sub(r'\1', letters))):
+        j = len(folded) - 1
+        for i in range(len(letters) - 1, -1, -1):
+            c = letters[i]
+            while j >= 0 and (folded[j] != c or (i == 0 and j > 0 and folded[j - 1].isalnum())):
+                j -= 1
+            if j < 0:
+                break
+            j -= 1
+        else:
+            return text[j + 1:]
+    return None
+
+
+# ============================================================
+# INDEXER
+# ============================================================
+
+class AcronymIndexer:
+    """
+    Index acronyms over paragraphs given in reading order.
+
+    One pass: every capitalized token is looked up in a dict keyed by the
+    acronym; the context checked for a definition is bounded, so the work
+    is linear in the length of the text.
+    """
+
+    def __init__(self, ignore: Iterable[str] = WELL_KNOWN):
+        self.ignore = {acronym_key(token) for token in ignore}
+
+    def index(self, paragraphs: Iterable[Tuple[str, int, str]]) -> Dict[str, AcronymEntry]:
+        """
+        Args:
+            paragraphs: (area, paragraph index, text) in reading order
+
+        Returns:
+            acronym -> entry, in order of first appearance
+        """
+        entries: Dict[str, AcronymEntry] = {}
+        for area, index, text in paragraphs:
+            if not LOWERCASE.search(text):
+                continue  # headings in capitals
+            for match in ACRONYM.finditer(text):
+                group = "doubled" if match.group("doubled") else "plain"
+                acronym = acronym_key(match.group(group))
+                if acronym in self.ignore or ROMAN.match(acronym):
+                    continue
+                entry = entries.get(acronym)
+                if entry is None:
+                    entry = entries[acronym] = AcronymEntry(acronym)
+                occurrence = Occurrence(area, index, match.start(group), match.end(group))
+                expansion = self._definition(acronym, text, match)
+                if expansion:
+                    entry.definitions.append(occurrence)
+                    entry.long_form = entry.long_form or expansion
+                else:
+                    entry.uses += 1
+                    if entry.first_use is None:
+                        entry.first_use = occurrence
+                        entry.used_before_definition = not entry.definitions
+        return entries
+
+    @staticmethod
+    def _definition(acronym: str, text: str, match) -> Optional[str]:
+        """Long form when this occurrence defines the acronym, either way round."""
+        start, end = match.span()
+        opening = OPENS_DEFINITION.search(text, max(0, start - 20), start)
+        if opening and CLOSES_DEFINITION.match(text, end):
+            return long_form(acronym, text[max(0, opening.start() - CONTEXT):opening.start()])
+        after = EXPANSION_AFTER.match(text, end)
+        if after:
+            expansion = long_form(acronym, after.group(1))
+            words = after.group(1).split()
+            # The whole parenthesis must be the expansion, not a trailing part of it
+            if expansion and len(expansion.split()) >= len(words) - 1:
+                return expansion
+        return None
+
+
+def find_problems(entries: Dict[str, AcronymEntry]) -> List[AcronymProblem]:
+    """Problems of an index, in reading order (a note right after its paragraph)."""
+    problems = []
+    for entry in entries.values():
+        first = entry.definitions[0] if entry.definitions else None
+        if entry.first_use and first is None:
+            problems.append(AcronymProblem(entry.acronym, "sigla.sin_definir", entry.first_use))
+        elif entry.used_before_definition:
+            problems.append(AcronymProblem(entry.acronym, "sigla.uso_antes_de_definir", entry.first_use, first))
+        for again in entry.definitions[1:]:
+            problems.append(AcronymProblem(entry.acronym, "sigla.definida_dos_veces", again, first))
+    problems.sort(key=lambda p: (p.occurrence.paragraph, p.occurrence.area != BODY, p.occurrence.start))
+    return problems
+
+
+def index_document(body: Sequence[Tuple[int, str]], notes: Sequence[Tuple[int, str]] = (),
+                   ignore: Iterable[str] = WELL_KNOWN) -> Tuple[Dict[str, AcronymEntry], List[AcronymProblem]]:
+    """
+    Index (paragraph index, text) lists of body and notes.
+
+    A note is read right after the paragraph holding its mark.
+    """
+    reading = merge(((i, 0, BODY, text) for i, text in body),
+                    ((i, 1, NOTE, text) for i, text in sorted(notes, key=lambda note: note[0])))
+    entries = AcronymIndexer(ignore).index((area, i, text) for i, _, area, text in reading)
+    return entries, find_problems(entries)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+SAMPLE_ACRONYMS = [
+    ("Estado Mayor Conjunto de las Fuerzas Armadas", "EMCFFAA"),
+    ("Universidad de la Defensa Nacional", "UNDEF"),
+    ("Organización del Tratado del Atlántico Norte", "OTAN"),
+    ("Facultad Militar Conjunta", "FMC"),
+    ("Organización de las Naciones Unidas", "ONU"),
+    ("Ministerio de Defensa", "MINDEF"),
+    ("Zona de Paz y Cooperación del Atlántico Sur", "ZPCAS"),
+    ("Consejo de Defensa Suramericano", "CDS"),
+    ("Fuerzas Armadas", "FF. AA."),
+]
+
+
+def run_benchmark(n_chars: int = 1_000_000, n_acronyms: int = 400, seed: int = 7):
+    """A long thesis: a million characters, hundreds of acronyms, footnotes."""
+    import random
+    import time
+
+    rng = random.Random(seed)
+    acronyms = list(SAMPLE_ACRONYMS)
+    while len(acronyms) < n_acronyms:
+        words = [rng.choice(["Comando", "Centro", "Escuela", "Dirección", "Agencia", "Servicio"]), "de",
+                 rng.choice(["Logística", "Inteligencia", "Operaciones", "Sanidad"]),
+                 rng.choice(["Naval", "Aérea", "Terrestre", "Conjunta", "Regional"])]
+        acronym = "".join(word[0] for word in words if word[0].isupper()) + str(len(acronyms))
+        acronyms.append((" ".join(words), acronym))
+    # What happens to each acronym: defined at first use, never, after a use, or twice
+    fates = {acronym: rng.choices(["bien", "sin_definir", "antes", "dos_veces"], [90, 4, 3, 3])[0]
+             for _, acronym in acronyms}
+    base = "La interoperabilidad exige doctrina común y planeamiento por capacidades en el Atlántico Sur. "
+    well_known = "La cooperación con EE. UU. se mantiene. "  # never defined, never reported
+
+    body, notes, size = [], [], 0
+    seen, defined = set(), set()
+    while size < n_chars:
+        name, acronym = rng.choice(acronyms)
+        fate = fates[acronym]
+        defines = (fate in ("bien", "dos_veces") and acronym not in defined
+                   or fate == "antes" and acronym in seen and acronym not in defined
+                   or fate == "dos_veces" and acronym in defined and rng.random() < 0.2)
+        if defines:
+            text = f"La {name} ({acronym}) coordina el esfuerzo. "
+            defined.add(acronym)
+        else:
+            written = acronym.replace(". ", ".") if rng.random() < 0.5 else acronym  # FF.AA. is FF. AA.
+            text = f"Según la {written}, el despliegue continúa. "
+        seen.add(acronym)
+        text = base * rng.randrange(1, 4) + (well_known if rng.random() < 0.1 else "") + text
+        body.append((len(body), text))
+        size += len(text)
+        if rng.random() < 0.15 and defined:
+            note = f"Véase el informe de la {rng.choice(sorted(defined))} (2021), p. 12."
+            notes.append((len(body) - 1, note))
+            size += len(note)
+    planted = {
+        "sigla.sin_definir": {a for a in seen if fates[a] == "sin_definir"},
+        "sigla.uso_antes_de_definir": {a for a in defined if fates[a] == "antes"},
+    }
+
+    start = time.perf_counter()
+    entries, problems = index_document(body, notes)
+    elapsed = time.perf_counter() - start
+
+    found = {rule: {p.acronym for p in problems if p.rule == rule} for rule in RULES}
+    print("SILVINA - Índice de Siglas (Benchmark)")
+    print("=" * 60)
+    print(f"  Texto    : {size:,} caracteres en {len(body)} párrafos y {len(notes)} notas")
+    print(f"  Tiempo   : {elapsed * 1000:.1f} ms ({size / elapsed / 1e6:.1f} M caracteres/s)")
+    print(f"  Siglas   : {len(entries)} ({sum(1 for e in entries.values() if e.definitions)} definidas, "
+          f"{sum(e.uses for e in entries.values()):,} usos)")
+    for rule, expected in planted.items():
+        print(f"    {rule:<28} {len(found[rule]):5} (sembradas {len(expected)}) "
+              f"{'✓' if found[rule] == expected else '✗'}")
+    print(f"    {'sigla.definida_dos_veces':<28} {len(found['sigla.definida_dos_veces']):5}")
+    for name, acronym in SAMPLE_ACRONYMS[:3] + SAMPLE_ACRONYMS[-1:]:
+        entry = entries.get(acronym)
+        print(f"  {acronym:<8} → {entry.long_form if entry else '-'}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
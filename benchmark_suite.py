@@ -0,0 +1,197 @@
+# benchmark_suite.py
+"""
+SILVINA Editorial Assistant - End-to-End Benchmark Suite
+Times each pipeline stage on synthetic .docx manuscripts across size
+tiers, keeps a history file and flags regressions against a baseline
+Universidad de la Defensa Nacional
+"""
+
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, List, Optional
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from citation_integrity import check_integrity
+from citations import CitationExtractor
+from docx_io import read_docx
+from manuscript_generator import ManuscriptSpec, write_manuscript
+from reference_segmenter import segment_references
+from references import Reference, detectar_duplicados, validar_orden_alfabetico
+from report_writers import JsonLinesWriter, TextWriter, reference_detail_section, render
+from section_index import SectionIndex
+
+
+HISTORY_FILE = "silvina_bench_history.jsonl"
+BASELINE_FILE = "silvina_bench_baseline.json"
+DEFAULT_TOLERANCE = 0.25   # 25% slower than baseline is a regression
+NOISE_FLOOR = 0.005        # seconds; smaller differences are ignored
+
+TIERS = {
+    "articulo": ManuscriptSpec(body_chars=40_000, n_references=40, seed=1),
+    "dossier": ManuscriptSpec(body_chars=150_000, n_references=100, seed=2),
+    "tesis": ManuscriptSpec(body_chars=600_000, n_references=200, footnote_ratio=0.2, seed=3),
+}
+
+
+# ============================================================
+# STAGES
+# ============================================================
+
+def _timed(func: Callable, repeats: int):
+    """(median seconds, last result) over `repeats` runs."""
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return median(times), result
+
+
+def run_tier(path: str, repeats: int = 3) -> Dict[str, float]:
+    """Median seconds per stage for one generated manuscript."""
+    results: Dict[str, float] = {}
+
+    results["leer_docx"], content = _timed(lambda: read_docx(path), repeats)
+    results["indice_secciones"], index = _timed(
+        lambda: SectionIndex(content.paragraphs, content.footnote_chars), repeats)
+
+    start, end, _ = index.reference_section()
+    results["segmentar_referencias"], entries = _timed(
+        lambda: segment_references(content.paragraphs[start:end]), repeats)
+
+    body = [para.text for para in content.paragraphs[:start - 1]]
+    results["citas"], citations = _timed(lambda: CitationExtractor().extract_document(body), repeats)
+    results["integridad"], _ = _timed(lambda: check_integrity(citations, entries), repeats)
+
+    references = [Reference(entry.text) for entry in entries]
+    results["validacion_referencias"], _ = _timed(
+        lambda: [ref.get_validation_report() for ref in references], repeats)
+    results["orden_alfabetico"], _ = _timed(lambda: validar_orden_alfabetico(references), repeats)
+    results["duplicados"], _ = _timed(lambda: detectar_duplicados(references), repeats)
+
+    def report():
+        for writer in (TextWriter(io.StringIO()), JsonLinesWriter(io.StringIO())):
+            render({"documento": os.path.basename(path)}, [reference_detail_section(references)], writer)
+    results["reporte"], _ = _timed(report, repeats)
+    return results
+
+
+# ============================================================
+# HISTORY AND BASELINE
+# ============================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, timeout=5, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def append_history(record: dict, path: str = HISTORY_FILE):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """Stages slower than baseline by more than `tolerance` (and the noise floor)."""
+    regressions = []
+    for tier, stages in results.items():
+        for stage, seconds in stages.items():
+            before = baseline.get(tier, {}).get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + tolerance) and seconds - before > NOISE_FLOOR:
+                regressions.append({"nivel": tier, "etapa": stage, "base": before,
+                                    "actual": seconds, "factor": seconds / before})
+    return regressions
+
+
+def run_suite(tiers: List[str], repeats: int = 3, save_baseline: bool = False,
+              tolerance: float = DEFAULT_TOLERANCE, history: str = HISTORY_FILE,
+              baseline_path: str = BASELINE_FILE) -> List[dict]:
+    print("SILVINA - Suite de Benchmarks")
+    print("=" * 70)
+    results: Dict[str, Dict[str, float]] = {}
+    manuscripts = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for tier in tiers:
+            path = os.path.join(tmp, f"{tier}.docx")
+            manifest = write_manuscript(path, TIERS[tier])
+            manuscripts[tier] = {"caracteres": manifest.body_chars, "citas": manifest.citations,
+                                 "referencias": len(manifest.references)}
+            print(f"\n📄 {tier}: {manifest.body_chars:,} caracteres, {manifest.citations:,} citas, "
+                  f"{len(manifest.references)} referencias")
+            results[tier] = run_tier(path, repeats)
+            for stage, seconds in results[tier].items():
+                print(f"   {stage:<24} {seconds * 1000:10.1f} ms")
+
+    baseline = None
+    if os.path.exists(baseline_path) and not save_baseline:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)["resultados"]
+
+    record = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": repeats,
+        "manuscritos": manuscripts,
+        "resultados": results,
+    }
+    append_history(record, history)
+    print(f"\n💾 Historial: {history}")
+
+    if save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        print(f"💾 Línea base guardada: {baseline_path}")
+        return []
+
+    if baseline is None:
+        print("ℹ️ Sin línea base (usar --guardar-base para crearla)")
+        return []
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"\n🔴 Regresiones (> {tolerance:.0%} respecto de la línea base):")
+        for r in regressions:
+            print(f"   {r['nivel']}/{r['etapa']}: {r['base'] * 1000:.1f} ms → "
+                  f"{r['actual'] * 1000:.1f} ms (x{r['factor']:.2f})")
+    else:
+        print(f"\n✅ Sin regresiones respecto de la línea base")
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SILVINA - Suite de benchmarks por nivel de documento")
+    parser.add_argument("--niveles", default=",".join(TIERS),
+                        help=f"niveles separados por comas (opciones: {', '.join(TIERS)})")
+    parser.add_argument("--repeticiones", type=int, default=3, help="corridas por nivel (por defecto 3)")
+    parser.add_argument("--tolerancia", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"aumento relativo tolerado antes de marcar regresión (por defecto {DEFAULT_TOLERANCE})")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar los tiempos como nueva línea base")
+    args = parser.parse_args()
+
+    tiers = args.niveles.split(",")
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        print(f"✗ Niveles desconocidos: {', '.join(unknown)} (opciones: {', '.join(TIERS)})")
+        sys.exit(2)
+
+    found = run_suite(tiers, args.repeticiones, args.guardar_base, args.tolerancia)
+    sys.exit(1 if found else 0)
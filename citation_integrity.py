@@ -0,0 +1,243 @@
+# citation_integrity.py
+"""
+SILVINA Editorial Assistant - Citation Integrity Engine
+Hash-indexed cross-matching of in-text citations against the reference list
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import random
+import re
+import sys
+import time
+
+from reference_parser import normalize_name, parse_reference
+
+
+FUZZY_CUTOFF = 0.8
+
+ET_AL_SUFFIX = re.compile(r'\s+et\s+al\.?$', re.IGNORECASE)
+YEAR_WITH_SUFFIX = re.compile(r'^(\d{4})([a-z]?)$')
+NO_DATE = re.compile(r'^s\.\s*f\.?$', re.IGNORECASE)  # "s. f." (APA 7), "s.f.", "S.F."
+
+
+# ============================================================
+# MATCH DATA CLASSES
+# ============================================================
+
+@dataclass
+class CitationMatch:
+    """Resolution of one in-text citation against the reference list."""
+
+    citation: object
+    status: str  # 'exacta' | 'aproximada' | 'ambigua' | 'sin_referencia'
+    reference_positions: List[int] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def resolved(self) -> bool:
+        return self.status in ('exacta', 'aproximada')
+
+
+@dataclass
+class IntegrityReport:
+    """Outcome of cross-matching a whole document."""
+
+    matches: List[CitationMatch]
+    uncited_references: List[Tuple[int, Optional[int], str]]  # (position, paragraph, text)
+    total_references: int
+
+    @property
+    def unresolved(self) -> List[CitationMatch]:
+        return [m for m in self.matches if not m.resolved]
+
+    @property
+    def approximate(self) -> List[CitationMatch]:
+        return [m for m in self.matches if m.status == 'aproximada']
+
+    @property
+    def is_consistent(self) -> bool:
+        return not self.unresolved and not self.uncited_references
+
+
+# ============================================================
+# KEY NORMALIZATION
+# ============================================================
+
+def citation_key(author: str, year: str) -> Tuple[str, str, str]:
+    """(surname, year, suffix) key for 'García et al.', '2020a', 's. f.'."""
+    surname = normalize_name(ET_AL_SUFFIX.sub('', author.strip()))
+    match = YEAR_WITH_SUFFIX.match(year.strip())
+    if match:
+        return surname, match.group(1), match.group(2)
+    if NO_DATE.match(year.strip()):
+        return surname, "s.f.", ""  # as CitationIndex stores a reference without year
+    return surname, year.strip().lower(), ""
+
+
+# ============================================================
+# INTEGRITY ENGINE
+# ============================================================
+
+class CitationIndex:
+    """
+    Index of the reference list keyed by normalized (surname, year, suffix).
+
+    Lookups are dictionary hits; the fuzzy fallback only compares against
+    surnames that share the cited year, so it stays cheap on long lists.
+    """
+
+    def __init__(self, references: Iterable):
+        self.references = list(references)
+        self.parsed = [parse_reference(getattr(ref, 'text', ref)) for ref in self.references]
+        self.exact: Dict[Tuple[str, str, str], List[int]] = {}
+        self.by_year: Dict[Tuple[str, str], List[int]] = {}
+        self.surnames_by_year: Dict[str, List[str]] = {}
+        self.years_by_surname: Dict[str, List[str]] = {}
+        self._fuzzy_cache: Dict[Tuple[str, str], List[str]] = {}
+
+        for position, parsed in enumerate(self.parsed, 1):
+            if not parsed.first_author:
+                continue
+            surname = normalize_name(parsed.first_author)
+            year = parsed.year or "s.f."
+            self.exact.setdefault((surname, year, parsed.year_suffix), []).append(position)
+            self.by_year.setdefault((surname, year), []).append(position)
+            self.surnames_by_year.setdefault(year, []).append(surname)
+            self.years_by_surname.setdefault(surname, []).append(year)
+
+    def resolve(self, citation) -> CitationMatch:
+        """Resolve one Citation (anything with `.authors` and `.year`)."""
+        author = citation.authors[0] if citation.authors else ""
+        surname, year, suffix = citation_key(author, citation.year)
+        match = CitationMatch(citation, 'sin_referencia')
+
+        positions = self.exact.get((surname, year, suffix))
+        if positions:
+            match.status = 'exacta'
+            match.reference_positions = positions
+        else:
+            same_year = self.by_year.get((surname, year), [])
+            if not suffix and len(same_year) > 1:
+                match.status = 'ambigua'
+                match.reference_positions = same_year
+                match.notes.append(f"Varias referencias de {author} ({year}): "
+                                   f"usar sufijos {year}a, {year}b...")
+            elif len(same_year) == 1:
+                match.status = 'exacta'
+                match.reference_positions = same_year
+                if suffix:
+                    match.notes.append(f"Sufijo '{suffix}' no coincide con la lista de referencias")
+                else:
+                    match.notes.append("La referencia usa sufijo de año; la cita no")
+            else:
+                self._fuzzy(match, surname, year, author)
+
+        if match.resolved:
+            self._check_et_al(match, author)
+        return match
+
+    def _fuzzy(self, match: CitationMatch, surname: str, year: str, author: str):
+        """Typo-tolerant fallback among surnames with the same year."""
+        key = (surname, year)
+        if key not in self._fuzzy_cache:
+            from difflib import get_close_matches
+            self._fuzzy_cache[key] = get_close_matches(
+                surname, self.surnames_by_year.get(year, []), n=1, cutoff=FUZZY_CUTOFF)
+        candidates = self._fuzzy_cache[key]
+        if candidates:
+            match.status = 'aproximada'
+            match.reference_positions = self.by_year[(candidates[0], year)]
+            first = self.parsed[match.reference_positions[0] - 1].first_author
+            match.notes.append(f"¿Error tipográfico? La referencia dice '{first}'")
+        elif surname in self.years_by_surname:
+            years = ', '.join(sorted(set(self.years_by_surname[surname])))
+            match.notes.append(f"Año no coincide: la lista de referencias tiene {author} ({years})")
+
+    def _check_et_al(self, match: CitationMatch, author: str):
+        parsed = self.parsed[match.reference_positions[0] - 1]
+        if ET_AL_SUFFIX.search(author) and len(parsed.authors) < 3 and not parsed.et_al:
+            match.notes.append("'et al.' solo corresponde a obras con tres o más autores")
+
+    def check(self, citations: Iterable) -> IntegrityReport:
+        """
+        Resolve every citation and find references that are never cited.
+
+        The candidates of an ambiguous citation count as cited: the citation
+        is reported once (as ambiguous), not again as uncited references.
+        """
+        matches = [self.resolve(c) for c in citations]
+
+        cited = set()
+        for m in matches:
+            if m.resolved or m.status == 'ambigua':
+                cited.update(m.reference_positions)
+
+        uncited = []
+        for position, ref in enumerate(self.references, 1):
+            if position not in cited:
+                uncited.append((position, getattr(ref, 'paragraph_index', None),
+                                getattr(ref, 'text', ref)))
+
+        return IntegrityReport(matches, uncited, len(self.references))
+
+
+def check_integrity(citations: Iterable, references: Iterable) -> IntegrityReport:
+    """Cross-match citations (from CitationExtractor) against references."""
+    return CitationIndex(references).check(citations)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+@dataclass
+class _BenchCitation:
+    authors: List[str]
+    year: str
+    paragraph_index: int
+
+
+def run_benchmark(n_refs: int = 2_000, n_citations: int = 20_000):
+    rng = random.Random(3)
+    surnames = [f"Pérez{i}" for i in range(n_refs)]
+    references = [f"{s}, A. ({1990 + i % 30}). Título {i}. Editorial." for i, s in enumerate(surnames)]
+    citations = []
+    for i in range(n_citations):
+        k = rng.randrange(n_refs)
+        name = surnames[k] if rng.random() > 0.05 else surnames[k].replace("é", "e") + "x"
+        citations.append(_BenchCitation([name], str(1990 + k % 30), i // 5))
+
+    start = time.perf_counter()
+    index = CitationIndex(references)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    report = index.check(citations)
+    checked = time.perf_counter() - start
+
+    print("SILVINA - Integridad de Citas (Benchmark)")
+    print("=" * 60)
+    print(f"  Índice de {n_refs:,} referencias: {built * 1000:.1f} ms")
+    print(f"  {n_citations:,} citas resueltas en {checked * 1000:.1f} ms "
+          f"({n_citations / checked:,.0f} citas/s)")
+    print(f"  Aproximadas: {len(report.approximate):,} | Sin referencia: {len(report.unresolved):,} "
+          f"| Referencias no citadas: {len(report.uncited_references):,}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark()
+    else:
+        refs = ["García, M. (2020a). Defensa. Editorial.",
+                "García, M. (2020b). Ciberdefensa. Editorial.",
+                "López, A., Ruiz, B. y Sosa, C. (2019). Estrategia. Revista.",
+                "Núñez, P. (2018). Logística. Revista."]
+        cits = [_BenchCitation(["Garcia"], "2020a", 0), _BenchCitation(["García"], "2020", 1),
+                _BenchCitation(["López et al."], "2019", 2), _BenchCitation(["Nuñes"], "2018", 3),
+                _BenchCitation(["Pérez"], "2021", 4)]
+        result = check_integrity(cits, refs)
+        for m in result.matches:
+            print(f"  [¶{m.citation.paragraph_index}] {m.citation.authors[0]} ({m.citation.year}) "
+                  f"→ {m.status} {m.reference_positions} {'; '.join(m.notes)}")
+        print(f"  No citadas: {[pos for pos, _, _ in result.uncited_references]}")
@@ -0,0 +1,448 @@
+# citation_store.py
+"""
+SILVINA Editorial Assistant - Columnar Citation/Reference Store
+Array-backed columns, interned strings and a shared text buffer for large corpora
+Universidad de la Defensa Nacional
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import random
+import sys
+import time
+import tracemalloc
+
+from citations import Citation
+
+
+NO_VALUE = -1
+
+
+# ============================================================
+# STRING INTERNING
+# ============================================================
+
+class StringTable:
+    """Stores each distinct string once and hands out integer ids."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._values)
+            self._ids[value] = string_id
+            self._values.append(value)
+        return string_id
+
+    def lookup(self, value: str) -> int:
+        """Id of `value`, or NO_VALUE if it was never interned."""
+        return self._ids.get(value, NO_VALUE)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._values[string_id]
+
+    def __len__(self):
+        return len(self._values)
+
+    def nbytes(self) -> int:
+        return (sys.getsizeof(self._ids) + sys.getsizeof(self._values)
+                + sum(sys.getsizeof(v) for v in self._values))
+
+
+# ============================================================
+# SHARED TEXT BUFFER
+# ============================================================
+
+class TextBuffer:
+    """
+    Append-only text buffer; rows keep (offset, length) views into it.
+
+    Appends are joined into a new chunk on the next read, and a chunk is
+    merged into the previous one while that one is not larger (like the
+    carries of a binary counter). Alternating appends and reads then copy
+    each character O(log n) times, and a slice bisects O(log n) chunks.
+    """
+
+    def __init__(self):
+        self._pending: List[str] = []
+        self._chunks: List[str] = []
+        self._starts: List[int] = []
+        self._length = 0
+
+    def append(self, text: str) -> int:
+        offset = self._length
+        self._pending.append(text)
+        self._length += len(text)
+        return offset
+
+    def _flush(self):
+        chunk = ''.join(self._pending)
+        self._pending = []
+        if not chunk:
+            return
+        start = self._length - len(chunk)
+        while self._chunks and len(self._chunks[-1]) <= len(chunk):
+            chunk = self._chunks.pop() + chunk
+            start = self._starts.pop()
+        self._chunks.append(chunk)
+        self._starts.append(start)
+
+    @property
+    def text(self) -> str:
+        """The whole buffer as one string (joins the chunks once)."""
+        self._flush()
+        if len(self._chunks) > 1:
+            self._chunks, self._starts = [''.join(self._chunks)], [0]
+        return self._chunks[0] if self._chunks else ""
+
+    def slice(self, offset: int, length: int) -> str:
+        if length <= 0:
+            return ""
+        if self._pending:
+            self._flush()
+        k = bisect_right(self._starts, offset) - 1
+        chunk, start = self._chunks[k], offset - self._starts[k]
+        if start + length <= len(chunk):
+            return chunk[start:start + length]
+        return self.text[offset:offset + length]  # only when a slice spans appends
+
+    def __len__(self):
+        return self._length
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(part) for part in self._chunks + self._pending)
+
+
+def _array_bytes(*columns: array) -> int:
+    return sum(col.buffer_info()[1] * col.itemsize for col in columns)
+
+
+# ============================================================
+# CITATION STORE
+# ============================================================
+
+class CitationView:
+    """Read-only row of a CitationStore with the same fields as Citation."""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: "CitationStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def authors(self) -> List[str]:
+        store, row = self._store, self._row
+        ids = store.author_ids[store.author_start[row]:store.author_start[row + 1]]
+        return [store.strings[i] for i in ids]
+
+    @property
+    def year(self) -> str:
+        return self._store.strings[self._store.year_id[self._row]]
+
+    @property
+    def paragraph_index(self) -> int:
+        return self._store.paragraph_index[self._row]
+
+    @property
+    def citation_type(self) -> str:
+        return self._store.strings[self._store.type_id[self._row]]
+
+    @property
+    def raw_text(self) -> str:
+        return self._store.raw_text(self._row)
+
+    @property
+    def page(self) -> Optional[str]:
+        page_id = self._store.page_id[self._row]
+        return None if page_id == NO_VALUE else self._store.strings[page_id]
+
+    @property
+    def start_pos(self) -> int:
+        return self._store.start_pos[self._row]
+
+    def _fields(self):
+        return (self.authors, self.year, self.paragraph_index, self.citation_type,
+                self.raw_text, self.page, self.start_pos)
+
+    def __eq__(self, other):
+        if isinstance(other, CitationView):
+            return self._fields() == other._fields()
+        try:
+            return self._fields() == (other.authors, other.year, other.paragraph_index,
+                                      other.citation_type, other.raw_text, other.page,
+                                      other.start_pos)
+        except AttributeError:
+            return NotImplemented
+
+    def __hash__(self):
+        authors, *rest = self._fields()
+        return hash((tuple(authors), *rest))
+
+    def __repr__(self):
+        """Same readable format as Citation."""
+        authors_text = " y ".join(self.authors)
+        page_text = f", p. {self.page}" if self.page else ""
+        type_marker = "📖" if self.citation_type == "narrativa" else "📎"
+        return f"{type_marker} {authors_text} ({self.year}{page_text}) [¶{self.paragraph_index}]"
+
+
+class CitationStore:
+    """
+    Columnar container for millions of citations.
+
+    Integer fields live in `array` columns, authors/years/pages/types are
+    interned once, and raw citation texts are (offset, length) views. With
+    `source` (the scanned document text, and the paragraph start offsets
+    when it joins several paragraphs) the views point into that text and
+    nothing is copied; texts not found there go to the store's own buffer.
+    Iterating yields CitationView rows, or objects built by `factory`
+    (e.g. the Citation dataclass) when one is given.
+    """
+
+    def __init__(self, factory: Optional[Callable] = None, source: Optional[str] = None,
+                 paragraph_starts: Optional[Iterable[int]] = None):
+        self.factory = factory
+        self.strings = StringTable()
+        self.source = source
+        self.paragraph_starts = array('q', paragraph_starts or [])
+        self.buffer = TextBuffer()
+        self.paragraph_index = array('i')
+        self.start_pos = array('i')
+        self.year_id = array('i')
+        self.type_id = array('i')
+        self.page_id = array('i')
+        self.raw_offset = array('q')   # >= 0: into `source`; < 0: ~offset into `buffer`
+        self.raw_length = array('i')
+        self.author_ids = array('i')
+        self.author_start = array('q', [0])
+
+    def append(self, authors: List[str], year: str, paragraph_index: int,
+               citation_type: str, raw_text: str, page: Optional[str] = None,
+               start_pos: int = 0):
+        """Add one citation (same arguments as Citation)."""
+        intern = self.strings.intern
+        for author in authors:
+            self.author_ids.append(intern(author))
+        self.author_start.append(len(self.author_ids))
+        self.year_id.append(intern(year))
+        self.type_id.append(intern(citation_type))
+        self.page_id.append(intern(page) if page else NO_VALUE)
+        self.paragraph_index.append(paragraph_index)
+        self.start_pos.append(start_pos)
+        self.raw_offset.append(self._source_offset(raw_text, paragraph_index, start_pos))
+        self.raw_length.append(len(raw_text))
+
+    def _source_offset(self, raw_text: str, paragraph_index: int, start_pos: int) -> int:
+        if self.source is not None:
+            position = start_pos
+            if self.paragraph_starts and 0 <= paragraph_index < len(self.paragraph_starts):
+                position += self.paragraph_starts[paragraph_index]
+            if self.source.startswith(raw_text, position):
+                return position
+        return ~self.buffer.append(raw_text)
+
+    def raw_text(self, row: int) -> str:
+        offset, length = self.raw_offset[row], self.raw_length[row]
+        if offset >= 0:
+            return self.source[offset:offset + length]
+        return self.buffer.slice(~offset, length)
+
+    def extend(self, citations: Iterable):
+        """Add Citation objects (or anything with the same attributes)."""
+        for c in citations:
+            self.append(c.authors, c.year, c.paragraph_index, c.citation_type,
+                        c.raw_text, c.page, c.start_pos)
+
+    @classmethod
+    def from_citations(cls, citations: Iterable, factory: Optional[Callable] = None,
+                       source: Optional[str] = None,
+                       paragraph_starts: Optional[Iterable[int]] = None) -> "CitationStore":
+        store = cls(factory, source, paragraph_starts)
+        store.extend(citations)
+        return store
+
+    def __len__(self):
+        return len(self.paragraph_index)
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("citation index out of range")
+        view = CitationView(self, row)
+        if self.factory is None:
+            return view
+        return self.factory(authors=view.authors, year=view.year,
+                            paragraph_index=view.paragraph_index,
+                            citation_type=view.citation_type, raw_text=view.raw_text,
+                            page=view.page, start_pos=view.start_pos)
+
+    def __iter__(self) -> Iterator:
+        for row in range(len(self)):
+            yield self[row]
+
+    # --- Column scans (no per-row objects) ---
+
+    def count_by_type(self) -> Dict[str, int]:
+        counts: Dict[int, int] = {}
+        for type_id in self.type_id:
+            counts[type_id] = counts.get(type_id, 0) + 1
+        return {self.strings[k]: v for k, v in counts.items()}
+
+    def rows_for_year(self, year: str) -> List[int]:
+        year_id = self.strings.lookup(year)
+        if year_id == NO_VALUE:
+            return []
+        return [row for row, value in enumerate(self.year_id) if value == year_id]
+
+    def nbytes(self) -> int:
+        """Approximate memory used by columns, interned strings and the own buffer (not `source`)."""
+        return (_array_bytes(self.paragraph_index, self.start_pos, self.year_id,
+                             self.type_id, self.page_id, self.raw_offset,
+                             self.raw_length, self.author_ids, self.author_start)
+                + self.strings.nbytes() + self.buffer.nbytes())
+
+
+# ============================================================
+# REFERENCE STORE
+# ============================================================
+
+class ReferenceView:
+    """Read-only row of a ReferenceStore (exposes `.text` like Reference)."""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: "ReferenceStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def text(self) -> str:
+        return self._store.buffer.slice(self._store.offset[self._row],
+                                        self._store.length[self._row])
+
+    def __repr__(self):
+        return f"ReferenceView({self.text[:60]!r})"
+
+
+class ReferenceStore:
+    """
+    Columnar container for reference texts.
+
+    Texts are views into one shared buffer; `factory` (e.g. Reference)
+    turns a row into a full object on access when validators need methods.
+    """
+
+    def __init__(self, factory: Optional[Callable] = None):
+        self.factory = factory
+        self.buffer = TextBuffer()
+        self.offset = array('q')
+        self.length = array('i')
+        self.paragraph_index = array('i')
+
+    def append(self, text: str, paragraph_index: int = NO_VALUE):
+        self.offset.append(self.buffer.append(text))
+        self.length.append(len(text))
+        self.paragraph_index.append(paragraph_index)
+
+    def extend(self, references: Iterable):
+        for ref in references:
+            self.append(getattr(ref, 'text', ref), getattr(ref, 'paragraph_index', NO_VALUE))
+
+    def __len__(self):
+        return len(self.offset)
+
+    def __getitem__(self, row: int):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("reference index out of range")
+        view = ReferenceView(self, row)
+        return view if self.factory is None else self.factory(view.text)
+
+    def __iter__(self) -> Iterator:
+        for row in range(len(self)):
+            yield self[row]
+
+    def nbytes(self) -> int:
+        return _array_bytes(self.offset, self.length, self.paragraph_index) + self.buffer.nbytes()
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _synthetic_rows(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    surnames = [f"Autor{i}" for i in range(5000)]
+    for i in range(n):
+        author = rng.choice(surnames)
+        year = str(1980 + rng.randrange(45))
+        narrative = rng.random() < 0.4
+        page = str(rng.randrange(1, 400)) if rng.random() < 0.3 else None
+        raw = f"{author} ({year})" if narrative else f"({author}, {year})"
+        yield ([author], year, i // 4, "narrativa" if narrative else "parentética",
+               raw, page, rng.randrange(2000))
+
+
+def run_benchmark(n: int = 1_000_000):
+    print("SILVINA - Almacén Columnar de Citas (Benchmark)")
+    print("=" * 60)
+
+    tracemalloc.start()
+    as_list = [Citation(*row) for row in _synthetic_rows(n)]
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    list_count = sum(1 for c in as_list if c.year == "2020")
+    list_scan = time.perf_counter() - start
+    del as_list
+
+    tracemalloc.start()
+    store = CitationStore()
+    for row in _synthetic_rows(n):
+        store.append(*row)
+    _ = store.buffer.text
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    store_count = len(store.rows_for_year("2020"))
+    store_scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    iterated = sum(1 for c in store if c.citation_type == "narrativa")
+    iter_time = time.perf_counter() - start
+
+    # Extracted from a document, raw texts are views into its text: nothing copied
+    from citations import CitationExtractor
+    paragraphs = [f"Según el análisis {row[4]} la doctrina cambió." for row in _synthetic_rows(min(n, 100_000))]
+    extracted = CitationExtractor().extract_document(paragraphs, columnar=True)
+
+    per_million = 1_000_000 / n
+    print(f"  Citas: {n:,}")
+    print(f"  Lista de Citation : {list_bytes * per_million / 2**20:8.1f} MiB/millón | "
+          f"escaneo por año {n / list_scan / 1e6:6.1f} M filas/s")
+    print(f"  CitationStore     : {store_bytes * per_million / 2**20:8.1f} MiB/millón | "
+          f"escaneo por año {n / store_scan / 1e6:6.1f} M filas/s")
+    print(f"  Iteración con vistas: {n / iter_time / 1e6:6.2f} M filas/s ({iterated:,} narrativas)")
+    print(f"  {'✓' if list_count == store_count else '✗'} Resultados idénticos ({store_count:,} citas de 2020)")
+    print(f"  Desde un documento: {len(extracted):,} citas, {len(extracted.buffer):,} caracteres copiados "
+          f"(texto crudo como vistas del documento)")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark(size)
+    else:
+        store = CitationStore.from_citations([Citation(*row) for row in _synthetic_rows(5)])
+        for citation in store:
+            print(f"  {citation}  ← {citation.raw_text}")
+        print(f"\n💡 Benchmark: python citation_store.py --bench [n]")
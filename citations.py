@@ -0,0 +1,391 @@
+# citations.py
+"""
+SILVINA Editorial Assistant - In-text Citations
+Citation data class and single-pass APA citation scanner
+Universidad de la Defensa Nacional
+"""
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+import random
+import re
+import sys
+import time
+
+
+# ============================================================
+# CITATION DATA CLASS
+# ============================================================
+
+@dataclass
+class Citation:
+    """Stores one citation with its location in the document."""
+
+    authors: List[str]
+    year: str
+    paragraph_index: int
+    citation_type: str
+    raw_text: str
+    page: Optional[str] = None
+    start_pos: int = 0
+
+    def __repr__(self):
+        """Show citation in readable format."""
+        authors_text = " y ".join(self.authors)
+        page_text = f", p. {self.page}" if self.page else ""
+        type_marker = "📖" if self.citation_type == "narrativa" else "📎"
+        return f"{type_marker} {authors_text} ({self.year}{page_text}) [¶{self.paragraph_index}]"
+
+
+# ============================================================
+# SCANNER PATTERNS
+# ============================================================
+
+# One author unit: "García", "Pérez-Sánchez", "IBM Research", "Ministerio de Defensa"
+_NAME = r"[A-ZÀ-ÖØ-Þ][\w'’]*(?:-[\w'’]+)*"
+# Surname particles in any case ("de la Fuente", "De la Fuente"); a unit may open with one
+# only when capitalized, so "el informe de Pérez" does not become the author "de Pérez"
+_PARTICLE = r"(?i:de|del|de\s+la|de\s+los|de\s+las)"
+_UNIT = rf"(?:(?:De|Del)(?:\s+(?i:la|los|las))?\s+)?{_NAME}(?:\s+(?:{_PARTICLE}\s+)?{_NAME}){{0,4}}"
+_AUTHORS = rf"{_UNIT}(?:(?:\s*,\s*|\s+(?:y|e|&)\s+){_UNIT}){{0,5}}(?:\s+et\s+al\.)?"
+_YEAR = r"\d{4}[a-z]?|s\.\s?f\."
+_YEARS = rf"(?:{_YEAR})(?:\s*,\s*(?:{_YEAR}))*"
+_PAGE = r",\s*(?:pp?\.|párr\.)\s*(?P<page>[\d\-–]+)"
+
+# The only scanning pass: every parenthesized span, left to right.
+# Spans never cross PARAGRAPH_SEPARATOR, so whole documents can be scanned at once.
+PARAGRAPH_SEPARATOR = "\n"
+PAREN_PATTERN = re.compile(r"\(([^()\n]{1,480})\)")
+
+# "(2020)" / "(2018a, 2018b, p. 4)": a narrative citation if authors precede it
+NARRATIVE_BODY = re.compile(rf"^\s*(?P<years>{_YEARS})(?:{_PAGE})?\s*$")
+NARRATIVE_AUTHORS = re.compile(rf"(?P<authors>{_AUTHORS})\s+$")
+LOOKBACK = 160
+
+# One item of a parenthetical group: "véase García y López, 2019, 2020, p. 4"
+GROUP_ITEM = re.compile(
+    rf"^(?:(?:véase|ver|cf\.|p\.\s*ej\.)\s+)?(?P<authors>{_AUTHORS}),\s*"
+    rf"(?P<years>{_YEARS})(?:{_PAGE})?$",
+    re.IGNORECASE
+)
+YEAR_TOKEN = re.compile(_YEAR)
+AUTHOR_SEPARATOR = re.compile(r"\s*,\s*|\s+(?:y|e|&)\s+")
+ET_AL = re.compile(r"\s+et\s+al\.$")
+
+# Capitalized words that open sentences, not author names
+LEADING_STOPWORDS = {
+    "Según", "Como", "En", "Para", "Por", "Así", "Tal", "Sin", "Con", "De", "Del",
+    "El", "La", "Los", "Las", "Lo", "Un", "Una", "Ver", "Véase", "Tanto", "Desde",
+    "Aunque", "Mientras", "Luego", "También", "Incluso", "Este", "Esta", "Estos",
+}
+SURNAME_PARTICLES = {"De", "Del"}
+PARTICLE_FOLLOWS = re.compile(r"(?:la|los|las)\s", re.IGNORECASE)
+
+
+def join_paragraphs(paragraphs: Sequence[str]) -> Tuple[str, array]:
+    """Join paragraphs into one buffer plus the start offset of each paragraph."""
+    starts = array('q')
+    position = 0
+    for para in paragraphs:
+        starts.append(position)
+        position += len(para) + len(PARAGRAPH_SEPARATOR)
+    return PARAGRAPH_SEPARATOR.join(paragraphs), starts
+
+
+def split_authors(authors_text: str) -> List[str]:
+    """'García, López y Pérez' -> ['García', 'López', 'Pérez']; keeps 'et al.' on the first."""
+    et_al = ET_AL.search(authors_text)
+    core = authors_text[:et_al.start()] if et_al else authors_text
+    authors = [a for a in AUTHOR_SEPARATOR.split(core.strip()) if a]
+    if et_al and authors:
+        authors[0] = f"{authors[0]} et al."
+    return authors
+
+
+# ============================================================
+# CITATION EXTRACTOR
+# ============================================================
+
+class CitationExtractor:
+    """
+    Finds APA citations in Spanish text in a single scan.
+
+    A small lexer walks the parenthesized spans of the text once. A span
+    holding only years is a narrative citation when author names precede
+    it ("IBM Research (2024)"); any other span is parsed as a
+    parenthetical group and split on ';' into one Citation per item, each
+    with its own start position. Every span is visited once, so the same
+    citation can never be reported twice.
+    """
+
+    def __init__(self):
+        self.pattern = PAREN_PATTERN
+
+    def scan(self, text: str, para_index: int, offset: int = 0) -> Iterator[Citation]:
+        """Yield citations in text order; `offset` is added to every start_pos."""
+        previous_end = 0
+        for match in self.pattern.finditer(text):
+            yield from self._citations_for(text, match, previous_end, para_index, offset)
+            previous_end = match.end()
+
+    def scan_document(self, paragraphs: Sequence[str]) -> Iterator[Citation]:
+        """
+        Yield the citations of a whole document from ONE scan.
+
+        Paragraphs are joined into a single buffer; each match offset is
+        mapped back to (paragraph_index, start_pos) by bisecting the
+        array of paragraph start offsets.
+        """
+        buffer, starts = join_paragraphs(paragraphs)
+        return self._scan_joined(buffer, starts)
+
+    def _scan_joined(self, buffer: str, starts) -> Iterator[Citation]:
+        previous_end = 0
+        for match in self.pattern.finditer(buffer):
+            para_index = bisect_right(starts, match.start()) - 1
+            para_start = starts[para_index]
+            # Narrative lookback never crosses into the previous paragraph
+            floor = max(previous_end, para_start)
+            yield from self._citations_for(buffer, match, floor, para_index, -para_start)
+            previous_end = match.end()
+
+    def _citations_for(self, text: str, match, lookback_floor: int,
+                       para_index: int, offset: int) -> Iterator[Citation]:
+        body = match.group(1)
+        narrative = NARRATIVE_BODY.match(body)
+        if narrative:
+            yield from self._narrative(text, match, narrative, lookback_floor, para_index, offset)
+        else:
+            yield from self._split_group(match, body, para_index, offset)
+
+    def _narrative(self, text: str, match, body, previous_end: int,
+                   para_index: int, offset: int) -> Iterator[Citation]:
+        window_start = max(previous_end, match.start() - LOOKBACK)
+        authors_match = NARRATIVE_AUTHORS.search(text, window_start, match.start())
+        if not authors_match:
+            return
+
+        authors_text = authors_match.group('authors')
+        start = authors_match.start()
+        # Drop sentence openers: "Según IBM Research (2024)" -> "IBM Research".
+        # A capitalized particle is part of the surname when a particle follows
+        # it ("De la Fuente") or when it comes after an opener ("Según Del Valle")
+        words = authors_text.split(' ', 1)
+        while len(words) == 2 and words[0] in LEADING_STOPWORDS and not (
+                words[0] in SURNAME_PARTICLES
+                and (start > authors_match.start() or PARTICLE_FOLLOWS.match(words[1]))):
+            start += len(words[0]) + 1
+            authors_text = words[1].lstrip()
+            words = authors_text.split(' ', 1)
+        if authors_text in LEADING_STOPWORDS:
+            return
+
+        authors = split_authors(authors_text)
+        years = list(YEAR_TOKEN.finditer(body.group('years')))
+        years_pos = match.start(1) + body.start('years')
+        for n, year_match in enumerate(years):
+            if n == 0:
+                raw_text, year_start = text[start:match.end()], start
+            else:
+                raw_text, year_start = year_match.group(0), years_pos + year_match.start()
+            yield Citation(
+                authors=authors,
+                year=year_match.group(0),
+                paragraph_index=para_index,
+                citation_type="narrativa",
+                raw_text=raw_text,
+                page=body.group('page') if n == len(years) - 1 else None,
+                start_pos=year_start + offset
+            )
+
+    def _split_group(self, match, body: str, para_index: int, offset: int) -> Iterator[Citation]:
+        items = body.split(';')
+        single = len(items) == 1
+        item_start = match.start(1)
+
+        for item in items:
+            stripped = item.strip()
+            item_pos = item_start + (len(item) - len(item.lstrip()))
+            item_start += len(item) + 1
+
+            parsed = GROUP_ITEM.match(stripped)
+            if not parsed:
+                continue
+            authors = split_authors(parsed.group('authors'))
+            page = parsed.group('page')
+
+            years = list(YEAR_TOKEN.finditer(parsed.group('years')))
+            years_pos = item_pos + parsed.start('years')
+            for n, year_match in enumerate(years):
+                if single and len(years) == 1:
+                    # Whole "(García, 2020, p. 45)" as before
+                    raw_text, start = match.group(0), match.start()
+                elif n == 0:
+                    raw_text = stripped[:parsed.start('years') + year_match.end()]
+                    start = item_pos
+                else:
+                    raw_text, start = year_match.group(0), years_pos + year_match.start()
+
+                yield Citation(
+                    authors=authors,
+                    year=year_match.group(0),
+                    paragraph_index=para_index,
+                    citation_type="parentética",
+                    raw_text=raw_text,
+                    page=page if n == len(years) - 1 else None,
+                    start_pos=start + offset
+                )
+
+    def extract_all(self, text: str, para_index: int) -> List[Citation]:
+        """Find ALL citations (parenthetical + narrative) in one paragraph."""
+        return list(self.scan(text, para_index))
+
+    def extract_document(self, paragraphs: Sequence[str], columnar: bool = False):
+        """
+        Find ALL citations of a document in bulk.
+
+        Args:
+            paragraphs: Paragraph texts, in document order
+            columnar: Return a CitationStore instead of a list
+
+        Returns:
+            List of Citation (same as calling extract_all per paragraph),
+            or a CitationStore holding the same rows
+        """
+        if columnar:
+            from citation_store import CitationStore
+            # raw_text rows are views into the joined document text
+            buffer, starts = join_paragraphs(paragraphs)
+            return CitationStore.from_citations(self._scan_joined(buffer, starts), source=buffer,
+                                                paragraph_starts=starts)
+        return list(self.scan_document(paragraphs))
+
+    def extract_simple(self, text: str, para_index: int) -> List[Citation]:
+        """Find parenthetical citations like (García, 2020, p. 45)."""
+        return [c for c in self.scan(text, para_index) if c.citation_type == "parentética"]
+
+    def extract_narrative(self, text: str, para_index: int) -> List[Citation]:
+        """Find narrative citations like García (2020)."""
+        return [c for c in self.scan(text, para_index) if c.citation_type == "narrativa"]
+
+
+# ============================================================
+# BENCHMARK (against the v0.6 two-pass extractor)
+# ============================================================
+
+class TwoPassExtractor:
+    """The v0.6 extractor: two regex passes, single-surname authors only."""
+
+    def __init__(self):
+        self.pattern_simple = re.compile(
+            r'\(([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+et\s+al\.)?),\s*(\d{4}[a-z]?)'
+            r'(?:,\s*(?:pp?\.|párr\.)\s*([\d\-]+))?\)'
+        )
+        self.pattern_narrative = re.compile(
+            r'([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+et\s+al\.)?)\s+\((\d{4}[a-z]?)'
+            r'(?:,\s*(?:pp?\.|párr\.)\s*([\d\-]+))?\)'
+        )
+
+    def extract_all(self, text: str, para_index: int) -> List[Citation]:
+        citations = []
+        for pattern, kind in ((self.pattern_simple, "parentética"),
+                              (self.pattern_narrative, "narrativa")):
+            for m in pattern.finditer(text):
+                citations.append(Citation([m.group(1)], m.group(2), para_index, kind,
+                                          m.group(0), m.group(3), m.start()))
+        return citations
+
+
+SAMPLE_SENTENCES = [
+    "La disuasión convencional sigue vigente (García, 2020, p. 45).",
+    "Según López et al. (2019) el problema es grave.",
+    "Varios estudios (García y López, 2020; Pérez, 2021) lo confirman.",
+    "El algoritmo de Shor amenaza RSA (Gidney & Ekera, 2024).",
+    "IBM Research (2024) presentó su hoja de ruta cuántica.",
+    "La doctrina conjunta exige interoperabilidad entre las Fuerzas Armadas.",
+    "El Estado Mayor Conjunto (EMCO) coordina el planeamiento militar.",
+    "Núñez (2018a, 2018b) analiza la logística operacional del teatro.",
+]
+
+
+PLAIN_SENTENCES = [
+    "La doctrina conjunta exige interoperabilidad entre las Fuerzas Armadas.",
+    "El planeamiento estratégico militar considera escenarios de largo plazo.",
+    "Las capacidades de ciberdefensa requieren personal especializado.",
+    "El adiestramiento combinado fortalece la cooperación regional.",
+]
+
+
+def synthetic_corpus(n_paragraphs: int, seed: int = 11, cited_ratio: float = 1.0,
+                     sentences: int = 6) -> List[str]:
+    """Paragraphs of sample sentences; `cited_ratio` is the share of sentences that may cite."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(SAMPLE_SENTENCES) if rng.random() < cited_ratio
+                     else rng.choice(PLAIN_SENTENCES) for _ in range(sentences))
+            for _ in range(n_paragraphs)]
+
+
+def run_benchmark(n_paragraphs: int = 20_000):
+    run_extractor_benchmark(n_paragraphs)
+    print()
+    run_document_benchmark()
+
+
+def run_extractor_benchmark(n_paragraphs: int = 20_000):
+    corpus = synthetic_corpus(n_paragraphs)
+    chars = sum(len(p) for p in corpus)
+    print("SILVINA - Escáner de Citas (Benchmark)")
+    print("=" * 60)
+    print(f"  Corpus: {n_paragraphs:,} párrafos, {chars:,} caracteres")
+    for name, extractor in (("v0.6 dos pasadas", TwoPassExtractor()),
+                            ("Escáner único", CitationExtractor())):
+        start = time.perf_counter()
+        found = 0
+        for i, para in enumerate(corpus):
+            found += len(extractor.extract_all(para, i))
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<18} {found:>9,} citas en {elapsed:6.2f} s "
+              f"({chars / elapsed / 1e6:5.2f} M car/s, {found / elapsed:,.0f} citas/s)")
+
+
+def run_document_benchmark(pages=(30, 300, 1000)):
+    """Per-paragraph extract_all vs one-buffer extract_document on book-length texts."""
+    extractor = CitationExtractor()
+    print("SILVINA - Extracción por Documento Completo (Benchmark)")
+    print("=" * 60)
+    for n_pages in pages:
+        # ~10 short paragraphs per page, roughly one citing sentence in ten
+        corpus = synthetic_corpus(n_pages * 10, seed=n_pages, cited_ratio=0.1, sentences=3)
+        chars = sum(len(p) for p in corpus)
+
+        start = time.perf_counter()
+        per_paragraph = []
+        for i, para in enumerate(corpus):
+            per_paragraph.extend(extractor.extract_all(para, para_index=i))
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk = extractor.extract_document(corpus)
+        bulk_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = extractor.extract_document(corpus, columnar=True)
+        store_time = time.perf_counter() - start
+
+        same = "✓" if bulk == per_paragraph and len(store) == len(bulk) else "✗"
+        print(f"  {same} {n_pages:>5} páginas ({chars / 1e6:5.2f} M car): "
+              f"por párrafo {loop_time * 1000:7.1f} ms | documento {bulk_time * 1000:7.1f} ms "
+              f"| columnar {store_time * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark()
+    else:
+        extractor = CitationExtractor()
+        for i, sentence in enumerate(SAMPLE_SENTENCES):
+            print(f"\nPárrafo {i}: {sentence}")
+            for cit in extractor.extract_all(sentence, para_index=i):
+                print(f"  → {cit}  «{cit.raw_text}» @{cit.start_pos}")
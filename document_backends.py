@@ -0,0 +1,389 @@
+# document_backends.py
+"""
+SILVINA Editorial Assistant - Document Backends
+Everything the validators ask of a Word document (paragraph texts and
+styles, Characters.Count, footnotes, endnotes, Content.Text) behind one
+small interface: live Word through COM, a recorded fixture replayed
+without Word, or a .docx read directly from its XML
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import gzip
+import importlib.util
+import json
+import os
+import sys
+import time
+
+from tracing import span
+
+
+def _module_available(name: str) -> bool:
+    """Whether a module can be imported, without importing it."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# pywin32 is only imported when a Word document is actually opened
+HAS_WIN32 = _module_available("win32com")
+
+
+FIXTURE_FORMAT = "silvina-fixture"
+FIXTURE_VERSION = 1
+FIXTURE_SUFFIX = ".silvina.json.gz"
+STYLE_MAX_LEN = 80  # Style.NameLocal is a slow COM call; headings are short
+
+
+# ============================================================
+# SNAPSHOT MODEL
+# ============================================================
+
+@dataclass
+class ParagraphRecord:
+    """One paragraph as Word reports it (text keeps its trailing '\\r')."""
+
+    text: str
+    style: str = ""
+    start: int = 0
+    first_line_indent: float = 0.0
+    left_indent: float = 0.0
+
+
+@dataclass
+class NoteRecord:
+    """A footnote or endnote: where its mark sits in the body and its text."""
+
+    anchor: int
+    text: str
+
+
+@dataclass
+class DocumentSnapshot:
+    """All the document data the pipeline reads, detached from Word."""
+
+    source: str
+    characters: int
+    paragraphs: List[ParagraphRecord] = field(default_factory=list)
+    footnotes: List[NoteRecord] = field(default_factory=list)
+    endnotes: List[NoteRecord] = field(default_factory=list)
+    content_text: Optional[str] = None  # only when it differs from the joined paragraphs
+
+    def text(self) -> str:
+        if self.content_text is not None:
+            return self.content_text
+        return "".join(p.text for p in self.paragraphs)
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class DocumentBackend:
+    """Read-only view of an opened document; subclasses supply the data."""
+
+    def open(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def character_count(self) -> int:
+        raise NotImplementedError
+
+    def paragraphs(self) -> List[ParagraphRecord]:
+        """Every paragraph in order; style only for paragraphs under STYLE_MAX_LEN."""
+        raise NotImplementedError
+
+    def paragraph_format(self, index: int) -> Tuple[float, float]:
+        """(FirstLineIndent, LeftIndent) in points of the paragraph at `index`."""
+        raise NotImplementedError
+
+    def notes(self) -> Tuple[List[NoteRecord], List[NoteRecord]]:
+        """(footnotes, endnotes)."""
+        raise NotImplementedError
+
+    def content_text(self) -> str:
+        raise NotImplementedError
+
+
+def start_word():
+    """Launch a hidden Word instance for the calling thread (COM is per thread)."""
+    if not HAS_WIN32:
+        raise ImportError("pywin32 no está instalado. Instalar con: pip install pywin32")
+    import pythoncom
+    import win32com.client
+
+    pythoncom.CoInitialize()
+    word = win32com.client.Dispatch("Word.Application")
+    word.Visible = False
+    return word
+
+
+class WordBackend(DocumentBackend):
+    """
+    Live document in Microsoft Word through COM (Windows only).
+
+    Pass `word` (from start_word) to reuse a running instance; it is
+    then left open on close().
+    """
+
+    def __init__(self, path: str, word=None):
+        if not HAS_WIN32:
+            raise ImportError("pywin32 no está instalado. Instalar con: pip install pywin32")
+        self.path = os.path.abspath(path)
+        self.word = word
+        self.owns_word = word is None
+        self.doc = None
+
+    def open(self) -> bool:
+        """Open Word document with robust COM initialization."""
+        try:
+            with span("abrir_documento"):
+                if self.word is None:
+                    self.word = start_word()
+                self.doc = self.word.Documents.Open(self.path)
+
+            with span("estabilizar_com"):
+                time.sleep(2.0)
+                self.doc.Activate()
+                time.sleep(1.0)
+                _ = self.doc.Characters.Count
+                time.sleep(0.5)
+                _ = len(self.doc.Paragraphs)
+                time.sleep(1.0)
+
+            print(f"✅ Connected: {self.path}")
+            print(f"✅ Document fully loaded: {len(self.doc.Paragraphs)} paragraphs")
+            return True
+        except Exception as e:
+            print(f"❌ Connection Error: {e}")
+            if self.owns_word:
+                self.word = None
+            self.doc = None
+            return False
+
+    def close(self):
+        try:
+            if self.doc:
+                self.doc.Close(SaveChanges=False)
+            if self.word and self.owns_word:
+                self.word.Quit()
+        except:
+            pass
+
+    def character_count(self) -> int:
+        return self.doc.Characters.Count
+
+    def paragraphs(self) -> List[ParagraphRecord]:
+        records = []
+        for para in self.doc.Paragraphs:
+            try:
+                para_range = para.Range
+                text = para_range.Text
+                style = str(para.Style.NameLocal) if len(text) < STYLE_MAX_LEN else ""
+                records.append(ParagraphRecord(text, style, para_range.Start))
+            except:
+                # Keep positions aligned with Word's paragraph numbering
+                start = records[-1].start + len(records[-1].text) if records else 0
+                records.append(ParagraphRecord("", "", start))
+        return records
+
+    def paragraph_format(self, index: int) -> Tuple[float, float]:
+        fmt = self.doc.Paragraphs(index + 1).Format
+        return fmt.FirstLineIndent, fmt.LeftIndent
+
+    def notes(self) -> Tuple[List[NoteRecord], List[NoteRecord]]:
+        return ([NoteRecord(n.Reference.Start, n.Range.Text) for n in self.doc.Footnotes],
+                [NoteRecord(n.Reference.Start, n.Range.Text) for n in self.doc.Endnotes])
+
+    def content_text(self) -> str:
+        return self.doc.Content.Text
+
+    def snapshot(self) -> DocumentSnapshot:
+        """Pull everything once, indents included, for recording."""
+        paragraphs = self.paragraphs()
+        for i, record in enumerate(paragraphs):
+            if record.text.strip():
+                try:
+                    record.first_line_indent, record.left_indent = self.paragraph_format(i)
+                except:
+                    pass
+        footnotes, endnotes = self.notes()
+        snapshot = DocumentSnapshot(os.path.basename(self.path), self.character_count(),
+                                    paragraphs, footnotes, endnotes)
+        content = self.content_text()
+        if content != snapshot.text():
+            snapshot.content_text = content
+        return snapshot
+
+
+class ReplayBackend(DocumentBackend):
+    """Serves a recorded snapshot: no Word, no waits, same answers every run."""
+
+    def __init__(self, snapshot: DocumentSnapshot):
+        self.snapshot = snapshot
+        self.path = snapshot.source
+
+    def character_count(self) -> int:
+        return self.snapshot.characters
+
+    def paragraphs(self) -> List[ParagraphRecord]:
+        return self.snapshot.paragraphs
+
+    def paragraph_format(self, index: int) -> Tuple[float, float]:
+        record = self.snapshot.paragraphs[index]
+        return record.first_line_indent, record.left_indent
+
+    def notes(self) -> Tuple[List[NoteRecord], List[NoteRecord]]:
+        return self.snapshot.footnotes, self.snapshot.endnotes
+
+    def content_text(self) -> str:
+        return self.snapshot.text()
+
+
+def snapshot_from_docx(path: str) -> DocumentSnapshot:
+    """
+    Approximate snapshot read straight from the .docx XML.
+
+    Word counts paragraph marks and fields its own way, so
+    `characters` may differ slightly from Characters.Count; record
+    a fixture with Word when exact counts matter.
+    """
+    from docx_io import read_docx
+
+    content = read_docx(path)
+    paragraphs = []
+    start = 0
+    for info in content.paragraphs:
+        text = info.text + "\r"
+        style = info.style if len(text) < STYLE_MAX_LEN else ""
+        paragraphs.append(ParagraphRecord(text, style, start, info.first_line_indent, info.left_indent))
+        start += len(text)
+
+    def notes(refs):
+        return [NoteRecord(paragraphs[i].start + len(paragraphs[i].text) - 1, text) for i, text in refs]
+
+    return DocumentSnapshot(os.path.basename(path), start, paragraphs,
+                            notes(content.footnote_refs), notes(content.endnote_refs))
+
+
+# ============================================================
+# FIXTURES
+# ============================================================
+
+def save_fixture(snapshot: DocumentSnapshot, path: str):
+    """
+    Write a gzipped, columnar JSON fixture.
+
+    Paragraph starts are stored only where they break the running sum
+    of text lengths, and styles and indents only where set, so a
+    fixture is a fraction of the size of the .docx.
+    """
+    texts, starts, styles, indents = [], {}, {}, {}
+    expected = snapshot.paragraphs[0].start if snapshot.paragraphs else 0
+    for i, p in enumerate(snapshot.paragraphs):
+        texts.append(p.text)
+        if p.start != expected:
+            starts[i] = p.start
+        expected = p.start + len(p.text)
+        if p.style:
+            styles[i] = p.style
+        if p.first_line_indent or p.left_indent:
+            indents[i] = [p.first_line_indent, p.left_indent]
+
+    data = {
+        "formato": FIXTURE_FORMAT,
+        "version": FIXTURE_VERSION,
+        "fuente": snapshot.source,
+        "caracteres": snapshot.characters,
+        "textos": texts,
+        "inicio": snapshot.paragraphs[0].start if snapshot.paragraphs else 0,
+        "inicios": starts,
+        "estilos": styles,
+        "sangrias": indents,
+        "notas_pie": [[n.anchor, n.text] for n in snapshot.footnotes],
+        "notas_fin": [[n.anchor, n.text] for n in snapshot.endnotes],
+        "texto_completo": snapshot.content_text,
+    }
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_fixture(path: str) -> DocumentSnapshot:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("formato") != FIXTURE_FORMAT or data.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Fixture no reconocido: {path}")
+
+    starts = {int(k): v for k, v in data["inicios"].items()}
+    styles = {int(k): v for k, v in data["estilos"].items()}
+    indents = {int(k): v for k, v in data["sangrias"].items()}
+    paragraphs = []
+    position = data["inicio"]
+    for i, text in enumerate(data["textos"]):
+        position = starts.get(i, position)
+        first_line, left = indents.get(i, (0.0, 0.0))
+        paragraphs.append(ParagraphRecord(text, styles.get(i, ""), position, first_line, left))
+        position += len(text)
+
+    return DocumentSnapshot(
+        data["fuente"], data["caracteres"], paragraphs,
+        [NoteRecord(anchor, text) for anchor, text in data["notas_pie"]],
+        [NoteRecord(anchor, text) for anchor, text in data["notas_fin"]],
+        data["texto_completo"],
+    )
+
+
+def record(docx_path: str, fixture_path: Optional[str] = None) -> str:
+    """Open `docx_path` in Word once and save everything the pipeline reads."""
+    fixture_path = fixture_path or os.path.splitext(docx_path)[0] + FIXTURE_SUFFIX
+    backend = WordBackend(docx_path)
+    if not backend.open():
+        raise RuntimeError(f"No se pudo abrir en Word: {docx_path}")
+    try:
+        save_fixture(backend.snapshot(), fixture_path)
+    finally:
+        backend.close()
+    return fixture_path
+
+
+def open_backend(path: str, word=None) -> DocumentBackend:
+    """
+    Backend for a path: fixtures are replayed; .docx files go through
+    Word (reusing `word` when given) when pywin32 is available and are
+    read from their XML otherwise.
+    """
+    if path.endswith(FIXTURE_SUFFIX):
+        return ReplayBackend(load_fixture(path))
+    if HAS_WIN32:
+        return WordBackend(path, word)
+    print("⚠️ pywin32 no disponible: lectura directa del .docx (conteos aproximados)")
+    return ReplayBackend(snapshot_from_docx(path))
+
+
+if __name__ == "__main__":
+    # Usage: python document_backends.py --grabar doc.docx [fixture]    (Windows + Word)
+    #        python document_backends.py --desde-docx doc.docx [fixture]
+    #        python document_backends.py --bench fixture
+    args = sys.argv[1:]
+    if len(args) >= 2 and args[0] in ("--grabar", "--desde-docx"):
+        target = args[2] if len(args) > 2 else os.path.splitext(args[1])[0] + FIXTURE_SUFFIX
+        if args[0] == "--grabar":
+            record(args[1], target)
+        else:
+            save_fixture(snapshot_from_docx(args[1]), target)
+        print(f"💾 Fixture guardado: {target} ({os.path.getsize(target) / 1024:.1f} KiB)")
+    elif len(args) >= 2 and args[0] == "--bench":
+        start = time.perf_counter()
+        snapshot = load_fixture(args[1])
+        elapsed = time.perf_counter() - start
+        print(f"  {len(snapshot.paragraphs):,} párrafos, {snapshot.characters:,} caracteres, "
+              f"{len(snapshot.footnotes) + len(snapshot.endnotes)} notas: {elapsed * 1000:.1f} ms")
+    else:
+        print(__doc__)
@@ -0,0 +1,440 @@
+# docx_comments.py
+"""
+SILVINA Editorial Assistant - Word Comments Without Word
+Writes anchored findings into a copy of the .docx as native Word
+comments: document.xml is rewritten in one streaming pass over its
+tags and comments.xml is created or extended, no COM round-trips
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+import html
+import os
+import re
+import zipfile
+
+from docx_io import W_NS
+
+
+DEFAULT_AUTHOR = "SILVINA"
+DEFAULT_INITIALS = "SIL"
+
+DOCUMENT_PART = "word/document.xml"
+COMMENTS_PART = "word/comments.xml"
+DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+COMMENTS_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml"
+COMMENTS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments"
+
+# Tags and text of an XML part, in document order
+TOKEN = re.compile(r'<[^>]*>|[^<]+')
+TAG = re.compile(r'<(/?)([\w:.-]+)([^>]*?)(/?)>$')
+# Characters XML 1.0 does not allow (Word's \x0b line break among them)
+INVALID_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+CHUNK = 1 << 16  # characters buffered before each write to the output part
+PARAGRAPH_END = float("inf")  # offset of a finding anchored to the end of its paragraph
+
+
+# ============================================================
+# FINDINGS
+# ============================================================
+
+@dataclass
+class Finding:
+    """
+    One comment anchored in a body paragraph.
+
+    `paragraph` is the index of the w:p in document order (the index
+    read_docx and snapshot_from_docx give every paragraph); `start`/`end`
+    are character offsets in that paragraph's text. Without offsets the
+    whole paragraph is commented.
+    """
+
+    paragraph: int
+    message: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+    rule: str = ""
+    author: str = DEFAULT_AUTHOR
+
+
+@dataclass
+class AnnotationResult:
+    output: str
+    comments: int = 0
+    paragraphs: int = 0
+    skipped: List[Finding] = field(default_factory=list)  # paragraph index outside the document
+
+
+def annotated_path(path: str) -> str:
+    """manuscrito.docx -> manuscrito_anotado.docx"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_anotado{ext or '.docx'}"
+
+
+# ============================================================
+# DOCUMENT.XML REWRITE (one streaming pass)
+# ============================================================
+
+class _OpenParagraph:
+    """Offset and pending marks of a w:p while its tags stream by."""
+
+    __slots__ = ("marks", "next", "offset", "run_head", "in_run", "head_done", "rpr_depth")
+
+    def __init__(self, marks: List[Tuple[float, int, int]]):
+        self.marks = marks       # (offset, 0 = start / 1 = end, comment id), sorted
+        self.next = 0            # first mark not yet written
+        self.offset = 0          # characters of text seen so far, as read_docx counts them
+        self.run_head: List[str] = []  # <w:r> start tag and its rPr, to reopen a split run
+        self.in_run = False
+        self.head_done = True
+        self.rpr_depth = 0
+
+    def due(self, offset: float) -> bool:
+        return self.next < len(self.marks) and self.marks[self.next][0] <= offset
+
+    def take(self, offset: float, prefix: str) -> str:
+        """Markup of every mark at or before `offset`."""
+        out = []
+        marks = self.marks
+        while self.next < len(marks) and marks[self.next][0] <= offset:
+            _, kind, comment_id = marks[self.next]
+            self.next += 1
+            if kind == 0:
+                out.append(f'<{prefix}commentRangeStart {prefix}id="{comment_id}"/>')
+            else:
+                out.append(f'<{prefix}commentRangeEnd {prefix}id="{comment_id}"/>'
+                           f'<{prefix}r><{prefix}commentReference {prefix}id="{comment_id}"/></{prefix}r>')
+        return "".join(out)
+
+
+def namespace_prefix(xml: str) -> str:
+    """'w:' (or whatever prefix the part binds to the WordprocessingML namespace)."""
+    match = re.search(r'xmlns(?::([\w.-]+))?=["\']' + re.escape(W_NS) + r'["\']', xml)
+    if match is None:
+        raise ValueError("El documento no usa el espacio de nombres de WordprocessingML")
+    return f"{match.group(1)}:" if match.group(1) else ""
+
+
+def _marks_by_paragraph(findings: Iterable[Tuple[int, Finding]]) -> Dict[int, List[Tuple[float, int, int]]]:
+    marks: Dict[int, List[Tuple[float, int, int]]] = {}
+    for comment_id, finding in findings:
+        start = 0 if finding.start is None else max(finding.start, 0)
+        end = PARAGRAPH_END if finding.end is None else max(finding.end, start)
+        paragraph = marks.setdefault(finding.paragraph, [])
+        paragraph.append((start, 0, comment_id))
+        paragraph.append((end, 1, comment_id))
+    for paragraph in marks.values():
+        paragraph.sort()  # by offset; a start before the end at the same offset
+    return marks
+
+
+def rewrite_document(xml: str, marks: Dict[int, List[Tuple[float, int, int]]], write) -> int:
+    """
+    Stream `xml` (document.xml) to `write`, inserting comment ranges.
+
+    Paragraphs are counted in document order, as ElementTree's iter()
+    visits them; text offsets count w:t characters, w:tab and w:br as
+    read_docx does (a paragraph's offsets include text boxes nested in
+    it). Marks go between runs; one that falls inside a run closes it
+    and reopens it with the same properties. Returns the paragraph count.
+    """
+    p = namespace_prefix(xml)
+    tag_p, tag_r, tag_t, tag_rpr = f"{p}p", f"{p}r", f"{p}t", f"{p}rPr"
+    counted = (f"{p}tab", f"{p}br")
+    text_start = f'<{p}t xml:space="preserve">'
+
+    stack: List[Optional[_OpenParagraph]] = []  # one entry per open w:p; None when it has no marks
+    index = 0
+    in_text = False
+    buffer: List[str] = []
+    size = 0
+
+    def advance(n: int):
+        for para in stack:
+            if para is not None:
+                para.offset += n
+
+    for match in TOKEN.finditer(xml):
+        token = match.group(0)
+        out = token
+        if token[0] != "<":
+            if in_text and stack:
+                text = html.unescape(token)
+                para = stack[-1]
+                if para is not None and para.due(para.offset + len(text) - 1):
+                    # Marks inside this text: split the run at each of them
+                    pieces, cut = [], 0
+                    while para.due(para.offset + len(text) - cut - 1):
+                        at = cut + int(para.marks[para.next][0] - para.offset)
+                        if at > cut:
+                            pieces.append(escape(text[cut:at]))
+                            advance(at - cut)
+                            cut = at
+                        pieces.append(f"</{tag_t}></{tag_r}>{para.take(para.offset, p)}"
+                                      f"{''.join(para.run_head)}{text_start}")
+                    pieces.append(escape(text[cut:]))
+                    advance(len(text) - cut)
+                    out = "".join(pieces)
+                else:
+                    advance(len(text))
+        elif token[1] not in "?!":
+            tag = TAG.match(token)
+            closing, name, self_closing = tag.group(1), tag.group(2), tag.group(4)
+            para = stack[-1] if stack else None
+
+            if name == tag_p:
+                if closing:
+                    para = stack.pop()
+                    if para is not None:
+                        out = para.take(PARAGRAPH_END, p) + token
+                else:
+                    para = _OpenParagraph(marks[index]) if index in marks else None
+                    index += 1
+                    if self_closing:
+                        if para is not None:
+                            out = f"<{tag_p}{tag.group(3)}>{para.take(PARAGRAPH_END, p)}</{tag_p}>"
+                    else:
+                        stack.append(para)
+            elif name == tag_t:
+                in_text = not closing and not self_closing
+                if in_text and para is not None and "xml:space" not in token:
+                    token = out = text_start  # the text may be split at a space
+            elif name in counted and not closing:
+                advance(1)
+
+            if para is not None and name != tag_p:
+                if name == tag_r:
+                    if not closing:
+                        out = para.take(para.offset, p) + token
+                        para.run_head = [token]
+                    para.in_run = not closing and not self_closing
+                    para.head_done = not para.in_run
+                elif not para.head_done:
+                    if name == tag_rpr or para.rpr_depth:
+                        # Run properties: part of the head a split run reopens with
+                        para.run_head.append(token)
+                        if name == tag_rpr and not self_closing:
+                            para.rpr_depth += -1 if closing else 1
+                    elif not closing:
+                        para.head_done = True
+                if para.in_run and para.head_done and not closing and name in (tag_t, *counted) \
+                        and para.due(para.offset - (1 if name in counted else 0)):
+                    # Content child after a mark's offset: close the run, mark, reopen
+                    offset = para.offset - (1 if name in counted else 0)
+                    out = f"</{tag_r}>{para.take(offset, p)}{''.join(para.run_head)}{token}"
+
+        buffer.append(out)
+        size += len(out)
+        if size >= CHUNK:
+            write("".join(buffer))
+            buffer, size = [], 0
+
+    if buffer:
+        write("".join(buffer))
+    return index
+
+
+# ============================================================
+# COMMENTS.XML, RELATIONSHIPS AND CONTENT TYPES
+# ============================================================
+
+def _clean(text: str) -> str:
+    return INVALID_XML.sub(" ", text)
+
+
+def _comment_xml(comment_id: int, finding: Finding, prefix: str, date: str, initials: str) -> str:
+    message = f"[{finding.rule}] {finding.message}" if finding.rule else finding.message
+    paragraphs = []
+    for n, line in enumerate(_clean(message).split("\n")):
+        mark = f"<{prefix}r><{prefix}annotationRef/></{prefix}r>" if n == 0 else ""
+        paragraphs.append(f'<{prefix}p>{mark}<{prefix}r><{prefix}t xml:space="preserve">'
+                          f'{escape(line)}</{prefix}t></{prefix}r></{prefix}p>')
+    return (f'<{prefix}comment {prefix}id="{comment_id}" {prefix}author={quoteattr(_clean(finding.author))} '
+            f'{prefix}date="{date}" {prefix}initials={quoteattr(initials)}>{"".join(paragraphs)}'
+            f'</{prefix}comment>')
+
+
+def _existing_comment_ids(xml: str, prefix: str) -> List[int]:
+    return [int(value) for value in re.findall(rf'<{prefix}comment\s[^>]*?{prefix}id="(-?\d+)"', xml)]
+
+
+def _comments_part(existing: Optional[str], numbered: List[Tuple[int, Finding]], initials: str) -> str:
+    date = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    if existing is None:
+        body = "".join(_comment_xml(i, finding, "w:", date, initials) for i, finding in numbered)
+        return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<w:comments xmlns:w="{W_NS}">{body}</w:comments>')
+    prefix = namespace_prefix(existing)
+    body = "".join(_comment_xml(i, finding, prefix, date, initials) for i, finding in numbered)
+    if re.search(rf'<{prefix}comments\b[^>]*/>', existing):
+        return re.sub(rf'<({prefix}comments\b[^>]*)/>', lambda m: f"<{m.group(1)}>{body}</{prefix}comments>",
+                      existing, count=1)
+    close = existing.rindex(f"</{prefix}comments>")
+    return existing[:close] + body + existing[close:]
+
+
+def _with_comments_relationship(rels: str) -> str:
+    if COMMENTS_REL in rels:
+        return rels
+    numbers = [int(n) for n in re.findall(r'Id="rId(\d+)"', rels)]
+    rel_id = f"rId{max(numbers, default=0) + 1}"
+    relationship = f'<Relationship Id="{rel_id}" Type="{COMMENTS_REL}" Target="comments.xml"/>'
+    close = rels.rindex("</Relationships>")
+    return rels[:close] + relationship + rels[close:]
+
+
+def _with_comments_content_type(types: str) -> str:
+    if "/word/comments.xml" in types:
+        return types
+    override = f'<Override PartName="/word/comments.xml" ContentType="{COMMENTS_TYPE}"/>'
+    close = types.rindex("</Types>")
+    return types[:close] + override + types[close:]
+
+
+# ============================================================
+# ANNOTATED COPY
+# ============================================================
+
+def annotate_docx(source: str, findings: Iterable[Finding], output: Optional[str] = None,
+                  initials: str = DEFAULT_INITIALS) -> AnnotationResult:
+    """
+    Copy `source` to `output` with every finding as a Word comment.
+
+    Parts other than document.xml, comments.xml, the document
+    relationships and the content types are copied byte for byte.
+    Comments already in the document are kept; new ids follow theirs.
+    """
+    output = output or annotated_path(source)
+    if os.path.abspath(output) == os.path.abspath(source):
+        raise ValueError("La copia anotada no puede sobrescribir el original")
+    findings = list(findings)
+
+    with zipfile.ZipFile(source) as archive:
+        names = set(archive.namelist())
+        if DOCUMENT_PART not in names:
+            raise ValueError(f"No es un documento de Word: falta {DOCUMENT_PART}")
+        existing = archive.read(COMMENTS_PART).decode("utf-8") if COMMENTS_PART in names else None
+        document = archive.read(DOCUMENT_PART).decode("utf-8")
+
+        first_id = 0
+        if existing is not None:
+            first_id = max(_existing_comment_ids(existing, namespace_prefix(existing)), default=-1) + 1
+        numbered = list(enumerate(findings, start=first_id))
+        result = AnnotationResult(output)
+
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as annotated:
+            target = zipfile.ZipInfo(DOCUMENT_PART, archive.getinfo(DOCUMENT_PART).date_time)
+            target.compress_type = zipfile.ZIP_DEFLATED
+            with annotated.open(target, "w") as stream:
+                result.paragraphs = rewrite_document(document, _marks_by_paragraph(numbered),
+                                                     lambda chunk: stream.write(chunk.encode("utf-8")))
+
+            placed = [(i, f) for i, f in numbered if 0 <= f.paragraph < result.paragraphs]
+            result.skipped = [f for _, f in numbered if not 0 <= f.paragraph < result.paragraphs]
+            result.comments = len(placed)
+
+            for info in archive.infolist():
+                if info.filename == DOCUMENT_PART:
+                    continue
+                data = archive.read(info)
+                if info.filename == COMMENTS_PART:
+                    data = _comments_part(existing, placed, initials).encode("utf-8")
+                elif info.filename == DOCUMENT_RELS_PART and existing is None:
+                    data = _with_comments_relationship(data.decode("utf-8")).encode("utf-8")
+                elif info.filename == CONTENT_TYPES_PART and existing is None:
+                    data = _with_comments_content_type(data.decode("utf-8")).encode("utf-8")
+                annotated.writestr(info, data)
+            if existing is None:
+                annotated.writestr(COMMENTS_PART, _comments_part(None, placed, initials))
+
+    return result
+
+
+def read_comments(path: str) -> Dict[int, str]:
+    """Comment id -> text of a .docx (for checking an annotated copy)."""
+    import xml.etree.ElementTree as ET
+    from docx_io import W
+
+    with zipfile.ZipFile(path) as archive:
+        if COMMENTS_PART not in archive.namelist():
+            return {}
+        root = ET.fromstring(archive.read(COMMENTS_PART))
+    return {int(comment.get(f"{W}id")): "\n".join("".join(t.text or "" for t in para.iter(f"{W}t"))
+                                                  for para in comment.iter(f"{W}p"))
+            for comment in root.iter(f"{W}comment")}
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(pages: int = 50, n_comments: int = 500, seed: int = 7):
+    """Hundreds of comments on a synthetic manuscript of `pages` pages (~3.000 characters each)."""
+    import random
+    import tempfile
+    import time
+    import xml.etree.ElementTree as ET
+    from docx_io import W, read_docx
+    from manuscript_generator import ManuscriptSpec, write_manuscript
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "manuscrito.docx")
+        write_manuscript(source, ManuscriptSpec(body_chars=pages * 3000, n_references=120))
+        before = read_docx(source).paragraphs
+        texts = [para.text for para in before]
+        candidates = [i for i, text in enumerate(texts) if text.strip()]
+
+        findings = []
+        for n in range(n_comments):
+            i = rng.choice(candidates)
+            if n % 5 == 0:
+                findings.append(Finding(i, f"Observación {n} sobre el párrafo", rule="prueba.parrafo"))
+            else:
+                start = rng.randrange(len(texts[i]))
+                end = min(len(texts[i]), start + rng.randint(0, 40))
+                findings.append(Finding(i, f"Observación {n}: «{texts[i][start:end]}»", start, end,
+                                        rule="prueba.fragmento"))
+
+        elapsed = time.perf_counter()
+        result = annotate_docx(source, findings)
+        elapsed = time.perf_counter() - elapsed
+
+        # The text must not change and every range must cover its fragment
+        after = read_docx(result.output).paragraphs
+        same_text = [p.text for p in after] == texts
+        with zipfile.ZipFile(result.output) as archive:
+            body = ET.fromstring(archive.read(DOCUMENT_PART))
+        wrong = 0
+        for para in body.iter(f"{W}p"):
+            open_ranges: Dict[str, List[str]] = {}
+            for node in para.iter():
+                if node.tag == f"{W}commentRangeStart":
+                    open_ranges[node.get(f"{W}id")] = []
+                elif node.tag == f"{W}commentRangeEnd":
+                    covered = "".join(open_ranges.pop(node.get(f"{W}id"), []))
+                    finding = findings[int(node.get(f"{W}id"))]
+                    if finding.start is not None and covered != texts[finding.paragraph][finding.start:finding.end]:
+                        wrong += 1
+                elif node.tag == f"{W}t":
+                    for parts in open_ranges.values():
+                        parts.append(node.text or "")
+        comments = read_comments(result.output)
+
+    print("SILVINA - Comentarios de Word sin Word (Benchmark)")
+    print("=" * 60)
+    print(f"  Manuscrito : ~{pages} páginas, {len(texts)} párrafos, {sum(map(len, texts)):,} caracteres")
+    print(f"  Comentarios: {result.comments} escritos, {len(result.skipped)} fuera del documento")
+    print(f"  Tiempo     : {elapsed * 1000:.1f} ms ({result.comments / elapsed:,.0f} comentarios/s)")
+    print(f"  Texto intacto: {'✓' if same_text else '✗'} | rangos exactos: "
+          f"{'✓' if not wrong else f'✗ {wrong} distintos'} | comments.xml: {len(comments)}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
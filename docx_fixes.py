@@ -0,0 +1,418 @@
+# docx_fixes.py
+"""
+SILVINA Editorial Assistant - Corrected Manuscript
+Applies planned span replacements and a paragraph reordering to a copy
+of the .docx in one streaming pass over document.xml, keeping each run's
+formatting; the copy is clean or carries the changes as tracked revisions
+Universidad de la Defensa Nacional
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+import html
+import os
+import re
+import zipfile
+
+from docx_comments import CHUNK, DOCUMENT_PART, TAG, TOKEN, namespace_prefix
+
+
+DEFAULT_AUTHOR = "SILVINA"
+
+# Characters an edit may not cover: they are w:tab / w:br elements, not text
+NOT_TEXT = ("\t", "\x0b")
+
+
+# ============================================================
+# PLAN
+# ============================================================
+
+@dataclass
+class Edit:
+    """Replace characters [start, end) of paragraph `paragraph` (read_docx index) with `replacement`."""
+
+    paragraph: int
+    start: int
+    end: int
+    replacement: str
+    rule: str = ""
+
+
+@dataclass
+class Reorder:
+    """New order of consecutive blocks of top-level paragraphs (the bibliography entries)."""
+
+    blocks: List[Tuple[int, int]]  # (first, last) paragraph of each block, in document order
+    order: List[int]               # block indices in their new order
+
+
+@dataclass
+class FixPlan:
+    """Non-overlapping edits per paragraph, plus an optional reordering."""
+
+    edits: Dict[int, List[Edit]] = field(default_factory=dict)
+    reorder: Optional[Reorder] = None
+    rejected: List[Tuple[Edit, str]] = field(default_factory=list)
+
+    def add(self, edit: Edit, text: str) -> bool:
+        """Plan `edit` on a paragraph whose text is `text`; rejects overlaps and tabs/breaks."""
+        if not 0 <= edit.start < edit.end <= len(text):
+            self.rejected.append((edit, "fuera del párrafo"))
+            return False
+        if any(ch in text[edit.start:edit.end] for ch in NOT_TEXT):
+            self.rejected.append((edit, "cruza una tabulación o un salto de línea"))
+            return False
+        planned = self.edits.setdefault(edit.paragraph, [])
+        k = bisect_left([e.start for e in planned], edit.start)
+        if (k > 0 and planned[k - 1].end > edit.start) or (k < len(planned) and planned[k].start < edit.end):
+            self.rejected.append((edit, "se superpone con otra corrección"))
+            return False
+        planned.insert(k, edit)
+        return True
+
+    def __len__(self):
+        return sum(len(edits) for edits in self.edits.values())
+
+    def by_rule(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for edits in self.edits.values():
+            for edit in edits:
+                counts[edit.rule] = counts.get(edit.rule, 0) + 1
+        return counts
+
+
+def apply_to_text(text: str, edits: List[Edit]) -> str:
+    """The paragraph text once its (sorted, non-overlapping) edits are applied."""
+    pieces, cut = [], 0
+    for edit in edits:
+        pieces.append(text[cut:edit.start])
+        pieces.append(edit.replacement)
+        cut = edit.end
+    pieces.append(text[cut:])
+    return "".join(pieces)
+
+
+@dataclass
+class FixResult:
+    output: str
+    edits: int = 0
+    reordered: bool = False
+    tracked: bool = False
+    paragraphs: int = 0
+    note: str = ""
+
+
+def corrected_path(path: str, tracked: bool = False) -> str:
+    """manuscrito.docx -> manuscrito_corregido.docx (or _con_cambios.docx when tracked)"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{'con_cambios' if tracked else 'corregido'}{ext or '.docx'}"
+
+
+# ============================================================
+# TOKEN REWRITER
+# ============================================================
+
+class _Revisions:
+    """w:ins / w:del markup with document-unique ids."""
+
+    def __init__(self, prefix: str, first_id: int, author: str):
+        self.p = prefix
+        self.next_id = first_id
+        self.attrs = (f'{prefix}author={quoteattr(author)} '
+                      f'{prefix}date="{datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}"')
+
+    def mark(self, kind: str, self_closing: bool = False) -> str:
+        self.next_id += 1
+        return f'<{self.p}{kind} {self.p}id="{self.next_id - 1}" {self.attrs}{"/" if self_closing else ""}>'
+
+
+class _Paragraph:
+    __slots__ = ("index", "edits", "next", "offset", "run_head", "in_run", "head_done", "rpr_depth")
+
+    def __init__(self, index: int, edits: List[Edit]):
+        self.index = index
+        self.edits = edits
+        self.next = 0
+        self.offset = 0
+        self.run_head: List[str] = []  # <w:r> start tag and its rPr
+        self.in_run = False
+        self.head_done = True
+        self.rpr_depth = 0
+
+
+class _Rewriter:
+    """
+    Token-by-token rewrite of document.xml.
+
+    Offsets count w:t characters, w:tab and w:br as read_docx does, so
+    edits planned on read_docx texts land on the same characters. A
+    replacement is written where its edit starts; characters it replaces
+    in later text nodes are dropped there. Tracked edits close the run,
+    add w:del / w:ins runs with the same properties and reopen it.
+    """
+
+    def __init__(self, prefix: str, edits: Dict[int, List[Edit]], revisions: Optional[_Revisions],
+                 first_index: int = 0):
+        p = self.p = prefix
+        self.edits = edits
+        self.revisions = revisions  # None: clean copy
+        self.index = first_index
+        self.stack: List[_Paragraph] = []
+        self.in_text = False
+        self.opened: Optional[int] = None  # paragraph the last token opened
+        self.closed: Optional[int] = None  # paragraph the last token closed
+        self.tag_p, self.tag_r, self.tag_t, self.tag_rpr = f"{p}p", f"{p}r", f"{p}t", f"{p}rPr"
+        self.counted = (f"{p}tab", f"{p}br")
+        self.text_start = f'<{p}t xml:space="preserve">'
+
+    @property
+    def depth(self) -> int:
+        return len(self.stack)
+
+    def feed(self, token: str) -> str:
+        self.opened = self.closed = None
+        if token[0] != "<":
+            if self.in_text and self.stack:
+                text = html.unescape(token)
+                para = self.stack[-1]
+                out = token
+                if para.next < len(para.edits) and para.edits[para.next].start < para.offset + len(text):
+                    out = self._edit(para, text)
+                for open_para in self.stack:
+                    open_para.offset += len(text)
+                return out
+            return token
+        if token[1] in "?!":
+            return token
+
+        tag = TAG.match(token)
+        closing, name, self_closing = tag.group(1), tag.group(2), tag.group(4)
+        para = self.stack[-1] if self.stack else None
+
+        if name == self.tag_p:
+            if closing:
+                self.closed = self.stack.pop().index
+            else:
+                self.opened = self.index
+                if self_closing:
+                    self.closed = self.index
+                else:
+                    self.stack.append(_Paragraph(self.index, self.edits.get(self.index, [])))
+                self.index += 1
+            return token
+        if name == self.tag_t:
+            self.in_text = not closing and not self_closing
+            if self.in_text and para is not None and para.edits and "xml:space" not in token:
+                token = self.text_start  # an edit may leave a space at either end
+        elif name in self.counted and not closing:
+            for open_para in self.stack:
+                open_para.offset += 1
+
+        if para is not None:
+            if name == self.tag_r:
+                if not closing:
+                    para.run_head = [token]
+                para.in_run = not closing and not self_closing
+                para.head_done = not para.in_run
+            elif not para.head_done:
+                if name == self.tag_rpr or para.rpr_depth:
+                    para.run_head.append(token)
+                    if name == self.tag_rpr and not self_closing:
+                        para.rpr_depth += -1 if closing else 1
+                elif not closing:
+                    para.head_done = True
+        return token
+
+    def _edit(self, para: _Paragraph, text: str) -> str:
+        start, end = para.offset, para.offset + len(text)
+        pieces, cut = [], start
+        while para.next < len(para.edits) and para.edits[para.next].start < end:
+            edit = para.edits[para.next]
+            s, e = max(edit.start, start), min(edit.end, end)
+            pieces.append(escape(text[cut - start:s - start]))
+            replacement = edit.replacement if edit.start >= start else ""
+            pieces.append(self._change(para, text[s - start:e - start], replacement))
+            cut = e
+            if edit.end > end:
+                break  # continues in the next text node
+            para.next += 1
+        pieces.append(escape(text[cut - start:]))
+        return "".join(pieces)
+
+    def _change(self, para: _Paragraph, deleted: str, inserted: str) -> str:
+        if self.revisions is None:
+            return escape(inserted)
+        p, rpr = self.p, "".join(para.run_head[1:])
+        out = [f"</{p}t></{p}r>"]
+        if deleted:
+            out.append(f'{self.revisions.mark("del")}<{p}r>{rpr}<{p}delText xml:space="preserve">'
+                       f'{escape(deleted)}</{p}delText></{p}r></{p}del>')
+        if inserted:
+            out.append(f'{self.revisions.mark("ins")}<{p}r>{rpr}{self.text_start}'
+                       f'{escape(inserted)}</{p}t></{p}r></{p}ins>')
+        out.append("".join(para.run_head) + self.text_start)
+        return "".join(out)
+
+
+# ============================================================
+# TRACKED MOVES
+# ============================================================
+
+def _longest_increasing(order: List[int]) -> set:
+    """Blocks that can stay where they are: a longest increasing subsequence of `order`."""
+    tails: List[int] = []       # smallest tail value of an increasing run of each length
+    tail_at: List[int] = []     # position in `order` of that tail
+    previous = [-1] * len(order)
+    for i, value in enumerate(order):
+        k = bisect_left(tails, value)
+        if k == len(tails):
+            tails.append(value)
+            tail_at.append(i)
+        else:
+            tails[k], tail_at[k] = value, i
+        previous[i] = tail_at[k - 1] if k else -1
+    keep, i = set(), tail_at[-1] if tail_at else -1
+    while i >= 0:
+        keep.add(order[i])
+        i = previous[i]
+    return keep
+
+
+def _as_revision(xml: str, prefix: str, kind: str, revisions: _Revisions) -> str:
+    """Every run of `xml` and every paragraph mark as inserted (kind 'ins') or deleted ('del')."""
+    p = prefix
+
+    def run(match):
+        body = match.group(0)
+        if kind == "del":
+            body = re.sub(rf'<(/?){p}t([\s>/])', rf'<\1{p}delText\2', body)
+        return f"{revisions.mark(kind)}{body}</{p}{kind}>"
+
+    def paragraph_mark(match):
+        start, props = match.group(1), match.group(2)
+        mark = revisions.mark(kind, self_closing=True)
+        if props is None:
+            return f"{start}<{p}pPr><{p}rPr>{mark}</{p}rPr></{p}pPr>"
+        if f"<{p}rPr>" in props:
+            return start + props.replace(f"<{p}rPr>", f"<{p}rPr>{mark}", 1)
+        close = re.search(rf'<{p}sectPr|<{p}pPrChange|</{p}pPr>', props).start()
+        return f"{start}{props[:close]}<{p}rPr>{mark}</{p}rPr>{props[close:]}"
+
+    xml = re.sub(rf'<{p}r(?:\s[^>]*?)?(?<!/)>.*?</{p}r>', run, xml, flags=re.S)
+    return re.sub(rf'(<{p}p(?:\s[^>]*?)?(?<!/)>)(<{p}pPr>.*?</{p}pPr>)?', paragraph_mark, xml, flags=re.S)
+
+
+# ============================================================
+# CORRECTED COPY
+# ============================================================
+
+def rewrite_document(xml: str, plan: FixPlan, write, tracked: bool = False,
+                     author: str = DEFAULT_AUTHOR) -> Tuple[int, bool, str]:
+    """
+    Stream `xml` (document.xml) to `write` with the plan applied.
+
+    Blocks to reorder are held back from the first paragraph of the first
+    block to the last paragraph of the last one and written in the new
+    order; tracked copies write each moved block as deleted where it was
+    and inserted where it goes. Returns (paragraphs, reordered, note).
+    """
+    p = namespace_prefix(xml)
+    revisions = None
+    if tracked:
+        ids = [int(n) for n in re.findall(rf'\s{p}id="(\d+)"', xml)]
+        revisions = _Revisions(p, max(ids, default=0) + 1, author)
+    rewriter = _Rewriter(p, plan.edits, revisions)
+
+    reorder = plan.reorder
+    firsts = {first: k for k, (first, _) in enumerate(reorder.blocks)} if reorder else {}
+    last = reorder.blocks[-1][1] if reorder else -1
+    held: Dict[int, Tuple[List[str], List[str]]] = {}  # block -> (original tokens, rewritten tokens)
+    current: Optional[int] = None
+    reordered, note = False, ""
+
+    buffer: List[str] = []
+    size = 0
+    for match in TOKEN.finditer(xml):
+        token = match.group(0)
+        top_level = rewriter.depth == 0
+        out = rewriter.feed(token)
+        if top_level and rewriter.opened in firsts:
+            current = firsts[rewriter.opened]
+            held[current] = ([], [])
+        if current is not None:
+            held[current][0].append(token)
+            held[current][1].append(out)
+            if rewriter.closed == last and rewriter.depth == 0:
+                out, reordered, note = _reordered(held, reorder, p, revisions, plan.edits)
+                current = None
+            else:
+                continue
+        buffer.append(out)
+        size += len(out)
+        if size >= CHUNK:
+            write("".join(buffer))
+            buffer, size = [], 0
+    if buffer:
+        write("".join(buffer))
+    return rewriter.index, reordered, note
+
+
+def _reordered(held, reorder: Reorder, prefix: str, revisions: Optional[_Revisions],
+               edits: Dict[int, List[Edit]]) -> Tuple[str, bool, str]:
+    """The held blocks in their new order, or as they were when they cannot be moved safely."""
+    blocks = range(len(reorder.blocks))
+    rewritten = {k: "".join(held[k][1]) for k in held}
+    if len(held) != len(reorder.blocks):
+        return "".join(rewritten[k] for k in sorted(held)), False, "bloques anidados: orden sin cambios"
+    if any(f"<{prefix}sectPr" in rewritten[k] for k in blocks):
+        return "".join(rewritten[k] for k in blocks), False, "salto de sección en la bibliografía: orden sin cambios"
+    if revisions is None:
+        return "".join(rewritten[k] for k in reorder.order), True, ""
+
+    # Tracked: blocks outside the longest increasing run move (deleted here, inserted there)
+    stay = _longest_increasing(reorder.order)
+    out: List[str] = []
+    pending_deleted = [k for k in blocks if k not in stay]
+    for k in reorder.order:
+        if k in stay:
+            # Moved blocks that stood before this one are deleted just ahead of it
+            while pending_deleted and pending_deleted[0] < k:
+                out.append(_as_revision("".join(held[pending_deleted.pop(0)][0]), prefix, "del", revisions))
+            out.append(rewritten[k])
+        else:
+            clean = _Rewriter(prefix, edits, None, reorder.blocks[k][0])
+            out.append(_as_revision("".join(clean.feed(token) for token in held[k][0]), prefix, "ins", revisions))
+    out.extend(_as_revision("".join(held[k][0]), prefix, "del", revisions) for k in pending_deleted)
+    return "".join(out), True, ""
+
+
+def apply_fixes(source: str, plan: FixPlan, output: Optional[str] = None, tracked: bool = False,
+                author: str = DEFAULT_AUTHOR) -> FixResult:
+    """
+    Copy `source` to `output` with `plan` applied.
+
+    Only document.xml changes; every other part is copied byte for byte.
+    """
+    output = output or corrected_path(source, tracked)
+    if os.path.abspath(output) == os.path.abspath(source):
+        raise ValueError("La copia corregida no puede sobrescribir el original")
+
+    with zipfile.ZipFile(source) as archive:
+        if DOCUMENT_PART not in archive.namelist():
+            raise ValueError(f"No es un documento de Word: falta {DOCUMENT_PART}")
+        document = archive.read(DOCUMENT_PART).decode("utf-8")
+        result = FixResult(output, len(plan), tracked=tracked)
+
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as corrected:
+            target = zipfile.ZipInfo(DOCUMENT_PART, archive.getinfo(DOCUMENT_PART).date_time)
+            target.compress_type = zipfile.ZIP_DEFLATED
+            with corrected.open(target, "w") as stream:
+                result.paragraphs, result.reordered, result.note = rewrite_document(
+                    document, plan, lambda chunk: stream.write(chunk.encode("utf-8")), tracked, author)
+            for info in archive.infolist():
+                if info.filename != DOCUMENT_PART:
+                    corrected.writestr(info, archive.read(info))
+    return result
@@ -0,0 +1,245 @@
+# docx_io.py
+"""
+SILVINA Editorial Assistant - Minimal .docx I/O
+Reads paragraphs, styles, indents and footnotes straight from the OOXML
+package, and writes simple manuscripts, without Word or extra packages
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+import xml.etree.ElementTree as ET
+import zipfile
+
+from reference_segmenter import ParagraphInfo
+
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W = f"{{{W_NS}}}"
+TWIPS_PER_POINT = 20
+
+
+# ============================================================
+# READER
+# ============================================================
+
+@dataclass
+class DocxContent:
+    """Body paragraphs plus footnote characters anchored in each one."""
+
+    paragraphs: List[ParagraphInfo]
+    footnote_chars: List[int]
+    footnotes: Dict[str, str] = field(default_factory=dict)
+    footnote_refs: List[Tuple[int, str]] = field(default_factory=list)  # (paragraph, note text)
+    endnote_refs: List[Tuple[int, str]] = field(default_factory=list)
+
+
+def _style_names(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """styleId -> display name ('Heading1' -> 'Heading 1')."""
+    try:
+        root = ET.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return {}
+    names = {}
+    for style in root.iter(f"{W}style"):
+        name = style.find(f"{W}name")
+        if name is not None:
+            value = name.get(f"{W}val", "")
+            # Built-in names are stored lowercase ('heading 1'); Word shows them capitalized
+            names[style.get(f"{W}styleId")] = value[:1].upper() + value[1:]
+    return names
+
+
+def _paragraph_text(para: ET.Element) -> str:
+    parts = []
+    for node in para.iter():
+        if node.tag == f"{W}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{W}tab":
+            parts.append("\t")
+        elif node.tag == f"{W}br":
+            parts.append("\x0b")  # manual line break, as in Word's Range.Text
+    return "".join(parts)
+
+
+def _footnote_texts(archive: zipfile.ZipFile, part: str, tag: str) -> Dict[str, str]:
+    try:
+        root = ET.fromstring(archive.read(part))
+    except KeyError:
+        return {}
+    return {note.get(f"{W}id"): " ".join(_paragraph_text(p) for p in note.iter(f"{W}p"))
+            for note in root.iter(f"{W}{tag}") if note.get(f"{W}type") is None}
+
+
+def _paragraph_info(para: ET.Element, index: int, styles: Dict[str, str]) -> ParagraphInfo:
+    """Text, style name and indents (in points) of a <w:p>."""
+    props = para.find(f"{W}pPr")
+    style, first_line, left = "", 0.0, 0.0
+    if props is not None:
+        style_el = props.find(f"{W}pStyle")
+        if style_el is not None:
+            style_id = style_el.get(f"{W}val")
+            style = styles.get(style_id, style_id)
+        ind = props.find(f"{W}ind")
+        if ind is not None:
+            left = int(ind.get(f"{W}left", ind.get(f"{W}start", 0))) / TWIPS_PER_POINT
+            if ind.get(f"{W}hanging"):
+                first_line = -int(ind.get(f"{W}hanging")) / TWIPS_PER_POINT
+            elif ind.get(f"{W}firstLine"):
+                first_line = int(ind.get(f"{W}firstLine")) / TWIPS_PER_POINT
+    return ParagraphInfo(_paragraph_text(para), index, style, first_line, left)
+
+
+def read_docx(path: str) -> DocxContent:
+    """
+    Read a .docx into ParagraphInfo records (text, style, indents).
+
+    Indents are converted from twips to points; a hanging indent becomes
+    a negative first-line indent, as Word's COM API reports it.
+    """
+    with zipfile.ZipFile(path) as archive:
+        styles = _style_names(archive)
+        footnotes = _footnote_texts(archive, "word/footnotes.xml", "footnote")
+        endnotes = _footnote_texts(archive, "word/endnotes.xml", "endnote")
+        body = ET.fromstring(archive.read("word/document.xml")).find(f"{W}body")
+
+    paragraphs: List[ParagraphInfo] = []
+    footnote_chars: List[int] = []
+    footnote_refs: List[Tuple[int, str]] = []
+    endnote_refs: List[Tuple[int, str]] = []
+    for index, para in enumerate(body.iter(f"{W}p")):
+        notes = 0
+        for tag, texts, refs in (("footnoteReference", footnotes, footnote_refs),
+                                 ("endnoteReference", endnotes, endnote_refs)):
+            for ref in para.iter(f"{W}{tag}"):
+                text = texts.get(ref.get(f"{W}id"), "")
+                refs.append((index, text))
+                notes += len(text)
+
+        paragraphs.append(_paragraph_info(para, index, styles))
+        footnote_chars.append(notes)
+
+    return DocxContent(paragraphs, footnote_chars, footnotes, footnote_refs, endnote_refs)
+
+
+def iter_docx(path: str) -> Iterator[ParagraphInfo]:
+    """
+    Paragraphs of a .docx one at a time, as read_docx numbers them.
+
+    document.xml is parsed incrementally from the archive and each block
+    of the body is dropped once its paragraphs are yielded, so memory
+    stays bounded however long the document is. Footnotes are not read.
+    """
+    with zipfile.ZipFile(path) as archive:
+        styles = _style_names(archive)
+        with archive.open("word/document.xml") as xml:
+            depth, count, body = 0, 0, None
+            indices: Dict[ET.Element, int] = {}
+            pending: List[ParagraphInfo] = []
+            for event, element in ET.iterparse(xml, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if element.tag == f"{W}p":
+                        indices[element] = count  # numbered in start-tag order, like body.iter()
+                        count += 1
+                    elif element.tag == f"{W}body":
+                        body = element
+                    continue
+                depth -= 1
+                if element.tag == f"{W}p":
+                    pending.append(_paragraph_info(element, indices.pop(element), styles))
+                if depth == 2 and body is not None:  # a block of the body (paragraph, table) is complete
+                    pending.sort(key=lambda para: para.index)
+                    yield from pending
+                    pending.clear()
+                    body.clear()
+
+
+# ============================================================
+# WRITER
+# ============================================================
+
+@dataclass
+class DocxParagraph:
+    """Paragraph to write: text, style id, optional hanging indent and footnotes."""
+
+    text: str
+    style: Optional[str] = None  # 'Title', 'Heading1', 'Heading2'
+    hanging_indent: bool = False
+    footnotes: List[str] = field(default_factory=list)
+
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+<Override PartName="/word/footnotes.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"/>
+</Types>"""
+
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footnotes" Target="footnotes.xml"/>
+</Relationships>"""
+
+STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NS}">
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:pPr><w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:sz w:val="28"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/><w:pPr><w:outlineLvl w:val="1"/></w:pPr><w:rPr><w:b/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="FootnoteText"><w:name w:val="footnote text"/><w:basedOn w:val="Normal"/><w:rPr><w:sz w:val="20"/></w:rPr></w:style>
+<w:style w:type="character" w:styleId="FootnoteReference"><w:name w:val="footnote reference"/><w:rPr><w:vertAlign w:val="superscript"/></w:rPr></w:style>
+</w:styles>"""
+
+
+def _run(text: str) -> str:
+    pieces = text.split("\x0b")
+    runs = "<w:br/>".join(f'<w:t xml:space="preserve">{escape(piece)}</w:t>' for piece in pieces)
+    return f"<w:r>{runs}</w:r>"
+
+
+def write_docx(path: str, paragraphs: Sequence[DocxParagraph]):
+    """Write a .docx with styles, hanging indents and footnotes."""
+    body: List[str] = []
+    notes: List[Tuple[int, str]] = []
+
+    for para in paragraphs:
+        props = ""
+        if para.style:
+            props += f'<w:pStyle w:val="{para.style}"/>'
+        if para.hanging_indent:
+            props += '<w:ind w:left="720" w:hanging="720"/>'
+        xml = f"<w:p>{'<w:pPr>' + props + '</w:pPr>' if props else ''}{_run(para.text)}"
+        for note in para.footnotes:
+            note_id = len(notes) + 1
+            notes.append((note_id, note))
+            xml += (f'<w:r><w:rPr><w:rStyle w:val="FootnoteReference"/></w:rPr>'
+                    f'<w:footnoteReference w:id="{note_id}"/></w:r>')
+        body.append(xml + "</w:p>")
+
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<w:document xmlns:w="{W_NS}"><w:body>{"".join(body)}'
+                f'<w:sectPr/></w:body></w:document>')
+    footnotes = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:footnotes xmlns:w="{W_NS}">'
+                 '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+                 '<w:footnote w:type="continuationSeparator" w:id="0"><w:p><w:r><w:continuationSeparator/></w:r></w:p></w:footnote>'
+                 + "".join(f'<w:footnote w:id="{note_id}"><w:p><w:pPr><w:pStyle w:val="FootnoteText"/></w:pPr>'
+                           f'{_run(text)}</w:p></w:footnote>' for note_id, text in notes)
+                 + "</w:footnotes>")
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", PACKAGE_RELS)
+        archive.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", STYLES)
+        archive.writestr("word/footnotes.xml", footnotes)
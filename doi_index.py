@@ -0,0 +1,381 @@
+# doi_index.py
+"""
+SILVINA Editorial Assistant - Offline DOI Verification
+Local bulk metadata index (Crossref-style JSON Lines) with a Bloom-filter front
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import struct
+import sys
+import threading
+
+from reference_parser import normalize_name, normalize_title, parse_reference
+
+
+# Crossref's recommended pattern for modern DOIs
+VALID_DOI_PATTERN = re.compile(r'^10\.\d{4,9}/[-._;()/:a-z0-9<>\[\]]+$', re.IGNORECASE)
+
+DOI_PREFIXES = ('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/',
+                'http://dx.doi.org/', 'doi.org/', 'doi:')
+
+TITLE_SIMILARITY_THRESHOLD = 0.80
+SQLITE_IN_CHUNK = 500
+INSERT_BATCH = 5000
+
+
+# ============================================================
+# DOI HELPERS
+# ============================================================
+
+def normalize_doi(raw: str) -> str:
+    """Canonical form of a DOI: no resolver prefix, lowercase, no trailing dot."""
+    doi = raw.strip()
+    lowered = doi.lower()
+    for prefix in DOI_PREFIXES:
+        if lowered.startswith(prefix):
+            doi = doi[len(prefix):]
+            break
+    return doi.rstrip('.,;').lower()
+
+
+def is_valid_doi(doi: str) -> bool:
+    """Check that a (normalized) DOI is well-formed."""
+    return bool(VALID_DOI_PATTERN.match(doi))
+
+
+# ============================================================
+# BLOOM FILTER
+# ============================================================
+
+class BloomFilter:
+    """
+    Compact probabilistic set of DOIs.
+
+    A negative answer is definitive, so unknown DOIs are rejected
+    without touching the on-disk index.
+    """
+
+    HEADER = struct.Struct('<4sQI')
+    MAGIC = b'SBF1'
+
+    def __init__(self, size_bits: int, num_hashes: int, bits: Optional[bytearray] = None):
+        self.size_bits = max(8, size_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        """Size the filter for `capacity` items at the given false-positive rate."""
+        capacity = max(1, capacity)
+        size_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits, num_hashes)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size_bits, self.num_hashes))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path) -> "BloomFilter":
+        with open(path, 'rb') as f:
+            magic, size_bits, num_hashes = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != cls.MAGIC:
+                raise ValueError(f"Archivo Bloom inválido: {path}")
+            bits = bytearray(f.read())
+        return cls(size_bits, num_hashes, bits)
+
+
+# ============================================================
+# METADATA RECORDS
+# ============================================================
+
+@dataclass
+class DoiRecord:
+    """Metadata stored in the index for one DOI."""
+
+    doi: str
+    authors: List[str]
+    year: Optional[str]
+    title: Optional[str]
+
+
+def _record_from_crossref(item: dict) -> Optional[DoiRecord]:
+    """Convert one Crossref-style JSON object into a DoiRecord."""
+    doi = item.get('DOI') or item.get('doi')
+    if not doi:
+        return None
+
+    authors = []
+    for author in item.get('author', []) or []:
+        name = author.get('family') or author.get('name')
+        if name:
+            authors.append(name)
+
+    year = None
+    for date_key in ('issued', 'published', 'published-print', 'published-online', 'created'):
+        parts = (item.get(date_key) or {}).get('date-parts') or []
+        if parts and parts[0] and parts[0][0]:
+            year = str(parts[0][0])
+            break
+
+    title = item.get('title')
+    if isinstance(title, list):
+        title = title[0] if title else None
+
+    return DoiRecord(doi=normalize_doi(doi), authors=authors, year=year, title=title)
+
+
+# ============================================================
+# ON-DISK INDEX
+# ============================================================
+
+class DoiIndex:
+    """
+    On-disk DOI metadata index (SQLite) with an in-memory Bloom filter.
+
+    Files:
+        <path>        SQLite table doi -> authors, year, title
+        <path>.bloom  Serialized BloomFilter over every indexed DOI
+
+    One index can be shared by threads (rules run on a pool, the service
+    on workers): each thread gets its own read-only connection on first
+    use, and all of them share the loaded filter.
+    """
+
+    def __init__(self, path, bloom: Optional[BloomFilter] = None):
+        """`bloom` reuses a filter already loaded for another index on the same files."""
+        self.path = Path(path)
+        bloom_path = self.path.with_name(self.path.name + '.bloom')
+        if not self.path.exists() or not bloom_path.exists():
+            raise FileNotFoundError(f"Índice DOI no encontrado: {self.path}")
+        self.bloom = bloom or BloomFilter.load(bloom_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Read-only connection of the calling thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only this thread queries it; close() may run on another one
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @classmethod
+    def build(cls, jsonl_path, index_path, error_rate: float = 0.001) -> "DoiIndex":
+        """
+        Build the index from a Crossref-style JSON Lines snapshot.
+
+        Args:
+            jsonl_path: Snapshot file, one JSON work per line
+            index_path: Destination SQLite file (overwritten)
+            error_rate: Bloom filter false-positive rate
+
+        Returns:
+            DoiIndex opened on the new files
+        """
+        jsonl_path = Path(jsonl_path)
+        index_path = Path(index_path)
+        if index_path.exists():
+            index_path.unlink()
+
+        # Count lines first so the Bloom filter is sized once
+        with open(jsonl_path, 'rb') as f:
+            capacity = sum(1 for _ in f)
+        bloom = BloomFilter.for_capacity(capacity, error_rate)
+
+        conn = sqlite3.connect(index_path)
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute(
+            'CREATE TABLE works (doi TEXT PRIMARY KEY, authors TEXT, year TEXT, title TEXT) '
+            'WITHOUT ROWID'
+        )
+
+        batch = []
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = _record_from_crossref(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+                if record is None:
+                    continue
+                bloom.add(record.doi)
+                batch.append((record.doi, '|'.join(record.authors), record.year, record.title))
+                if len(batch) >= INSERT_BATCH:
+                    conn.executemany('INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?)', batch)
+                    batch.clear()
+        if batch:
+            conn.executemany('INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?)', batch)
+        conn.commit()
+        conn.close()
+
+        bloom.save(index_path.with_name(index_path.name + '.bloom'))
+        return cls(index_path)
+
+    def lookup_many(self, dois: Iterable[str]) -> Dict[str, DoiRecord]:
+        """Fetch records for many normalized DOIs in as few queries as possible."""
+        candidates = sorted({doi for doi in dois if doi in self.bloom})
+        found = {}
+        for start in range(0, len(candidates), SQLITE_IN_CHUNK):
+            chunk = candidates[start:start + SQLITE_IN_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT doi, authors, year, title FROM works WHERE doi IN ({placeholders})',
+                chunk
+            )
+            for doi, authors, year, title in rows:
+                found[doi] = DoiRecord(
+                    doi=doi,
+                    authors=authors.split('|') if authors else [],
+                    year=year,
+                    title=title
+                )
+        return found
+
+    def close(self):
+        """Close the connections of every thread."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# ============================================================
+# BIBLIOGRAPHY VERIFICATION
+# ============================================================
+
+@dataclass
+class DoiVerification:
+    """Verification result for one reference."""
+
+    position: int
+    doi: Optional[str]
+    status: str  # 'sin_doi' | 'mal_formado' | 'desconocido' | 'coincide' | 'discrepancia'
+    mismatches: List[str] = field(default_factory=list)
+    record: Optional[DoiRecord] = None
+
+
+def compare_metadata(parsed, record: DoiRecord) -> List[str]:
+    """List the differences between a parsed reference and index metadata."""
+    mismatches = []
+
+    if parsed.year and record.year and parsed.year != record.year:
+        mismatches.append(f"Año citado {parsed.year}, registrado {record.year}")
+
+    if parsed.first_author and record.authors:
+        cited = normalize_name(parsed.first_author)
+        registered = {normalize_name(a) for a in record.authors}
+        if cited not in registered:
+            mismatches.append(
+                f"Autor citado '{parsed.first_author}' no figura entre "
+                f"{', '.join(record.authors[:3])}"
+            )
+
+    if parsed.title and record.title:
+        cited_title = normalize_title(parsed.title)
+        registered_title = normalize_title(record.title)
+        if cited_title not in registered_title and registered_title not in cited_title:
+            similarity = SequenceMatcher(None, cited_title, registered_title).ratio()
+            if similarity < TITLE_SIMILARITY_THRESHOLD:
+                mismatches.append(f"Título registrado: «{record.title[:70]}»")
+
+    return mismatches
+
+
+def verify_bibliography(references, index: DoiIndex) -> List[DoiVerification]:
+    """
+    Verify every DOI of a bibliography against the local index in one batch.
+
+    Args:
+        references: Reference objects (anything with a `.text`) or plain strings
+        index: Open DoiIndex
+
+    Returns:
+        One DoiVerification per reference, in bibliography order
+    """
+    parsed_refs = [parse_reference(getattr(ref, 'text', ref)) for ref in references]
+    normalized = [normalize_doi(p.doi) if p.doi else None for p in parsed_refs]
+    records = index.lookup_many(doi for doi in normalized if doi and is_valid_doi(doi))
+
+    results = []
+    for position, (parsed, doi) in enumerate(zip(parsed_refs, normalized), 1):
+        if doi is None:
+            results.append(DoiVerification(position, None, 'sin_doi'))
+        elif not is_valid_doi(doi):
+            results.append(DoiVerification(position, doi, 'mal_formado'))
+        elif doi not in records:
+            results.append(DoiVerification(position, doi, 'desconocido'))
+        else:
+            record = records[doi]
+            mismatches = compare_metadata(parsed, record)
+            status = 'discrepancia' if mismatches else 'coincide'
+            results.append(DoiVerification(position, doi, status, mismatches, record))
+    return results
+
+
+# ============================================================
+# MAIN ENTRY POINT
+# ============================================================
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        print(f"🔨 Construyendo índice DOI desde {sys.argv[2]}...")
+        with DoiIndex.build(sys.argv[2], sys.argv[3]) as built:
+            total = built.conn.execute('SELECT COUNT(*) FROM works').fetchone()[0]
+        print(f"✅ Índice creado: {sys.argv[3]} ({total:,} DOI)")
+
+    elif len(sys.argv) == 4 and sys.argv[1] == "verify":
+        with open(sys.argv[3], 'r', encoding='utf-8') as f:
+            refs = [line.strip() for line in f if line.strip()]
+        with DoiIndex(sys.argv[2]) as idx:
+            for result in verify_bibliography(refs, idx):
+                marker = '✅' if result.status in ('coincide', 'sin_doi') else '⚠️'
+                print(f"{result.position}. {marker} {result.status} {result.doi or ''}")
+                for mismatch in result.mismatches:
+                    print(f"   • {mismatch}")
+
+    else:
+        print("💡 Comandos disponibles:")
+        print("   python doi_index.py build snapshot.jsonl indice_doi.sqlite")
+        print("   python doi_index.py verify indice_doi.sqlite referencias.txt")
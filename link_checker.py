@@ -0,0 +1,300 @@
+# link_checker.py
+"""
+SILVINA Editorial Assistant - Link Checker
+Asynchronous URL liveness checks with pooling, per-host limits and a TTL cache
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+import asyncio
+import sqlite3
+import sys
+import time
+
+# Try to import aiohttp, but don't fail if not available
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+
+DEFAULT_CACHE_TTL = 7 * 24 * 3600  # one week
+USER_AGENT = "Silvina-Editorial-LinkChecker/0.6"
+
+# Servers that refuse HEAD often answer these; retry with GET
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 429, 500, 501, 503}
+
+
+# ============================================================
+# RESULT DATA CLASS
+# ============================================================
+
+@dataclass
+class LinkResult:
+    """Outcome of checking one URL."""
+
+    url: str
+    ok: bool
+    status: Optional[int] = None
+    error: Optional[str] = None
+    method: str = "HEAD"
+    checked_at: float = 0.0
+    from_cache: bool = False
+
+    def __repr__(self):
+        marker = "✅" if self.ok else "❌"
+        detail = self.status if self.status is not None else self.error
+        return f"{marker} {self.url} [{detail}]"
+
+
+# ============================================================
+# ON-DISK TTL CACHE
+# ============================================================
+
+class LinkCache:
+    """SQLite cache of link results so shared links are checked once."""
+
+    def __init__(self, path, ttl: float = DEFAULT_CACHE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS links ('
+            'url TEXT PRIMARY KEY, ok INTEGER, status INTEGER, error TEXT, '
+            'method TEXT, checked_at REAL)'
+        )
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, LinkResult]:
+        """Return fresh cached results for the given URLs."""
+        urls = list(urls)
+        cutoff = time.time() - self.ttl
+        found = {}
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT url, ok, status, error, method, checked_at FROM links '
+                f'WHERE url IN ({placeholders}) AND checked_at >= ?',
+                (*chunk, cutoff)
+            )
+            for url, ok, status, error, method, checked_at in rows:
+                found[url] = LinkResult(url, bool(ok), status, error, method, checked_at, True)
+        return found
+
+    def put_many(self, results: Iterable[LinkResult]):
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?, ?, ?)',
+            [(r.url, int(r.ok), r.status, r.error, r.method, r.checked_at) for r in results]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================================
+# LINK CHECKER
+# ============================================================
+
+class LinkChecker:
+    """
+    Checks many URLs concurrently.
+
+    One pooled aiohttp session is shared by all requests. Each host gets
+    at most `per_host` simultaneous requests, HEAD is tried first and GET
+    is used as fallback for servers that reject HEAD.
+    """
+
+    def __init__(self, concurrency: int = 20, per_host: int = 4, timeout: float = 10.0,
+                 cache_path=None, cache_ttl: float = DEFAULT_CACHE_TTL):
+        if not HAS_AIOHTTP:
+            raise ImportError("aiohttp no está instalado. Instalar con: pip install aiohttp")
+
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+
+    async def _request(self, session, method: str, url: str) -> int:
+        async with session.request(method, url, allow_redirects=True) as response:
+            if method == "GET":
+                # Read a little so servers that stream bodies are released cleanly
+                await response.content.read(1024)
+            return response.status
+
+    async def _check_one(self, session, host_limits: Dict[str, asyncio.Semaphore],
+                         url: str) -> LinkResult:
+        host = urlsplit(url).netloc.lower()
+        semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        async with semaphore:
+            result = LinkResult(url=url, ok=False, checked_at=time.time())
+            try:
+                status = await self._request(session, "HEAD", url)
+                if status in HEAD_FALLBACK_STATUSES:
+                    result.method = "GET"
+                    status = await self._request(session, "GET", url)
+                result.status = status
+                result.ok = 200 <= status < 400
+            except asyncio.TimeoutError:
+                result.error = "timeout"
+            except aiohttp.ClientError as e:
+                result.error = type(e).__name__
+            except ValueError as e:
+                result.error = f"URL inválida: {e}"
+            return result
+
+    async def check_all(self, urls: Iterable[str]) -> Dict[str, LinkResult]:
+        """
+        Check every distinct URL once.
+
+        Args:
+            urls: URLs to check (duplicates are checked once)
+
+        Returns:
+            dict mapping each URL to its LinkResult
+        """
+        unique = list(dict.fromkeys(urls))
+        cache = LinkCache(self.cache_path, self.cache_ttl) if self.cache_path else None
+
+        results = cache.get_many(unique) if cache else {}
+        pending = [url for url in unique if url not in results]
+
+        if pending:
+            connector = aiohttp.TCPConnector(limit=self.concurrency,
+                                             limit_per_host=self.per_host)
+            # Per socket operation, not `total`: that clock also runs while a
+            # request waits for a free connection in the pool
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+            host_limits: Dict[str, asyncio.Semaphore] = {}
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                             headers={"User-Agent": USER_AGENT}) as session:
+                checked = await asyncio.gather(
+                    *(self._check_one(session, host_limits, url) for url in pending)
+                )
+            if cache:
+                # Transport errors may be transient, so only HTTP answers are cached
+                cache.put_many(r for r in checked if r.status is not None)
+            results.update((r.url, r) for r in checked)
+
+        if cache:
+            cache.close()
+        return {url: results[url] for url in unique}
+
+    def check_urls(self, urls: Iterable[str]) -> Dict[str, LinkResult]:
+        """Synchronous wrapper around check_all()."""
+        return asyncio.run(self.check_all(urls))
+
+
+# ============================================================
+# TEST MODE (local stand-in server)
+# ============================================================
+
+def start_standin_server():
+    """
+    Start a local HTTP server that mimics common link behaviours.
+
+    Routes: /ok (200), /missing (404), /nohead (405 on HEAD, 200 on GET),
+    /redirect (301 -> /ok), /slow (sleeps 3 s), /delay (sleeps 0.3 s).
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import threading
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        def _respond(self, send_body: bool):
+            path = urlsplit(self.path).path
+            if path == "/ok":
+                status = 200
+            elif path == "/nohead":
+                status = 200 if send_body else 405
+            elif path == "/redirect":
+                self.send_response(301)
+                self.send_header("Location", "/ok")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            elif path == "/slow":
+                time.sleep(3)
+                status = 200
+            elif path == "/delay":
+                time.sleep(0.3)
+                status = 200
+            else:
+                status = 404
+            body = b"ok" if status == 200 else b"error"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self._respond(send_body=False)
+
+        def do_GET(self):
+            self._respond(send_body=True)
+
+        def log_message(self, format, *args):
+            pass
+
+    class StandInServer(ThreadingHTTPServer):
+        # The default backlog of 5 drops bursts of concurrent connects, which
+        # then time out on the client side like a dead host would
+        request_queue_size = 128
+
+    server = StandInServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from silvina.documents import CACHE_DIR
+
+        checker = LinkChecker(cache_path=Path(CACHE_DIR) / "enlaces.sqlite")
+        for result in checker.check_urls(sys.argv[1:]).values():
+            print(f"  {result}")
+        sys.exit(0)
+
+    print("SILVINA - Link Checker (Test Mode, servidor local)")
+    print("=" * 50)
+
+    server, base = start_standin_server()
+    urls = [f"{base}/ok", f"{base}/missing", f"{base}/nohead",
+            f"{base}/redirect", f"{base}/slow", f"{base}/ok"]
+    urls += [f"{base}/ok?n={i}" for i in range(50)]
+
+    checker = LinkChecker(per_host=8, timeout=1.0)
+    start = time.perf_counter()
+    results = checker.check_urls(urls)
+    elapsed = time.perf_counter() - start
+
+    for result in list(results.values())[:5]:
+        print(f"  {result} via {result.method}")
+    assert len(results) == 55, "las URL repetidas se verifican una vez"
+    assert results[f"{base}/ok"].ok and results[f"{base}/ok"].status == 200
+    assert not results[f"{base}/missing"].ok and results[f"{base}/missing"].status == 404
+    assert results[f"{base}/nohead"].ok and results[f"{base}/nohead"].method == "GET"
+    assert results[f"{base}/redirect"].ok and results[f"{base}/redirect"].status == 200, "redirección seguida"
+    assert not results[f"{base}/slow"].ok and results[f"{base}/slow"].error == "timeout"
+    assert all(results[f"{base}/ok?n={i}"].ok for i in range(50))
+    print(f"\n✓ {len(results)} enlaces distintos verificados en {elapsed:.2f} s")
+
+    # 20 requests of 0.3 s through 2 connections take ~3 s, longer than the
+    # 1 s timeout: waiting for a free connection must not count against it
+    queued = [f"{base}/delay?n={i}" for i in range(20)]
+    start = time.perf_counter()
+    results = LinkChecker(concurrency=2, per_host=8, timeout=1.0).check_urls(queued)
+    elapsed = time.perf_counter() - start
+    assert all(result.ok for result in results.values()), [r for r in results.values() if not r.ok]
+    print(f"✓ {len(queued)} enlaces en cola con 2 conexiones: {elapsed:.2f} s sin timeouts")
+    server.shutdown()
@@ -0,0 +1,227 @@
+# manuscript_generator.py
+"""
+SILVINA Editorial Assistant - Synthetic Manuscript Generator
+Realistic Spanish .docx manuscripts with controllable size, references,
+citation density, footnotes, IMRyD headings and injected APA errors
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+import json
+import random
+
+from docx_io import DocxParagraph, write_docx
+
+
+# ============================================================
+# VOCABULARY
+# ============================================================
+
+SURNAMES = ["Álvarez", "Benítez", "Castro", "Díaz", "Echeverría", "Fernández", "Giménez",
+            "Herrera", "Ibáñez", "Juárez", "Lanús", "Martínez", "Núñez", "Ortiz", "Peña",
+            "Quiroga", "Ríos", "Sánchez", "Toledo", "Urquiza", "Vélez", "Zárate",
+            "De la Fuente", "Pérez-Sánchez", "López", "García", "Muñoz", "Acuña"]
+ORGANIZATIONS = ["Ministerio de Defensa", "Estado Mayor Conjunto", "Universidad de la Defensa Nacional"]
+JOURNALS = ["Revista Visión Conjunta", "Revista de la Escuela Superior de Guerra",
+            "Defensa Nacional", "Cuadernos de Estrategia"]
+TOPICS = ["la ciberdefensa", "la logística operacional", "la disuasión convencional",
+          "el planeamiento estratégico", "la interoperabilidad", "la vigilancia del Atlántico Sur",
+          "la conducción conjunta", "el adiestramiento combinado"]
+SENTENCES = [
+    "El análisis de {topic} exige considerar el contexto regional.",
+    "La doctrina vigente sobre {topic} presenta vacíos conceptuales.",
+    "Los resultados sugieren que {topic} depende de capacidades específicas.",
+    "Diversos autores coinciden en que {topic} requiere personal especializado.",
+    "La experiencia reciente muestra que {topic} evoluciona con rapidez.",
+    "Este enfoque permite evaluar {topic} con criterios verificables.",
+]
+FOOTNOTES = [
+    "Véase el Anexo I para el detalle metodológico.",
+    "Se utiliza la terminología del glosario conjunto vigente.",
+    "Los datos corresponden al último período disponible.",
+]
+
+IMRYD_HEADINGS = ["Introducción", "Metodología", "Resultados", "Discusión", "Conclusiones"]
+ESSAY_HEADINGS = ["Antecedentes", "Desarrollo", "Perspectivas", "Consideraciones finales"]
+
+APA_ERRORS = ("ampersand", "sin_anio", "recuperado_de", "autor_completo",
+              "comillas_inglesas", "duplicado", "desorden")
+
+
+# ============================================================
+# CONFIGURATION AND MANIFEST
+# ============================================================
+
+@dataclass
+class ManuscriptSpec:
+    """What to generate; every knob is independent."""
+
+    body_chars: int = 40_000
+    n_references: int = 40
+    citation_density: float = 0.35   # share of sentences that cite
+    footnote_ratio: float = 0.1      # share of paragraphs with a footnote
+    imryd: bool = True
+    error_rate: float = 0.1          # share of references with an injected APA error
+    seed: int = 1
+    title: str = "Capacidades de defensa en el Atlántico Sur"
+
+
+@dataclass
+class Manifest:
+    """Ground truth of a generated manuscript, written next to the .docx."""
+
+    spec: Dict
+    paragraphs: int = 0
+    body_chars: int = 0
+    citations: int = 0
+    footnotes: int = 0
+    references: List[str] = field(default_factory=list)
+    injected_errors: List[Tuple[int, str]] = field(default_factory=list)  # (1-based position, kind)
+
+
+# ============================================================
+# GENERATION
+# ============================================================
+
+def _authors(rng: random.Random) -> Tuple[List[str], bool]:
+    if rng.random() < 0.08:
+        return [rng.choice(ORGANIZATIONS)], True
+    return rng.sample(SURNAMES, rng.choice((1, 1, 2, 2, 3))), False
+
+
+def _reference_text(authors: List[str], organizational: bool, year: str,
+                    i: int, rng: random.Random) -> str:
+    if organizational:
+        head = f"{authors[0]}."
+    else:
+        names = [f"{surname}, {chr(65 + rng.randrange(26))}." for surname in authors]
+        head = names[0] if len(names) == 1 else ", ".join(names[:-1]) + f" y {names[-1]}"
+    title = f"{rng.choice(TOPICS).capitalize()}: un estudio de caso {i}"
+    journal = rng.choice(JOURNALS)
+    doi = f" https://doi.org/10.{1000 + i % 9000}/rvc.{i}" if rng.random() < 0.6 else ""
+    return f"{head} ({year}). {title}. {journal}, {rng.randrange(1, 40)}({rng.randrange(1, 4)}), {rng.randrange(1, 90)}-{rng.randrange(91, 200)}.{doi}"
+
+
+def _inject(text: str, kind: str, authors: List[str], organizational: bool) -> Optional[str]:
+    """Apply one APA error to a reference; None when it does not apply to this entry."""
+    if kind in ("ampersand", "autor_completo") and organizational:
+        return None
+    if kind == "ampersand":
+        if " y " in text:
+            return text.replace(" y ", " & ", 1)
+        return text.replace(". (", ". & Pérez, J. (", 1)
+    if kind == "sin_anio":
+        return text.replace(" (", " ", 1).replace("). ", ". ", 1)
+    if kind == "recuperado_de":
+        return text.split(" https://")[0] + " Recuperado de https://www.undef.edu.ar/repositorio"
+    if kind == "autor_completo":
+        return text.replace(f"{authors[0]}, ", f"{authors[0]}, Juan ", 1)
+    if kind == "comillas_inglesas":
+        title_start = text.index("). ") + 3
+        title_end = text.index(". ", title_start)
+        return f'{text[:title_start]}"{text[title_start:title_end]}"{text[title_end:]}'
+    return None
+
+
+def generate_manuscript(spec: ManuscriptSpec) -> Tuple[List[DocxParagraph], Manifest]:
+    """Build the paragraphs of a manuscript and its ground-truth manifest."""
+    rng = random.Random(spec.seed)
+    manifest = Manifest(spec=asdict(spec))
+
+    # Bibliography first: the body cites its entries
+    entries = []
+    for i in range(spec.n_references):
+        authors, organizational = _authors(rng)
+        year = str(rng.randrange(1995, 2025))
+        entries.append((authors, organizational, year, _reference_text(authors, organizational, year, i, rng)))
+    entries.sort(key=lambda e: e[3].lower())
+
+    texts = [entry[3] for entry in entries]
+    errors: List[Tuple[int, str]] = []
+    shift = 0  # entries inserted so far by "duplicado"
+    for i, (authors, organizational, _, _) in enumerate(entries):
+        if rng.random() >= spec.error_rate:
+            continue
+        kind = rng.choice(APA_ERRORS)
+        pos = i + shift
+        if kind == "duplicado":
+            texts.insert(pos + 1, texts[pos])
+            shift += 1
+        elif kind == "desorden":
+            if pos + 1 >= len(texts):
+                continue
+            texts[pos], texts[pos + 1] = texts[pos + 1], texts[pos]
+        else:
+            injected = _inject(texts[pos], kind, authors, organizational)
+            if injected is None:
+                continue
+            texts[pos] = injected
+        errors.append((pos + 1, kind))
+    manifest.references = texts
+    manifest.injected_errors = errors
+
+    # Body
+    paragraphs = [DocxParagraph(spec.title, "Title")]
+    headings = IMRYD_HEADINGS if spec.imryd else ESSAY_HEADINGS
+    per_section = max(spec.body_chars // len(headings), 1)
+    for number, heading in enumerate(headings, 1):
+        paragraphs.append(DocxParagraph(f"{number}. {heading}", "Heading1"))
+        written = 0
+        while written < per_section:
+            sentences = []
+            for _ in range(rng.randrange(4, 8)):
+                sentence = rng.choice(SENTENCES).format(topic=rng.choice(TOPICS))
+                if entries and rng.random() < spec.citation_density:
+                    authors, organizational, year, _ = rng.choice(entries)
+                    name = authors[0] if len(authors) < 3 else f"{authors[0]} et al."
+                    if len(authors) == 2:
+                        name = f"{authors[0]} y {authors[1]}"
+                    if rng.random() < 0.5:
+                        sentence = sentence[:-1] + f" ({name}, {year})."
+                    else:
+                        sentence = f"Según {name} ({year}), " + sentence[0].lower() + sentence[1:]
+                    manifest.citations += 1
+                sentences.append(sentence)
+            text = " ".join(sentences)
+            notes = [rng.choice(FOOTNOTES)] if rng.random() < spec.footnote_ratio else []
+            manifest.footnotes += len(notes)
+            paragraphs.append(DocxParagraph(text, footnotes=notes))
+            written += len(text)
+        manifest.body_chars += written
+
+    paragraphs.append(DocxParagraph("Referencias", "Heading1"))
+    paragraphs.extend(DocxParagraph(text, hanging_indent=True) for text in texts)
+    manifest.paragraphs = len(paragraphs)
+    return paragraphs, manifest
+
+
+def write_manuscript(path: str, spec: ManuscriptSpec) -> Manifest:
+    """Write the .docx and a `<name>.manifest.json` with the ground truth."""
+    paragraphs, manifest = generate_manuscript(spec)
+    write_docx(path, paragraphs)
+    with open(path.rsplit(".", 1)[0] + ".manifest.json", "w", encoding="utf-8") as f:
+        json.dump(asdict(manifest), f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    defaults = ManuscriptSpec()
+    parser = argparse.ArgumentParser(description="SILVINA - Generador de manuscritos sintéticos")
+    parser.add_argument("salida", nargs="?", default="manuscrito_sintetico.docx",
+                        help="archivo .docx a escribir (el manifiesto va en <nombre>.manifest.json)")
+    parser.add_argument("caracteres", nargs="?", type=int, default=defaults.body_chars,
+                        help=f"caracteres del cuerpo (por defecto {defaults.body_chars:,})")
+    parser.add_argument("referencias", nargs="?", type=int, default=defaults.n_references,
+                        help=f"cantidad de referencias (por defecto {defaults.n_references})")
+    parser.add_argument("--semilla", type=int, default=defaults.seed, help="semilla del generador aleatorio")
+    args = parser.parse_args()
+
+    output = args.salida
+    spec = ManuscriptSpec(body_chars=args.caracteres, n_references=args.referencias, seed=args.semilla)
+    manifest = write_manuscript(output, spec)
+    print(f"✓ {output}: {manifest.paragraphs} párrafos, {manifest.body_chars:,} caracteres, "
+          f"{manifest.citations} citas, {len(manifest.references)} referencias, "
+          f"{len(manifest.injected_errors)} errores APA inyectados")
@@ -0,0 +1,235 @@
+# parallel_analysis.py
+"""
+SILVINA Editorial Assistant - Parallel Analysis
+Chunked multi-process analysis for book-length manuscripts and theses
+Universidad de la Defensa Nacional
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+import os
+import sys
+import time
+
+from citations import Citation, CitationExtractor, synthetic_corpus
+from reference_segmenter import locate_references
+from references import Reference
+
+
+DEFAULT_CHUNK_CHARS = 100_000
+# Below this the whole analysis takes tens of milliseconds, less than
+# starting the pool; such manuscripts run inline
+PARALLEL_MIN_CHARS = 2_000_000
+ENGLISH_QUOTES = ('"', '“', '”')
+
+
+# ============================================================
+# RESULT DATA CLASSES
+# ============================================================
+
+@dataclass
+class ChunkResult:
+    """What one worker found in one chunk of paragraphs."""
+
+    first_paragraph: int
+    citations: List[Citation] = field(default_factory=list)
+    reference_reports: List[dict] = field(default_factory=list)
+    quote_paragraphs: List[int] = field(default_factory=list)
+    characters: int = 0
+
+
+@dataclass
+class ManuscriptAnalysis:
+    """Merged results for the whole manuscript, in document order."""
+
+    citations: List[Citation]
+    reference_reports: List[dict]
+    quote_paragraphs: List[int]
+    characters: int
+    reference_start: int
+    workers: int
+    chunks: int
+    elapsed: float
+
+
+# ============================================================
+# CHUNKING
+# ============================================================
+
+def chunk_ranges(paragraphs: Sequence[str], chunk_chars: int = DEFAULT_CHUNK_CHARS) -> List[Tuple[int, int]]:
+    """Split paragraph positions into [start, end) ranges of about `chunk_chars` characters."""
+    ranges = []
+    start = 0
+    size = 0
+    for i, para in enumerate(paragraphs):
+        size += len(para)
+        if size >= chunk_chars:
+            ranges.append((start, i + 1))
+            start, size = i + 1, 0
+    if start < len(paragraphs):
+        ranges.append((start, len(paragraphs)))
+    return ranges
+
+
+# ============================================================
+# WORKERS (module level so process pools can pickle them)
+# ============================================================
+
+def analyze_body_chunk(args) -> ChunkResult:
+    """Citations, character count and English quotes for body paragraphs."""
+    first_paragraph, paragraphs = args
+    result = ChunkResult(first_paragraph)
+    extractor = CitationExtractor()
+
+    for citation in extractor.scan_document(paragraphs):
+        citation.paragraph_index += first_paragraph
+        result.citations.append(citation)
+
+    for offset, para in enumerate(paragraphs):
+        result.characters += len(para)
+        if any(quote in para for quote in ENGLISH_QUOTES):
+            result.quote_paragraphs.append(first_paragraph + offset)
+    return result
+
+
+def analyze_reference_chunk(args) -> ChunkResult:
+    """APA validation reports for a slice of reference entries."""
+    first_position, texts = args
+    result = ChunkResult(first_position)
+    for text in texts:
+        result.reference_reports.append(Reference(text).get_validation_report())
+        result.characters += len(text)
+    return result
+
+
+# ============================================================
+# PARALLEL DRIVER
+# ============================================================
+
+def analyze_parallel(paragraphs: Sequence[str], workers: Optional[int] = None,
+                     chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                     min_chars: int = PARALLEL_MIN_CHARS) -> ManuscriptAnalysis:
+    """
+    Analyze a manuscript with a process pool.
+
+    The body is split into chunks of whole paragraphs, and the reference
+    list into slices of entries. Each chunk is analyzed independently and
+    the results are merged in chunk order, so the output (including
+    paragraph indices) is identical for any number of workers.
+
+    Args:
+        paragraphs: Paragraph texts, in document order
+        workers: Process count (default: os.cpu_count(); 1 runs inline)
+        chunk_chars: Target characters per body chunk
+        min_chars: Manuscripts shorter than this run inline (workers=1)
+
+    Returns:
+        ManuscriptAnalysis
+    """
+    workers = workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    if workers > 1 and sum(len(p) for p in paragraphs) < min_chars:
+        workers = 1
+
+    reference_start, entries = locate_references(paragraphs)
+    body = paragraphs[:reference_start]
+
+    body_jobs = [(start, list(body[start:end])) for start, end in chunk_ranges(body, chunk_chars)]
+    per_slice = max(1, len(entries) // workers + 1)
+    ref_jobs = [(pos, [e.text for e in entries[pos:pos + per_slice]])
+                for pos in range(0, len(entries), per_slice)]
+
+    if workers == 1:
+        body_results = [analyze_body_chunk(job) for job in body_jobs]
+        ref_results = [analyze_reference_chunk(job) for job in ref_jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            body_future = pool.map(analyze_body_chunk, body_jobs)
+            ref_future = pool.map(analyze_reference_chunk, ref_jobs)
+            body_results = list(body_future)
+            ref_results = list(ref_future)
+
+    # Executor.map preserves job order, so merging is deterministic
+    citations, quotes, reports = [], [], []
+    characters = 0
+    for chunk in body_results:
+        citations.extend(chunk.citations)
+        quotes.extend(chunk.quote_paragraphs)
+        characters += chunk.characters
+    for chunk in ref_results:
+        reports.extend(chunk.reference_reports)
+        characters += chunk.characters
+
+    return ManuscriptAnalysis(
+        citations=citations,
+        reference_reports=reports,
+        quote_paragraphs=quotes,
+        characters=characters,
+        reference_start=reference_start,
+        workers=workers,
+        chunks=len(body_jobs) + len(ref_jobs),
+        elapsed=time.perf_counter() - start_time
+    )
+
+
+def extract_citations(paragraphs: Sequence[str], workers: Optional[int] = None,
+                      chunk_chars: int = DEFAULT_CHUNK_CHARS,
+                      min_chars: int = PARALLEL_MIN_CHARS) -> List[Citation]:
+    """
+    In-text citations of `paragraphs` (a body, without the reference list),
+    chunked over a process pool; same result as CitationExtractor.extract_document.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or sum(len(p) for p in paragraphs) < min_chars:
+        return CitationExtractor().extract_document(paragraphs)
+    jobs = [(start, list(paragraphs[start:end])) for start, end in chunk_ranges(paragraphs, chunk_chars)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [citation for chunk in pool.map(analyze_body_chunk, jobs) for citation in chunk.citations]
+
+
+# ============================================================
+# SCALING BENCHMARK
+# ============================================================
+
+def synthetic_thesis(n_pages: int = 300, n_references: int = 400) -> List[str]:
+    """Body paragraphs followed by a Referencias heading and entries."""
+    body = synthetic_corpus(n_pages * 10, seed=n_pages, cited_ratio=0.3, sentences=4)
+    refs = [f"Autor{i:04d}, A. y Pérez, B. ({1990 + i % 35}). Título del trabajo {i}. "
+            f"Revista Visión Conjunta, {i % 30}(2), 1-20. https://doi.org/10.1000/vc.{i}"
+            for i in range(n_references)]
+    return body + ["Referencias"] + refs
+
+
+def run_benchmark(core_counts=(1, 2, 4, 8), n_pages: int = 300):
+    paragraphs = synthetic_thesis(n_pages)
+    total_chars = sum(len(p) for p in paragraphs)
+    print("SILVINA - Análisis Paralelo (Benchmark de escalado)")
+    print("=" * 60)
+    print(f"  Manuscrito: {n_pages} páginas, {len(paragraphs):,} párrafos, "
+          f"{total_chars:,} caracteres (CPU disponibles: {os.cpu_count()})")
+
+    baseline = None
+    reference = None
+    for workers in core_counts:
+        analysis = analyze_parallel(paragraphs, workers=workers, chunk_chars=50_000, min_chars=0)
+        baseline = baseline or analysis.elapsed
+        signature = (len(analysis.citations), analysis.quote_paragraphs,
+                     [c.paragraph_index for c in analysis.citations])
+        reference = reference or signature
+        same = "✓" if signature == reference else "✗"
+        print(f"  {same} {workers} núcleo(s): {analysis.elapsed * 1000:8.1f} ms "
+              f"| aceleración x{baseline / analysis.elapsed:4.2f} "
+              f"| {len(analysis.citations):,} citas, {len(analysis.reference_reports)} referencias")
+    inline = analyze_parallel(paragraphs, workers=max(core_counts))
+    print(f"  Umbral {PARALLEL_MIN_CHARS:,} caracteres: "
+          f"{'en línea' if inline.workers == 1 else f'{inline.workers} procesos'} "
+          f"({inline.elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        pages = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        run_benchmark(n_pages=pages)
+    else:
+        print("💡 Benchmark: python parallel_analysis.py --bench [páginas]")
@@ -0,0 +1,167 @@
+# reference_parser.py
+"""
+SILVINA Editorial Assistant - Reference Parser
+Structured parsing of APA 7 Spanish references (authors, year, title, DOI, URLs)
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+import re
+import unicodedata
+
+
+# ============================================================
+# PATTERNS
+# ============================================================
+
+# (2020) / (2020a) / (2020, 15 de marzo) / (s.f.)
+YEAR_PATTERN = re.compile(r'\((\d{4})([a-z]?)(?:,[^)]*)?\)|\((s\.\s?f\.)\)')
+
+# García, M. / Pérez-Sánchez, J. L. / De la Fuente, A.
+SURNAME_PATTERN = re.compile(
+    r"((?:[Dd]e\s+(?:la\s+|los\s+)?|[Vv]an\s+|[Vv]on\s+)?"
+    r"[A-ZÀ-ÖØ-Þ][\w'’\-]+(?:\s+[A-ZÀ-ÖØ-Þ][\w'’\-]+)?)"
+    r",\s+(?:[A-ZÀ-ÖØ-Þ][a-zß-öø-ÿ]?\.\s*(?:-\s*)?)+"
+)
+
+ET_AL_PATTERN = re.compile(r'et\s+al\.', re.IGNORECASE)
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s«»"]+')
+
+URL_PATTERN = re.compile(r'https?://[^\s«»"]+')
+
+TRAILING_PUNCTUATION = '.,;:)]»'
+
+
+# ============================================================
+# PARSED REFERENCE
+# ============================================================
+
+@dataclass
+class ParsedReference:
+    """Structured fields extracted from one reference entry."""
+
+    text: str
+    authors: List[str] = field(default_factory=list)
+    year: Optional[str] = None
+    year_suffix: str = ""
+    title: Optional[str] = None
+    doi: Optional[str] = None
+    urls: List[str] = field(default_factory=list)
+    organizational: bool = False
+    et_al: bool = False
+
+    @property
+    def first_author(self) -> Optional[str]:
+        """First author surname (or organization name), if any."""
+        return self.authors[0] if self.authors else None
+
+    def __repr__(self):
+        authors_text = " y ".join(self.authors) if self.authors else "?"
+        year_text = f"{self.year}{self.year_suffix}" if self.year else "s.f."
+        return f"📚 {authors_text} ({year_text}) {self.title or ''}".rstrip()
+
+
+# ============================================================
+# NORMALIZATION HELPERS
+# ============================================================
+
+def strip_accents(text: str) -> str:
+    """Remove diacritics: 'Pérez' -> 'Perez', 'Núñez' -> 'Nunez'."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_name(name: str) -> str:
+    """Accent- and case-insensitive key for a surname or organization."""
+    return re.sub(r'[^a-z0-9]+', ' ', strip_accents(name).lower()).strip()
+
+
+def normalize_title(title: str) -> str:
+    """Comparable form of a title: no accents, punctuation or case."""
+    return re.sub(r'[^a-z0-9]+', ' ', strip_accents(title).lower()).strip()
+
+
+def _clean_tail(value: str) -> str:
+    """Drop sentence punctuation glued to the end of a DOI or URL."""
+    return value.rstrip(TRAILING_PUNCTUATION)
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+def parse_reference(text: str) -> ParsedReference:
+    """
+    Parse one reference into authors, year, title, DOI and URLs.
+
+    The parser is tolerant: fields it cannot find are left empty, so
+    malformed references still produce a ParsedReference that the
+    validators can report on.
+
+    Args:
+        text: Full reference text
+
+    Returns:
+        ParsedReference with the fields that could be recovered
+    """
+    parsed = ParsedReference(text=text)
+
+    year_match = YEAR_PATTERN.search(text)
+    if year_match:
+        if year_match.group(1):
+            parsed.year = year_match.group(1)
+            parsed.year_suffix = year_match.group(2) or ""
+        author_part = text[:year_match.start()]
+        rest = text[year_match.end():]
+    else:
+        author_part = text.split('. ', 1)[0]
+        rest = text[len(author_part):]
+
+    # Authors
+    surnames = [m.group(1).strip() for m in SURNAME_PATTERN.finditer(author_part)]
+    parsed.et_al = bool(ET_AL_PATTERN.search(author_part))
+    if surnames:
+        parsed.authors = surnames
+    else:
+        organization = author_part.strip().rstrip('.').strip()
+        if organization:
+            parsed.authors = [organization]
+            parsed.organizational = True
+
+    # Title: first sentence after the year
+    title_match = re.match(r'\s*\.?\s*(.+?[.?!])(?=\s|$)', rest)
+    if title_match:
+        title = title_match.group(1).strip().strip('«»"“”').rstrip('.').strip()
+        if title and not URL_PATTERN.match(title):
+            parsed.title = title
+
+    # DOI and URLs
+    doi_match = DOI_PATTERN.search(text)
+    if doi_match:
+        parsed.doi = _clean_tail(doi_match.group(0))
+    parsed.urls = [_clean_tail(m.group(0)) for m in URL_PATTERN.finditer(text)]
+
+    return parsed
+
+
+# ============================================================
+# TEST MODE
+# ============================================================
+
+if __name__ == "__main__":
+    test_references = [
+        "Gidney, C. y Ekerå, M. (2021). How to factor 2048 bit RSA integers in 8 hours using 20 million noisy qubits. Quantum, 5, 433. https://doi.org/10.22331/q-2021-04-15-433",
+        "Pérez-Sánchez, J. L. (2020a). Ciberdefensa y soberanía. Revista Visión Conjunta, 12(3), 45-60.",
+        "IBM Research. (2024). Quantum roadmap. https://www.ibm.com/quantum/roadmap",
+        "Chen, L. et al. (2016). Report on post-quantum cryptography. NIST.",
+    ]
+
+    print("SILVINA - Reference Parser (Test Mode)")
+    print("=" * 50)
+    for ref_text in test_references:
+        parsed = parse_reference(ref_text)
+        print(f"\n{ref_text[:70]}...")
+        print(f"  → {parsed}")
+        print(f"    DOI: {parsed.doi} | URLs: {len(parsed.urls)} | Org: {parsed.organizational}")
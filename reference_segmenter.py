@@ -0,0 +1,275 @@
+# reference_segmenter.py
+"""
+SILVINA Editorial Assistant - Reference Segmentation
+Splits the Referencias/Bibliografía section into entries using paragraph
+formatting (hanging indent, style, line breaks) plus reference parser signals
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+import random
+import re
+import sys
+import time
+
+from reference_parser import normalize_name
+
+
+# ============================================================
+# PARAGRAPH DATA CLASS
+# ============================================================
+
+@dataclass
+class ParagraphInfo:
+    """Text and OOXML paragraph properties of one Word paragraph."""
+
+    text: str
+    index: int = 0
+    style: str = ""
+    first_line_indent: float = 0.0  # points; negative means hanging indent
+    left_indent: float = 0.0
+
+    @property
+    def is_heading(self) -> bool:
+        return self.style.startswith(HEADING_STYLE_PREFIXES)
+
+    @property
+    def has_hanging_indent(self) -> bool:
+        return self.first_line_indent < 0
+
+
+@dataclass
+class SegmentedReference:
+    """One bibliography entry and the paragraph it starts in."""
+
+    text: str
+    paragraph_index: int
+
+
+# ============================================================
+# PATTERNS
+# ============================================================
+
+HEADING_STYLE_PREFIXES = ("Título", "Titulo", "Heading", "Title")
+
+# Normalized heading text -> section type
+SECTION_HEADINGS = {
+    "referencias": "Referencias",
+    "referencias bibliograficas": "Referencias",
+    "fuentes bibliograficas": "Referencias",
+    "lista de referencias": "Referencias",
+    "bibliografia": "Bibliografía",
+    "bibliografia consultada": "Bibliografía",
+}
+
+# Optional numbering before a heading: "7.", "VII.", "7.1"
+HEADING_NUMBER = re.compile(r'^(?:[IVXLC]+|\d+(?:\.\d+)*)[.)]?\s+')
+
+# Manual line break (Shift+Enter) is \x0b in Word's Range.Text
+LINE_BREAKS = re.compile(r'[\x0b\n\r]+')
+
+# Start of an entry: accented/compound surname + initial, or organization + (year)
+_SURNAME = r"(?:[Dd]e\s+(?:la\s+|los\s+)?|[Vv]an\s+|[Vv]on\s+)?[A-ZÀ-ÖØ-Þ][\w'’\-]+(?:\s+[A-ZÀ-ÖØ-Þ][\w'’\-]+)?"
+_YEAR = r"\((?:\d{4}[a-z]?|s\.\s?f\.)(?:,[^)]*)?\)"
+ENTRY_START = re.compile(
+    rf"{_SURNAME},\s+[A-ZÀ-ÖØ-Þ][a-zß-öø-ÿ]?\.[^()]{{0,250}}?{_YEAR}"
+    rf"|[A-ZÀ-ÖØ-Þ][^().]{{1,120}}?(?<!\bal)\.\s+{_YEAR}"
+)
+
+# Split point inside a merged paragraph: end of sentence, then a new entry start
+MERGED_SPLIT = re.compile(
+    rf"(?<=[.)»\d])\s+(?={_SURNAME},\s+[A-ZÀ-ÖØ-Þ][a-zß-öø-ÿ]?\.[^()]{{0,250}}?{_YEAR})"
+)
+
+HAS_LETTERS = re.compile(r'[^\W\d_]')
+
+
+# ============================================================
+# SECTION LOCATION
+# ============================================================
+
+def reference_heading_type(para: ParagraphInfo) -> Optional[str]:
+    """Return the section type if the paragraph IS a references heading."""
+    text = para.text.strip()
+    if not text or len(text) > 60:
+        return None
+    key = normalize_name(HEADING_NUMBER.sub('', text).rstrip(':.'))
+    return SECTION_HEADINGS.get(key)
+
+
+def find_reference_section(paragraphs: Sequence[ParagraphInfo]) -> Tuple[Optional[int], Optional[int], str]:
+    """
+    Locate the references section.
+
+    The heading must be a short paragraph whose whole text is a known
+    heading ("Referencias", "7. Bibliografía"...), not prose that merely
+    mentions the word. When several match, the last one wins, since the
+    bibliography closes the article. The section ends at the next
+    heading-styled paragraph (annexes, appendices).
+
+    Returns:
+        (start, end, section_type) as paragraph positions [start, end);
+        (None, None, "Referencias") when no heading is found
+    """
+    heading_pos = None
+    section_type = "Referencias"
+    for pos, para in enumerate(paragraphs):
+        found = reference_heading_type(para)
+        if found:
+            heading_pos, section_type = pos, found
+
+    if heading_pos is None:
+        return None, None, section_type
+
+    end = len(paragraphs)
+    for pos in range(heading_pos + 1, len(paragraphs)):
+        if paragraphs[pos].is_heading:
+            end = pos
+            break
+    return heading_pos + 1, end, section_type
+
+
+def locate_references(paragraphs: Sequence[str]) -> Tuple[int, List[SegmentedReference]]:
+    """
+    Split plain paragraph texts into body and reference entries.
+
+    Uses the references heading when present; readers that drop heading
+    paragraphs fall back to the paragraphs that open with an author-year
+    signature.
+
+    Returns:
+        (index of the first reference paragraph, segmented entries)
+    """
+    infos = [ParagraphInfo(text, i) for i, text in enumerate(paragraphs)]
+    start, end, _ = find_reference_section(infos)
+    if start is not None:
+        return start - 1, segment_references(infos[start:end])
+
+    candidates = [info for info in infos if ENTRY_START.match(info.text.strip())]
+    if not candidates:
+        return len(paragraphs), []
+    return candidates[0].index, segment_references(candidates)
+
+
+# ============================================================
+# SEGMENTATION
+# ============================================================
+
+def _starts_entry(piece: str) -> bool:
+    return bool(ENTRY_START.match(piece))
+
+
+def iter_references(paragraphs: Iterable[ParagraphInfo]) -> Iterator[SegmentedReference]:
+    """
+    Split reference-section paragraphs into individual entries in one pass.
+
+    Each line (paragraph or manual line break) either opens a new entry or
+    continues the previous one. It opens one when the paragraph has a
+    hanging indent or the line starts with an author-year signature.
+    Lines without those signals are continuations, for example a DOI
+    wrapped onto its own line. Paragraphs holding several merged entries
+    are split where a sentence ends and a new author-year signature begins.
+
+    Only the entry being built is held in memory: each one is yielded as
+    soon as the next one opens, so the input may be a lazy stream.
+
+    Args:
+        paragraphs: ParagraphInfo records of the references section, in order
+
+    Yields:
+        SegmentedReference in bibliography order
+    """
+    pending: Optional[SegmentedReference] = None
+
+    for para in paragraphs:
+        lines = [line.strip() for line in LINE_BREAKS.split(para.text)]
+        lines = [line for line in lines if line and HAS_LETTERS.search(line)]
+        if not lines:
+            continue
+
+        for line_no, line in enumerate(lines):
+            opens_entry = _starts_entry(line)
+            if line_no == 0 and para.has_hanging_indent:
+                opens_entry = True
+
+            parts = [part.strip() for part in MERGED_SPLIT.split(line)]
+            if not opens_entry and pending:
+                pending.text = f"{pending.text} {parts[0]}"
+                parts = parts[1:]
+
+            for part in parts:
+                if part:
+                    if pending:
+                        yield pending
+                    pending = SegmentedReference(part, para.index)
+
+    if pending:
+        yield pending
+
+
+def segment_references(paragraphs: Iterable[ParagraphInfo]) -> List[SegmentedReference]:
+    """All entries of a references section as a list (see iter_references)."""
+    return list(iter_references(paragraphs))
+
+
+# ============================================================
+# BENCHMARK (synthetic bibliography)
+# ============================================================
+
+SURNAMES = ["García", "Pérez-Sánchez", "Núñez", "Ávila", "Öztürk", "O'Brien",
+            "De la Fuente", "López", "Ibáñez", "Gidney", "Chen", "Muñoz"]
+
+
+def synthetic_bibliography(n_entries: int, seed: int = 42) -> List[ParagraphInfo]:
+    """Build a references section with merged paragraphs and wrapped DOIs."""
+    rng = random.Random(seed)
+    paragraphs: List[ParagraphInfo] = []
+    pending: List[str] = []
+    for i in range(n_entries):
+        surname = rng.choice(SURNAMES)
+        entry = (f"{surname}, {chr(65 + i % 26)}. ({1990 + i % 35}). "
+                 f"Título del trabajo número {i}. Revista Visión Conjunta, {i % 40}(2), 1-20.")
+        if rng.random() < 0.3:
+            entry += f"\x0bhttps://doi.org/10.{1000 + i}/vc.{i}"
+        pending.append(entry)
+        # About one in ten paragraphs holds two merged entries
+        if rng.random() < 0.9 or len(pending) == 2:
+            paragraphs.append(ParagraphInfo(" ".join(pending), len(paragraphs),
+                                            "Normal", first_line_indent=-18.0, left_indent=18.0))
+            pending = []
+    if pending:
+        paragraphs.append(ParagraphInfo(" ".join(pending), len(paragraphs), "Normal", -18.0, 18.0))
+    return paragraphs
+
+
+def run_benchmark(sizes=(1_000, 10_000, 100_000)):
+    print("SILVINA - Segmentación de Referencias (Benchmark)")
+    print("=" * 60)
+    for size in sizes:
+        paragraphs = synthetic_bibliography(size)
+        start = time.perf_counter()
+        entries = segment_references(paragraphs)
+        elapsed = time.perf_counter() - start
+        status = "✓" if len(entries) == size else "✗"
+        print(f"  {status} {size:>7,} referencias → {len(entries):>7,} entradas "
+              f"en {elapsed * 1000:8.1f} ms ({size / elapsed:,.0f} ref/s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark()
+    else:
+        section = [
+            ParagraphInfo("Este trabajo se apoya en las Referencias citadas.", 0),
+            ParagraphInfo("Referencias", 1, "Título 1"),
+            ParagraphInfo("Ávila, R. (2019). Defensa y territorio. Editorial UNDEF. "
+                          "Öztürk, M. y Núñez, P. (2021). Ciberdefensa. Revista, 3(1), 1-9.", 2),
+            ParagraphInfo("IBM Research. (2024). Quantum roadmap.\x0bhttps://www.ibm.com/quantum", 3),
+            ParagraphInfo("Le, T. (2020). X.", 4),
+            ParagraphInfo("Anexo I", 5, "Título 1"),
+        ]
+        start, end, section_type = find_reference_section(section)
+        print(f"Sección: {section_type} (párrafos {start}-{end - 1})")
+        for entry in segment_references(section[start:end]):
+            print(f"  [¶{entry.paragraph_index}] {entry.text}")
@@ -0,0 +1,227 @@
+# references.py
+"""
+SILVINA Editorial Assistant - Reference
+APA 7 Spanish validation of a single bibliographic reference and of the
+reference list as a whole (alphabetical order, duplicates)
+Universidad de la Defensa Nacional
+"""
+
+import re
+
+
+# Patterns shared by the checks and the mechanical fixes (silvina.autofix)
+COMILLAS_INGLESAS = re.compile(r'"|(?<![^\W\d_])\'|\'(?![^\W\d_])')  # not the apostrophe in O'Brien
+AMPERSAND = re.compile(r'[A-Z]\.(,?\s+&)\s+[A-Z]')  # "I. &" or "I., &"; group 1 becomes " y"
+RECUPERADO_DE = re.compile(r'Recuperado\s+de\s+(?=https?://)', re.IGNORECASE)
+
+
+# === REFERENCE CLASS ===
+class Reference:
+    """Represents a single bibliographic reference"""
+    
+    def __init__(self, text):
+        """Initialize reference with citation text"""
+        self.text = text
+    
+    def validate_author(self):
+        """Check if reference has valid APA 7 Spanish author format."""
+        personal = r'[A-ZÁ-ÚÑ][a-zá-úñ]+(?:-[A-ZÁ-ÚÑ][a-zá-úñ]+)?,\s+[A-Z]\.'
+        et_al = r'et\s+al\.'
+        organizational = r'^[A-Z][A-Za-z\s&,\-]{10,}\.\s'
+        
+        has_personal = bool(re.search(personal, self.text))
+        has_et_al = bool(re.search(et_al, self.text, re.IGNORECASE))
+        has_organizational = bool(re.search(organizational, self.text))
+        
+        if has_organizational and not has_personal:
+            return True
+        
+        return has_personal or has_et_al
+    
+    def validate_year(self):
+        """Check if reference has valid year format (YYYY)"""
+        pattern = r'\((\d{4})\)'
+        match = re.search(pattern, self.text)
+        if match:
+            return True, match.group(1)
+        return False, None
+    
+    def validar_conjuncion_espanola(self):
+        """
+        Verifica uso de 'y' en vez de '&' para referencias en español APA 7.
+        Improved pattern to catch all cases.
+        """
+        # Pattern catches: "I. &" or "I., &" or "A., &"
+        if AMPERSAND.search(self.text):
+            return False, "Uso incorrecto de '&' (debe ser 'y' en español APA 7)"
+        
+        return True, None
+    
+    def tiene_doi_o_url(self):
+        """
+        Verifica presencia de DOI o URL.
+        
+        Returns:
+            dict: {
+                'tiene_doi': bool,
+                'tiene_url': bool,
+                'formato_antiguo': bool  # "Recuperado de"
+            }
+        """
+        tiene_doi = bool(re.search(r'https?://doi\.org/[\w\.\-/]+', self.text, re.IGNORECASE))
+        tiene_url = bool(re.search(r'https?://[^\s]+', self.text))
+        formato_antiguo = bool(RECUPERADO_DE.search(self.text))
+        
+        return {
+            'tiene_doi': tiene_doi,
+            'tiene_url': tiene_url,
+            'formato_antiguo': formato_antiguo
+        }
+    
+    def is_valid(self):
+        """Check if reference meets all APA 7 Spanish requirements"""
+        has_author = self.validate_author()
+        has_year, _ = self.validate_year()
+        conjuncion_valida, _ = self.validar_conjuncion_espanola()
+        
+        return has_author and has_year and conjuncion_valida
+    
+    def get_validation_report(self):
+        """Return detailed validation results"""
+        has_author = self.validate_author()
+        has_year, year = self.validate_year()
+        conjuncion_valida, error_conjuncion = self.validar_conjuncion_espanola()
+        doi_url_info = self.tiene_doi_o_url()
+        
+        return {
+            'text': self.text[:80] + '...' if len(self.text) > 80 else self.text,
+            'valid_author': has_author,
+            'valid_year': has_year,
+            'valid_conjuncion': conjuncion_valida,
+            'error_conjuncion': error_conjuncion,
+            'doi_url_info': doi_url_info,
+            'year': year,
+            'is_valid': has_author and has_year and conjuncion_valida
+        }
+
+
+# === REFERENCE LIST CHECKS ===
+def _short(text, limit=60):
+    return text[:limit] + '...' if len(text) > limit else text
+
+
+def clave_orden(texto):
+    """Clave del orden alfabético: primera palabra, sin puntuación final, en minúsculas."""
+    return texto.split()[0].rstrip('.,').lower()
+
+
+def problema_orden(posicion, ref_actual, ref_siguiente):
+    """Problema de orden entre dos referencias consecutivas, o None."""
+    if clave_orden(ref_actual.text) > clave_orden(ref_siguiente.text):
+        return {
+            'posicion': posicion,
+            'texto': _short(ref_actual.text),
+            'deberia_ir_antes_de': _short(ref_siguiente.text)
+        }
+    return None
+
+
+def resumen_orden(problemas, references):
+    return {
+        'ordenadas': len(problemas) == 0,
+        'total_referencias': len(references),
+        'problemas': problemas
+    }
+
+
+def validar_orden_alfabetico(references):
+    """Verifica si las referencias están en orden alfabético."""
+    problemas = []
+    
+    for i in range(len(references) - 1):
+        problema = problema_orden(i + 1, references[i], references[i + 1])
+        if problema:
+            problemas.append(problema)
+    
+    return resumen_orden(problemas, references)
+
+
+def problema_comillas(posicion, ref):
+    """Referencia con comillas inglesas (" ') en vez de españolas (« »), o None."""
+    if COMILLAS_INGLESAS.search(ref.text):
+        return {
+            'posicion': posicion,
+            'texto': ref.text[:60] + '...' if len(ref.text) > 60 else ref.text
+        }
+    return None
+
+
+def resumen_comillas(problemas, references):
+    return {
+        'usa_comillas_correctas': len(problemas) == 0,
+        'problemas': problemas
+    }
+
+
+def validar_comillas_espanolas(references):
+    """
+    Verifica uso de comillas españolas (« ») en vez de inglesas (" ").
+    
+    Returns:
+        dict: {
+            'usa_comillas_correctas': bool,
+            'problemas': list of reference indices
+        }
+    """
+    problemas = []
+    
+    for i, ref in enumerate(references):
+        problema = problema_comillas(i + 1, ref)
+        if problema:
+            problemas.append(problema)
+    
+    return resumen_comillas(problemas, references)
+
+
+def detectar_duplicados(references):
+    """
+    Detecta referencias duplicadas o muy similares.
+    
+    Returns:
+        dict: {
+            'tiene_duplicados': bool,
+            'duplicados': list of dicts with indices and similarity
+        }
+    """
+    from difflib import SequenceMatcher  # only needed here; keeps CLI startup light
+    
+    if len(references) < 2:
+        return {
+            'tiene_duplicados': False,
+            'duplicados': []
+        }
+    
+    duplicados = []
+    
+    for i in range(len(references)):
+        for j in range(i + 1, len(references)):
+            ref_i = references[i].text
+            ref_j = references[j].text
+            
+            # Calculate similarity ratio
+            similarity = SequenceMatcher(None, ref_i.lower(), ref_j.lower()).ratio()
+            
+            # If >85% similar, flag as potential duplicate
+            if similarity > 0.85:
+                duplicados.append({
+                    'ref1_index': i + 1,
+                    'ref1_text': _short(ref_i),
+                    'ref2_index': j + 1,
+                    'ref2_text': _short(ref_j),
+                    'similitud': f"{similarity * 100:.1f}%"
+                })
+    
+    return {
+        'tiene_duplicados': len(duplicados) > 0,
+        'duplicados': duplicados
+    }
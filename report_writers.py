@@ -0,0 +1,313 @@
+# report_writers.py
+"""
+SILVINA Editorial Assistant - Report Model and Writers
+Report sections populated from validator results, rendered as they
+complete by pluggable writers (text, Markdown, JSON, JSON Lines)
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+import io
+import json
+import sys
+import textwrap
+import time
+
+from references import Reference
+
+
+RULE_WIDTH = 70
+
+
+# ============================================================
+# REPORT MODEL
+# ============================================================
+
+@dataclass
+class ReportSection:
+    """
+    One block of the report.
+
+    `lines` is the human-readable text (Spanish prose, as in the .txt
+    report); `data` holds the same results as plain JSON values so that
+    dashboards never have to parse the prose.
+    """
+
+    key: str
+    title: str
+    lines: List[str] = field(default_factory=list)
+    data: Dict[str, Any] = field(default_factory=dict)
+    major: bool = True  # '=' rule for main sections, '-' for detail blocks
+
+    def add(self, line: str = ""):
+        self.lines.append(line)
+
+
+# ============================================================
+# WRITERS
+# ============================================================
+
+class ReportWriter:
+    """Receives sections as they complete; subclasses render them."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def begin(self, metadata: Dict[str, Any]):
+        pass
+
+    def section(self, section: ReportSection):
+        raise NotImplementedError
+
+    def end(self):
+        self.stream.flush()
+
+
+class TextWriter(ReportWriter):
+    """The classic .txt layout with '=' and '-' rules."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._first = True
+
+    def _write(self, line: str):
+        if not self._first:
+            self.stream.write("\n")
+        self.stream.write(line)
+        self._first = False
+
+    def section(self, section: ReportSection):
+        rule = ("=" if section.major else "-") * RULE_WIDTH
+        self._write(rule if self._first else "\n" + rule)
+        self._write(section.title)
+        self._write(rule if section.major else rule + "\n")
+        for line in section.lines:
+            self._write(line)
+        self.stream.flush()
+
+    def end(self):
+        self._write("\n" + "=" * RULE_WIDTH)
+        super().end()
+
+
+class MarkdownWriter(ReportWriter):
+    """Headings per section; report lines become a plain paragraph block."""
+
+    def begin(self, metadata: Dict[str, Any]):
+        self.stream.write(f"# SILVINA - {metadata.get('documento', '')}\n\n")
+
+    def section(self, section: ReportSection):
+        level = "##" if section.major else "###"
+        self.stream.write(f"{level} {section.title}\n\n")
+        for line in section.lines:
+            stripped = line.strip("\n")
+            if stripped.startswith("   "):
+                self.stream.write(f"    - {stripped.strip()}\n")
+            elif stripped:
+                self.stream.write(f"- {stripped.strip()}\n")
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+def _section_json(section: ReportSection) -> Dict[str, Any]:
+    """A section as written by the JSON and JSON Lines writers."""
+    return {"clave": section.key, "titulo": section.title, **section.data}
+
+
+class JsonWriter(ReportWriter):
+    """One JSON document; sections are appended to the array as they complete."""
+
+    def __init__(self, stream: TextIO, indent: Optional[int] = 2):
+        super().__init__(stream)
+        self.indent = indent
+        self._count = 0
+        self._closing = "}"
+
+    def begin(self, metadata: Dict[str, Any]):
+        self._count = 0
+        # "secciones" is the last key, so the document splits at its empty array
+        head = json.dumps(dict(metadata, secciones=[]), ensure_ascii=False, indent=self.indent)
+        opening, self._closing = head.rsplit("[]", 1)
+        self.stream.write(opening + ("[\n" if self.indent else "["))
+
+    def section(self, section: ReportSection):
+        body = json.dumps(_section_json(section), ensure_ascii=False, indent=self.indent)
+        if self.indent:
+            body = textwrap.indent(body, " " * 2 * self.indent)
+        self.stream.write((",\n" if self._count else "") + body)
+        self._count += 1
+        self.stream.flush()
+
+    def end(self):
+        self.stream.write(("\n" + " " * self.indent + "]" if self.indent else "]") + self._closing + "\n")
+        super().end()
+
+
+class JsonLinesWriter(ReportWriter):
+    """
+    One compact JSON record per manuscript, written when it completes.
+
+    Open the output once and reuse the writer for a whole batch: each
+    begin()/end() pair appends one line.
+    """
+
+    def begin(self, metadata: Dict[str, Any]):
+        self._record = dict(metadata, secciones=[])
+
+    def section(self, section: ReportSection):
+        # Same section objects as JsonWriter, so one parser reads both formats
+        self._record["secciones"].append(_section_json(section))
+
+    def end(self):
+        self.stream.write(json.dumps(self._record, ensure_ascii=False) + "\n")
+        super().end()
+
+
+class MultiWriter(ReportWriter):
+    """Fan the same sections out to several writers."""
+
+    def __init__(self, writers: Iterable[ReportWriter]):
+        self.writers = list(writers)
+
+    def begin(self, metadata):
+        for writer in self.writers:
+            writer.begin(metadata)
+
+    def section(self, section):
+        for writer in self.writers:
+            writer.section(section)
+
+    def end(self):
+        for writer in self.writers:
+            writer.end()
+
+
+WRITERS = {
+    "txt": TextWriter,
+    "md": MarkdownWriter,
+    "json": JsonWriter,
+    "jsonl": JsonLinesWriter,
+}
+
+
+def make_writer(fmt: str, stream: TextIO) -> ReportWriter:
+    """Writer for a format name ('txt', 'md', 'json', 'jsonl')."""
+    try:
+        return WRITERS[fmt](stream)
+    except KeyError:
+        raise ValueError(f"Formato de reporte desconocido: {fmt} (opciones: {', '.join(WRITERS)})")
+
+
+def render(metadata: Dict[str, Any], sections: Iterable[ReportSection], writer: ReportWriter):
+    """Drive a writer over a (possibly lazy) sequence of sections."""
+    writer.begin(metadata)
+    for section in sections:
+        writer.section(section)
+    writer.end()
+
+
+# ============================================================
+# SHARED SECTION BUILDERS
+# ============================================================
+
+def reference_detail_section(references: List[Reference],
+                             reports: Optional[List[dict]] = None) -> ReportSection:
+    """
+    DETALLE DE VALIDACIÓN: status of every reference, details for invalid ones.
+
+    `reports` are the references' get_validation_report() results when
+    already computed (the rule scheduler does so in its fused pass).
+    """
+    section = ReportSection("detalle", "DETALLE DE VALIDACIÓN", major=False)
+    entries = []
+    if reports is None:
+        reports = [ref.get_validation_report() for ref in references]
+
+    for i, rep in enumerate(reports, 1):
+        problems = []
+        codes = []  # stable rule ids for the problems (run history, dashboards)
+
+        if rep['is_valid']:
+            section.add(f"{i}. ✅ VÁLIDA")
+        else:
+            section.add(f"{i}. ❌ REQUIERE REVISIÓN")
+            section.add(f"   Texto: {rep['text']}")
+
+            if not rep['valid_author']:
+                problems.append("Formato de autor incorrecto (debe ser: Apellido, I.)")
+                codes.append("apa.autor")
+            if not rep['valid_year']:
+                problems.append("Año no encontrado o formato incorrecto (debe ser: (YYYY))")
+                codes.append("apa.año")
+            if not rep['valid_conjuncion']:
+                problems.append(rep['error_conjuncion'])
+                codes.append("apa.conjuncion")
+            for problem in problems:
+                section.add(f"   ⚠️ {problem}")
+
+            doi_url_info = rep['doi_url_info']
+            if not doi_url_info['tiene_doi'] and not doi_url_info['tiene_url']:
+                section.add("   ℹ️ Sin DOI ni URL")
+            if doi_url_info['formato_antiguo']:
+                section.add("   ⚠️ Usa formato antiguo 'Recuperado de' (debe omitirse)")
+
+        section.add("")
+        entries.append({
+            "posicion": i,
+            "valida": rep['is_valid'],
+            "texto": rep['text'],
+            "año": rep['year'],
+            "problemas": problems,
+            "codigos": codes,
+            "doi_url": rep['doi_url_info'],
+        })
+
+    section.data["referencias"] = entries
+    return section
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def _synthetic_references(n: int) -> List[Reference]:
+    refs = []
+    for i in range(n):
+        conj = "&" if i % 7 == 0 else "y"
+        refs.append(Reference(f"Autor{i:04d}, A. {conj} Pérez, B. ({1990 + i % 35}). "
+                              f"Título del trabajo {i}. Revista Visión Conjunta, {i % 30}(2), 1-20. "
+                              f"https://doi.org/10.1000/vc.{i}"))
+    return refs
+
+
+def run_benchmark(n_references: int = 1000, repeats: int = 5):
+    print("SILVINA - Escritores de Reporte (Benchmark)")
+    print("=" * 60)
+    references = _synthetic_references(n_references)
+    metadata = {"documento": "sintetico.docx", "fecha": "2025-01-01T00:00:00"}
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        detail = reference_detail_section(references)
+    build = (time.perf_counter() - start) / repeats
+    print(f"  Modelo ({n_references:,} referencias): {build * 1000:7.1f} ms")
+
+    for fmt in WRITERS:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            out = io.StringIO()
+            render(metadata, [detail], make_writer(fmt, out))
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"  {fmt:>5}: {elapsed * 1000:7.1f} ms | {len(out.getvalue()) / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
+    else:
+        sample = reference_detail_section(_synthetic_references(3))
+        for fmt in WRITERS:
+            print(f"--- {fmt} ---")
+            render({"documento": "demo.docx"}, [sample], make_writer(fmt, sys.stdout))
+            print()
@@ -0,0 +1,346 @@
+# section_index.py
+"""
+SILVINA Editorial Assistant - Section Index
+One-pass section tree from heading styles and heading patterns, with
+prefix-sum character counts (footnotes included) for O(1) section sizes
+and O(log n) cut suggestions
+Universidad de la Defensa Nacional
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+import re
+
+from reference_parser import normalize_name
+from reference_segmenter import HEADING_NUMBER, ParagraphInfo, reference_heading_type
+
+
+# ============================================================
+# PATTERNS
+# ============================================================
+
+# Normalized heading text -> section kind
+SECTION_KINDS = {
+    "resumen": "resumen",
+    "abstract": "resumen",
+    "introduccion": "introduccion",
+    "metodo": "metodo",
+    "metodos": "metodo",
+    "metodologia": "metodo",
+    "materiales y metodos": "metodo",
+    "marco metodologico": "metodo",
+    "resultados": "resultados",
+    "discusion": "discusion",
+    "resultados y discusion": "resultados",
+    "conclusion": "conclusion",
+    "conclusiones": "conclusion",
+    "consideraciones finales": "conclusion",
+    "anexo": "anexo",
+    "anexos": "anexo",
+    "apendice": "anexo",
+}
+
+IMRYD_KINDS = ("introduccion", "metodo", "resultados", "discusion", "conclusion")
+
+# "Heading 2", "Título 3" -> 2, 3
+STYLE_LEVEL = re.compile(r'(\d+)\s*$')
+MAX_HEADING_LENGTH = 80
+
+
+# ============================================================
+# DATA CLASSES
+# ============================================================
+
+@dataclass
+class CutSuggestion:
+    """Smallest set of largest paragraphs whose removal meets a limit."""
+
+    excess: int
+    paragraphs: List[Tuple[int, int]]  # (paragraph position, characters)
+    removed: int
+
+    @property
+    def feasible(self) -> bool:
+        return self.removed >= self.excess
+
+
+@dataclass
+class Section:
+    """A heading and the paragraph positions it spans, [start, end)."""
+
+    title: str
+    kind: str
+    level: int
+    start: int
+    end: int = 0
+    children: List["Section"] = field(default_factory=list)
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+# ============================================================
+# HEADING DETECTION
+# ============================================================
+
+def section_kind(text: str) -> Optional[str]:
+    """Kind of a known section heading ("2. Metodología" -> "metodo")."""
+    text = text.strip()
+    if not text or len(text) > MAX_HEADING_LENGTH:
+        return None
+    key = normalize_name(HEADING_NUMBER.sub('', text).rstrip(':.'))
+    if key in SECTION_KINDS:
+        return SECTION_KINDS[key]
+    if key.split(' ')[0] in ("anexo", "apendice"):
+        return "anexo"  # "Anexo A", "Apéndice 2"
+    return None
+
+
+def heading_level(para: ParagraphInfo) -> Optional[int]:
+    """
+    Outline level of a heading paragraph, or None for body text.
+
+    Heading styles give their own level ("Título 2" -> 2, document title
+    -> 0). Unstyled paragraphs count as level-1 headings only when their
+    whole text is a known section name, so prose that merely mentions
+    "método" or "resultados" never opens a section.
+    """
+    if para.is_heading and para.text.strip():
+        match = STYLE_LEVEL.search(para.style)
+        return int(match.group(1)) if match else 0
+    if section_kind(para.text) or reference_heading_type(para):
+        return 1
+    return None
+
+
+# ============================================================
+# SECTION INDEX
+# ============================================================
+
+class SectionIndex:
+    """
+    Section tree plus cumulative character counts of a manuscript.
+
+    Built in a single pass over the paragraphs. `prefix[i]` holds the
+    characters of paragraphs [0, i), each paragraph counted together with
+    the footnotes anchored in it, so the size of any paragraph range (and
+    thus of any section) is one subtraction.
+    """
+
+    def __init__(self, paragraphs: Sequence[ParagraphInfo],
+                 footnote_chars: Optional[Sequence[int]] = None):
+        self.paragraphs = paragraphs
+        self.root = Section("Documento", "documento", -1, 0, len(paragraphs))
+        self.prefix = array('q', [0])
+        self.headings: List[Section] = []
+        self._heading_starts: List[int] = []
+        self._cut_order: Optional[List[Tuple[int, int]]] = None
+        self._cut_prefix: Optional[array] = None
+        self._cut_negated: Optional[array] = None
+
+        stack = [self.root]
+        for pos, para in enumerate(paragraphs):
+            level = heading_level(para)
+            if level is not None:
+                while stack[-1].level >= level:
+                    stack.pop().end = pos
+                kind = (section_kind(para.text)
+                        or ("referencias" if reference_heading_type(para) else "otra"))
+                section = Section(para.text.strip(), kind, level, pos)
+                stack[-1].children.append(section)
+                stack.append(section)
+                self.headings.append(section)
+                self._heading_starts.append(pos)
+            notes = footnote_chars[pos] if footnote_chars else 0
+            self.prefix.append(self.prefix[-1] + len(para.text) + notes)
+
+        for section in stack[1:]:
+            section.end = len(paragraphs)
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str]) -> "SectionIndex":
+        return cls([ParagraphInfo(text, i) for i, text in enumerate(texts)])
+
+    # --- Size queries ---
+
+    def chars(self, start: int, end: int) -> int:
+        """Characters in paragraph positions [start, end)."""
+        return self.prefix[end] - self.prefix[start]
+
+    def paragraph_chars(self, pos: int) -> int:
+        """Characters of one paragraph plus its footnotes."""
+        return self.prefix[pos + 1] - self.prefix[pos]
+
+    def section_chars(self, section: Section) -> int:
+        return self.chars(section.start, section.end)
+
+    def section_at(self, pos: int) -> Section:
+        """Innermost section containing paragraph `pos` (O(log n))."""
+        i = bisect_right(self._heading_starts, pos) - 1
+        while i >= 0:
+            section = self.headings[i]
+            if pos < section.end:
+                return section
+            i -= 1
+        return self.root
+
+    @property
+    def total_chars(self) -> int:
+        return self.prefix[-1]
+
+    # --- Section queries ---
+
+    def find(self, kind: str) -> List[Section]:
+        return [s for s in self.headings if s.kind == kind]
+
+    def imryd_kinds(self) -> List[str]:
+        """IMRyD section kinds present as headings, in canonical order."""
+        present = {s.kind for s in self.headings}
+        if "resultados" in present and any(
+                normalize_name(s.title).endswith("discusion") for s in self.find("resultados")):
+            present.add("discusion")  # "Resultados y discusión"
+        return [kind for kind in IMRYD_KINDS if kind in present]
+
+    def has_imryd(self, minimum: int = 4) -> bool:
+        return len(self.imryd_kinds()) >= minimum
+
+    def reference_section(self) -> Tuple[Optional[int], Optional[int], str]:
+        """
+        Same contract as reference_segmenter.find_reference_section.
+
+        The last references heading wins; its body runs to the next
+        heading of any level.
+        """
+        for section in reversed(self.headings):
+            if section.kind == "referencias":
+                section_type = reference_heading_type(self.paragraphs[section.start])
+                end = section.end
+                for later in self.headings:
+                    if section.start < later.start < end:
+                        end = later.start
+                        break
+                return section.start + 1, end, section_type
+        return None, None, "Referencias"
+
+    def section_sizes(self, max_level: int = 1) -> List[Tuple[Section, int]]:
+        """
+        (section, characters) for headings up to `max_level`, in order.
+
+        The document title (level 0) spans the whole text and is not listed.
+        """
+        return [(s, self.section_chars(s)) for s in self.headings if 1 <= s.level <= max_level]
+
+    def leaf_sizes(self) -> List[Tuple[Section, int]]:
+        """
+        (section, characters) for the innermost sections of the body, in order.
+
+        These are the units an author can shorten: the title, sections that
+        only group subsections and the reference list are left out.
+        """
+        return [(s, self.section_chars(s)) for s in self.headings
+                if s.level >= 1 and not s.children and s.kind != "referencias"]
+
+    # --- Cut suggestions ---
+
+    def _build_cut_order(self):
+        """Body paragraphs by size, largest first, with a running total."""
+        excluded = set(self._heading_starts)
+        start, end, _ = self.reference_section()
+        if start is not None:
+            excluded.update(range(start, end))
+        order = sorted(((pos, self.paragraph_chars(pos)) for pos in range(len(self.paragraphs))
+                        if pos not in excluded), key=lambda item: -item[1])
+        running = array('q')
+        total = 0
+        for _, size in order:
+            total += size
+            running.append(total)
+        self._cut_order, self._cut_prefix = order, running
+        self._cut_negated = array('q', (-size for _, size in order))
+
+    def suggest_cuts(self, limit: int, total: Optional[int] = None) -> CutSuggestion:
+        """
+        Fewest paragraphs whose removal brings the text under `limit`.
+
+        Headings and the reference list are never proposed. Removing the
+        largest paragraphs first is optimal for the count, so after a one-off
+        sort a binary search over the running total gives that count. The
+        last pick is then swapped for the smallest paragraph that still
+        covers the remaining excess (a second binary search), so a small
+        excess is not met by cutting the longest paragraph of the article.
+
+        Args:
+            limit: Character limit (e.g. 50,000 for scientific articles)
+            total: Character count to measure against (default: the index
+                total; pass Word's own count to match the EUMIC report)
+        """
+        if self._cut_order is None:
+            self._build_cut_order()
+        excess = (self.total_chars if total is None else total) - limit
+        if excess <= 0:
+            return CutSuggestion(0, [], 0)
+        count = min(bisect_left(self._cut_prefix, excess) + 1, len(self._cut_order))
+        if count == 0:
+            return CutSuggestion(excess, [], 0)
+        chosen = self._cut_order[:count - 1]
+        already = self._cut_prefix[count - 2] if count > 1 else 0
+        # Descending sizes from position count-1 on: last one still >= residue
+        last = bisect_right(self._cut_negated, already - excess, lo=count - 1) - 1
+        last = max(last, count - 1)
+        chosen.append(self._cut_order[last])
+        removed = already + self._cut_order[last][1]
+        return CutSuggestion(excess, sorted(chosen), removed)
+
+    def largest_paragraphs(self, n: int = 5) -> List[Tuple[int, int]]:
+        """The `n` largest body paragraphs as (position, characters)."""
+        if self._cut_order is None:
+            self._build_cut_order()
+        return self._cut_order[:n]
+
+
+# ============================================================
+# TEST MODE
+# ============================================================
+
+if __name__ == "__main__":
+    sample = [
+        ParagraphInfo("La ciberdefensa en el Atlántico Sur", 0, "Título"),
+        ParagraphInfo("Resumen", 1),
+        ParagraphInfo("Este trabajo describe el método y los resultados de una encuesta.", 2),
+        ParagraphInfo("1. Introducción", 3, "Título 1"),
+        ParagraphInfo("Texto introductorio " * 40, 4),
+        ParagraphInfo("2. Metodología", 5, "Título 1"),
+        ParagraphInfo("2.1 Muestra", 6, "Título 2"),
+        ParagraphInfo("Descripción de la muestra " * 60, 7),
+        ParagraphInfo("3. Resultados y discusión", 8, "Título 1"),
+        ParagraphInfo("Hallazgos principales " * 80, 9),
+        ParagraphInfo("4. Conclusiones", 10, "Título 1"),
+        ParagraphInfo("Cierre del artículo " * 20, 11),
+        ParagraphInfo("Referencias", 12, "Título 1"),
+        ParagraphInfo("López, M. (2019). Ciberdefensa. Editorial UNDEF.", 13),
+        ParagraphInfo("Anexo A", 14, "Título 1"),
+        ParagraphInfo("Cuestionario", 15),
+    ]
+
+    index = SectionIndex(sample)
+    print("SILVINA - Índice de Secciones")
+    print("=" * 60)
+    for section in index.root.walk():
+        if section is index.root:
+            continue
+        indent = "  " * max(section.level, 0)
+        print(f"  {indent}{section.title} [{section.kind}] "
+              f"¶{section.start}-{section.end - 1}: {index.section_chars(section):,} caracteres")
+    print(f"\n  IMRyD detectado: {index.imryd_kinds()} → {'sí' if index.has_imryd() else 'no'}")
+    print(f"  Sección de referencias: {index.reference_section()}")
+    print(f"  Secciones más extensas: "
+          f"{[(s.title, n) for s, n in sorted(index.leaf_sizes(), key=lambda item: -item[1])[:3]]}")
+
+    cuts = index.suggest_cuts(limit=3000)
+    print(f"\n  Para bajar a 3,000 caracteres ({cuts.excess:,} de exceso):")
+    for pos, size in cuts.paragraphs:
+        print(f"    ✂️ ¶{pos} ({index.section_at(pos).title}): {size:,} caracteres")
@@ -0,0 +1,36 @@
+# silvina/__init__.py
+"""
+SILVINA Editorial Assistant
+Importable package: editorial pipeline, citation commands and the
+`python -m silvina` command line. Attributes load on first access so
+that `import silvina` stays cheap.
+Universidad de la Defensa Nacional
+"""
+
+import importlib
+
+__version__ = "0.6.0"
+
+_LAZY = {
+    "Document": "silvina.pipeline",
+    "report_for": "silvina.pipeline",
+    "load_document": "silvina.documents",
+    "analyze_citations": "silvina.commands",
+    "check_citation_integrity": "silvina.commands",
+    "search_parentheses": "silvina.commands",
+    "debug_paragraphs": "silvina.commands",
+    "stream_report": "silvina.commands",
+    "annotate": "silvina.annotate",
+    "autofix": "silvina.autofix",
+    "main": "silvina.cli",
+}
+
+__all__ = ["__version__", *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'silvina' has no attribute {name!r}")
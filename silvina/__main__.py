@@ -0,0 +1,8 @@
+# silvina/__main__.py
+"""python -m silvina <comando> ..."""
+
+import sys
+
+from silvina.cli import main
+
+sys.exit(main())
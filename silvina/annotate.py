@@ -0,0 +1,189 @@
+# silvina/annotate.py
+"""
+SILVINA Editorial Assistant - Annotated Manuscript
+Runs the report validators and the citation cross-check, anchors every
+finding in the paragraph (and, when known, the characters) it is about,
+and writes them into a copy of the .docx as Word comments
+Universidad de la Defensa Nacional
+"""
+
+from typing import List, Optional, Sequence
+import re
+
+from docx_comments import AnnotationResult, Finding, annotate_docx
+
+
+# Report sections whose issues point at a reference
+ANNOTATED_SECTIONS = ("revision_llm", "detalle", "orden_alfabetico", "duplicados", "comillas",
+                      "verificacion_doi", "enlaces_rotos", "tipografia", "siglas", "terminologia")
+
+ENGLISH_QUOTES = re.compile(r'"[^"]*"|\'[^\']*\'|["\']')
+# Fragments the LLM quotes from the text: «...», "..." or “...”
+QUOTED_FRAGMENT = re.compile(r'«([^»]{3,})»|"([^"]{3,})"|“([^”]{3,})”')
+LIST_MARKER = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s*')
+
+
+# ============================================================
+# FINDINGS
+# ============================================================
+
+def _reference_span(text: str, entry) -> tuple:
+    """Characters of `entry` inside its first paragraph; the whole paragraph when not found."""
+    start = text.find(entry.text[:40])
+    if start < 0:
+        return None, None
+    return start, min(len(text), start + len(entry.text))
+
+
+def reference_findings(sections, entries, texts: Sequence[str]) -> List[Finding]:
+    """Issues of the reference sections, anchored to each reference's paragraph."""
+    from silvina.history import ISSUE_EXTRACTORS
+
+    findings = []
+    for section in sections:
+        extractor = ISSUE_EXTRACTORS.get(section.key)
+        if extractor is None:
+            continue
+        for issue in extractor(section.data):
+            if issue.position is None or not 0 < issue.position <= len(entries):
+                continue
+            entry = entries[issue.position - 1]
+            text = texts[entry.paragraph_index]
+            start, end = _reference_span(text, entry)
+            if issue.rule == "apa.comillas_inglesas":
+                quote = ENGLISH_QUOTES.search(text, start or 0)
+                if quote:
+                    start, end = quote.span()
+            findings.append(Finding(entry.paragraph_index, issue.message, start, end, rule=issue.rule))
+    return findings
+
+
+def citation_findings(texts: Sequence[str], first_reference: int, entries) -> List[Finding]:
+    """Orphan, ambiguous and misspelled citations in the body; references never cited."""
+    from citation_integrity import check_integrity
+    from citations import CitationExtractor
+
+    citations = CitationExtractor().extract_document(texts[:first_reference])
+    integrity = check_integrity(citations, entries)
+    findings = []
+    for match in integrity.matches:
+        if match.status == 'exacta':
+            continue
+        citation = match.citation
+        message = {
+            'sin_referencia': "Cita sin referencia en la lista",
+            'ambigua': "Cita ambigua: coincide con varias referencias",
+            'aproximada': "Posible error tipográfico en la cita",
+        }[match.status]
+        if match.notes:
+            message += ": " + "; ".join(match.notes)
+        findings.append(Finding(citation.paragraph_index, message, citation.start_pos,
+                                citation.start_pos + len(citation.raw_text), rule=f"cita.{match.status}"))
+    for position, paragraph, text in integrity.uncited_references:
+        if paragraph is not None:
+            start, end = _reference_span(texts[paragraph], entries[position - 1])
+            findings.append(Finding(paragraph, "Referencia nunca citada en el texto", start, end,
+                                    rule="referencia.no_citada"))
+    return findings
+
+
+def typography_findings(data) -> List[Finding]:
+    """Typography problems of the body and the references (comments cannot go into footnotes)."""
+    from typography import NOTE
+
+    return [Finding(h['parrafo'], h['mensaje'], h['inicio'], h['fin'], rule=f"tipografia.{h['regla']}")
+            for h in data.get('hallazgos', []) if h['area'] != NOTE]
+
+
+def acronym_findings(data) -> List[Finding]:
+    """Acronyms used before their definition, never defined or defined twice (body only)."""
+    from acronyms import NOTE
+
+    findings = []
+    for problema in data.get('problemas', []):
+        if problema['area'] == NOTE:
+            continue
+        message = f"{problema['sigla']}: {problema['mensaje']}"
+        definicion = problema['definicion']
+        if definicion and definicion['area'] != NOTE:
+            message += f" (definida en el párrafo {definicion['parrafo'] + 1})"
+        findings.append(Finding(problema['parrafo'], message, problema['inicio'], problema['fin'],
+                                rule=problema['regla']))
+    return findings
+
+
+def terminology_findings(data) -> List[Finding]:
+    """Deprecated glossary variants in the body, with the preferred form."""
+    from terminology import NOTE
+
+    return [Finding(h['parrafo'], f"Término desaconsejado: use «{h['preferida']}»", h['inicio'], h['fin'],
+                    rule="terminologia.variante")
+            for h in data.get('hallazgos', []) if h['area'] != NOTE]
+
+
+def llm_findings(revision: Optional[str], texts: Sequence[str]) -> List[Finding]:
+    """
+    One finding per line of the LLM review that quotes the text.
+
+    The first quoted fragment found in the manuscript anchors the line;
+    lines that quote nothing locatable are left out.
+    """
+    findings = []
+    for line in (revision or "").splitlines():
+        for match in QUOTED_FRAGMENT.finditer(line):
+            fragment = next(group for group in match.groups() if group)
+            located = next(((i, text.find(fragment)) for i, text in enumerate(texts) if fragment in text), None)
+            if located:
+                i, start = located
+                findings.append(Finding(i, LIST_MARKER.sub("", line).strip(), start, start + len(fragment),
+                                        rule="llm.gramatica"))
+                break
+    return findings
+
+
+# ============================================================
+# ANNOTATED COPY
+# ============================================================
+
+def annotate(path: str, output: Optional[str] = None, include_llm: bool = True,
+             doi_index_path: Optional[str] = None, check_links: bool = False,
+             glossary_path: Optional[str] = None) -> AnnotationResult:
+    """
+    Validate `path` and write its findings as comments into a copy.
+
+    The .docx is read from its XML (not through Word) so paragraph
+    indices and offsets match the parts the comments are written into.
+    """
+    from document_backends import ReplayBackend, snapshot_from_docx
+    from reference_segmenter import segment_references
+    from silvina.pipeline import Document
+
+    if not path.lower().endswith(".docx"):
+        raise ValueError(f"Solo se pueden anotar archivos .docx: {path}")
+    snapshot = snapshot_from_docx(path)
+    texts = [record.text[:-1] if record.text.endswith("\r") else record.text for record in snapshot.paragraphs]
+
+    doc = Document(path, backend=ReplayBackend(snapshot))
+    doc.load()
+    try:
+        sections = list(doc.iter_report_sections(include_llm=include_llm, doi_index_path=doi_index_path,
+                                                 check_links=check_links, sections=ANNOTATED_SECTIONS,
+                                                 glossary_path=glossary_path))
+    finally:
+        doc.close()
+
+    entries = segment_references(doc.reference_paragraphs)
+    first_reference = doc.reference_paragraphs[0].index if doc.reference_paragraphs else len(texts)
+    findings = citation_findings(texts, first_reference, entries)
+    findings.extend(reference_findings(sections, entries, texts))
+    for section in sections:
+        if section.key == "revision_llm":
+            findings.extend(llm_findings(section.data.get('revision'), texts[:first_reference]))
+        elif section.key == "tipografia":
+            findings.extend(typography_findings(section.data))
+        elif section.key == "siglas":
+            findings.extend(acronym_findings(section.data))
+        elif section.key == "terminologia":
+            findings.extend(terminology_findings(section.data))
+    findings.sort(key=lambda f: (f.paragraph, f.start or 0))
+    return annotate_docx(path, findings, output)
@@ -0,0 +1,185 @@
+# silvina/autofix.py
+"""
+SILVINA Editorial Assistant - Bulk Auto-Fix
+Plans the mechanical fixes of the bibliography ('&' -> 'y', no
+"Recuperado de", « » quotes, alphabetical order) as non-overlapping
+edits and writes them into a clean or tracked-changes copy
+Universidad de la Defensa Nacional
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+import re
+
+from docx_fixes import Edit, FixPlan, FixResult, Reorder, apply_fixes
+from references import AMPERSAND, RECUPERADO_DE, clave_orden
+
+
+FIXES = ("conjuncion", "recuperado_de", "comillas", "orden")
+
+# First-level quotes to « »; a quote nested inside them becomes “ ” (RAE hierarchy)
+DOUBLE_QUOTED = re.compile(r'"([^"\n]*)"|“([^”\n]*)”')
+SINGLE_QUOTED = re.compile(r"(?<!\w)'([^'\n]+)'(?!\w)")  # not apostrophes (O'Brien)
+
+
+# ============================================================
+# PLANNING
+# ============================================================
+
+def _quote_edits(index: int, text: str) -> List[Edit]:
+    edits = []
+    outer: List[Tuple[int, int]] = []
+    for match in DOUBLE_QUOTED.finditer(text):
+        outer.append(match.span())
+        edits.append(Edit(index, match.start(), match.start() + 1, "«", "apa.comillas_inglesas"))
+        edits.append(Edit(index, match.end() - 1, match.end(), "»", "apa.comillas_inglesas"))
+    for match in SINGLE_QUOTED.finditer(text):
+        nested = any(start < match.start() and match.end() < end for start, end in outer)
+        opening, closing = ("“", "”") if nested else ("«", "»")
+        edits.append(Edit(index, match.start(), match.start() + 1, opening, "apa.comillas_inglesas"))
+        edits.append(Edit(index, match.end() - 1, match.end(), closing, "apa.comillas_inglesas"))
+    return edits
+
+
+def paragraph_edits(index: int, text: str, fixes: Iterable[str] = FIXES) -> List[Edit]:
+    """Edits for one bibliography paragraph."""
+    edits = []
+    if "conjuncion" in fixes:
+        edits.extend(Edit(index, m.start(1), m.end(1), " y", "apa.conjuncion") for m in AMPERSAND.finditer(text))
+    if "recuperado_de" in fixes:
+        edits.extend(Edit(index, m.start(), m.end(), "", "apa.recuperado_de") for m in RECUPERADO_DE.finditer(text))
+    if "comillas" in fixes:
+        edits.extend(_quote_edits(index, text))
+    return edits
+
+
+def alphabetical_reorder(entries, last_paragraph: int) -> Tuple[Optional[Reorder], str]:
+    """
+    Blocks of paragraphs, one per entry, in alphabetical order.
+
+    Each entry owns the paragraphs from its first one to the next entry's
+    (continuation lines and blank paragraphs move with it). Entries that
+    share a paragraph cannot be moved apart.
+    """
+    starts = [entry.paragraph_index for entry in entries]
+    if any(a >= b for a, b in zip(starts, starts[1:])):
+        return None, "varias referencias comparten un párrafo: orden sin cambios"
+    blocks = [(start, end - 1) for start, end in zip(starts, starts[1:] + [last_paragraph + 1])]
+    order = sorted(range(len(entries)), key=lambda k: clave_orden(entries[k].text))  # stable
+    if order == list(range(len(entries))):
+        return None, ""
+    return Reorder(blocks, order), ""
+
+
+def plan_fixes(texts: Sequence[str], reference_paragraphs, fixes: Iterable[str] = FIXES) -> Tuple[FixPlan, str]:
+    """
+    Plan every fix on the bibliography.
+
+    Args:
+        texts: text of every paragraph, indexed as read_docx numbers them
+        reference_paragraphs: ParagraphInfo records of the reference section
+    """
+    from reference_segmenter import segment_references
+
+    fixes = tuple(fixes)
+    plan, note = FixPlan(), ""
+    for info in reference_paragraphs:
+        for edit in paragraph_edits(info.index, texts[info.index], fixes):
+            plan.add(edit, texts[info.index])
+    if "orden" in fixes and reference_paragraphs:
+        entries = [entry for entry in segment_references(reference_paragraphs) if entry.text.split()]
+        plan.reorder, note = alphabetical_reorder(entries, reference_paragraphs[-1].index)
+    return plan, note
+
+
+# ============================================================
+# CORRECTED COPY
+# ============================================================
+
+def autofix(path: str, output: Optional[str] = None, tracked: bool = False,
+            fixes: Iterable[str] = FIXES) -> Tuple[FixResult, FixPlan]:
+    """
+    Write the corrected copy of `path`.
+
+    The .docx is read from its XML so paragraph indices and offsets match
+    the part the edits are written into.
+    """
+    from document_backends import ReplayBackend, snapshot_from_docx
+    from silvina.pipeline import Document
+
+    if not path.lower().endswith(".docx"):
+        raise ValueError(f"Solo se pueden corregir archivos .docx: {path}")
+    snapshot = snapshot_from_docx(path)
+    texts = [record.text[:-1] if record.text.endswith("\r") else record.text for record in snapshot.paragraphs]
+
+    doc = Document(path, backend=ReplayBackend(snapshot))
+    doc.load()
+    doc.close()
+    plan, note = plan_fixes(texts, doc.reference_paragraphs, fixes)
+    result = apply_fixes(path, plan, output, tracked)
+    result.note = result.note or note
+    return result, plan
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(n_references: int = 400, error_rate: float = 0.5):
+    """A whole bibliography normalized: plan, clean copy and tracked copy."""
+    import os
+    import tempfile
+    import time
+    from docx_fixes import apply_to_text
+    from docx_io import read_docx
+    from manuscript_generator import ManuscriptSpec, write_manuscript
+    from reference_segmenter import find_reference_section
+    from references import Reference, validar_orden_alfabetico
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "manuscrito.docx")
+        write_manuscript(source, ManuscriptSpec(body_chars=20_000, n_references=n_references,
+                                                error_rate=error_rate))
+        paragraphs = read_docx(source).paragraphs
+        texts = [para.text for para in paragraphs]
+        start, end, _ = find_reference_section(paragraphs)
+        section = [para for para in paragraphs[start:end] if para.text.strip()]
+
+        elapsed = time.perf_counter()
+        plan, _ = plan_fixes(texts, section)
+        planned = time.perf_counter() - elapsed
+
+        timings = {}
+        outputs = {}
+        for tracked in (False, True):
+            elapsed = time.perf_counter()
+            result = apply_fixes(source, plan, os.path.join(tmp, f"corregido_{tracked}.docx"), tracked)
+            timings[tracked] = time.perf_counter() - elapsed
+            outputs[tracked] = [p.text for p in read_docx(result.output).paragraphs if p.text.strip()]
+
+        # Expected: edits applied, entries in the new order (read_docx skips deleted text)
+        fixed = {i: apply_to_text(texts[i], edits) for i, edits in plan.edits.items()}
+        blocks = plan.reorder.blocks if plan.reorder else []
+        order = plan.reorder.order if plan.reorder else []
+        moved = [i for k in order for i in range(blocks[k][0], blocks[k][1] + 1)]
+        sequence = list(range(blocks[0][0])) + moved + list(range(blocks[-1][1] + 1, len(texts))) \
+            if blocks else list(range(len(texts)))
+        expected = [fixed.get(i, texts[i]) for i in sequence if texts[i].strip()]
+        after = [Reference(text) for text in outputs[False][-len(section):]]
+
+    print("SILVINA - Corrección automática (Benchmark)")
+    print("=" * 60)
+    print(f"  Referencias: {n_references} | correcciones: {len(plan)} "
+          f"({', '.join(f'{rule}: {n}' for rule, n in sorted(plan.by_rule().items()))})")
+    print(f"  Bloques reordenados: {len(order) - sum(1 for n, k in enumerate(order) if n == k)}")
+    print(f"  Planificación      : {planned * 1000:7.1f} ms")
+    print(f"  Copia limpia       : {timings[False] * 1000:7.1f} ms")
+    print(f"  Control de cambios : {timings[True] * 1000:7.1f} ms")
+    print(f"  Texto esperado (limpia / cambios aceptados): "
+          f"{'✓' if outputs[False] == expected else '✗'} / {'✓' if outputs[True] == expected else '✗'}")
+    print(f"  Después: '&' {sum(not ref.validar_conjuncion_espanola()[0] for ref in after)}, "
+          f"'Recuperado de' {sum(ref.tiene_doi_o_url()['formato_antiguo'] for ref in after)}, "
+          f"orden {'✓' if validar_orden_alfabetico(after)['ordenadas'] else '✗'}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
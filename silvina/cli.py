@@ -0,0 +1,445 @@
+# silvina/cli.py
+"""
+SILVINA Editorial Assistant - Command Line
+One entry point with subcommands; each subcommand imports only what it
+uses, so COM, Ollama and the report pipeline load on demand
+Universidad de la Defensa Nacional
+"""
+
+import argparse
+import os
+import sys
+
+from silvina import __version__
+
+
+REPORT_FORMATS = ("txt", "md", "json", "jsonl")
+STARTUP_TARGET_MS = 150
+
+
+def _documents(paths):
+    """Expand directories into the .docx files and fixtures they hold."""
+    from document_backends import FIXTURE_SUFFIX
+
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith((".docx", FIXTURE_SUFFIX)) and not name.startswith("~$"))
+        else:
+            found.append(path)
+    return found
+
+
+def _document(path, use_cache=True):
+    """Pipeline Document over a cached snapshot (no Word once the snapshot exists)."""
+    from document_backends import ReplayBackend
+    from silvina.documents import load_document
+    from silvina.pipeline import Document
+
+    return Document(path, backend=ReplayBackend(load_document(path, use_cache)))
+
+
+# ============================================================
+# SUBCOMMANDS
+# ============================================================
+
+def cmd_analyze(args):
+    from silvina.commands import analyze_citations
+    return 0 if analyze_citations(args.documento, not args.sin_cache, args.procesos) is not None else 1
+
+
+def cmd_check(args):
+    from silvina.commands import check_citation_integrity
+    result = check_citation_integrity(args.documento, not args.sin_cache, args.procesos)
+    return 0 if result else 1
+
+
+def cmd_search(args):
+    from silvina.commands import search_parentheses
+    search_parentheses(args.documento, not args.sin_cache)
+    return 0
+
+
+def cmd_debug(args):
+    from silvina.commands import debug_paragraphs
+    debug_paragraphs(args.documento, args.desde, args.cantidad, not args.sin_cache)
+    return 0
+
+
+def cmd_report(args):
+    if args.flujo:
+        from silvina.commands import stream_report
+        return 0 if stream_report(args.documento, args.flujo) else 1
+
+    import contextlib
+    from document_backends import ReplayBackend
+    from report_writers import MultiWriter, make_writer
+    from silvina.documents import open_snapshot
+    from silvina.pipeline import REPORT_SECTIONS, Document
+    from tracing import TRACER
+
+    sections = args.secciones.split(",") if args.secciones else None
+    unknown = [key for key in sections or () if key not in REPORT_SECTIONS]
+    if unknown:
+        print(f"✗ Secciones desconocidas: {', '.join(unknown)} (disponibles: {', '.join(REPORT_SECTIONS)})")
+        return 2
+    snapshot = open_snapshot(args.documento, not args.sin_cache)
+    if snapshot is None:
+        return 1
+    if args.trace:
+        TRACER.enable()
+    out = sys.stdout if args.salida in (None, "-") else open(args.salida, "w", encoding="utf-8")
+    # When the report goes to stdout, progress goes to stderr so JSON stays parseable
+    progress = sys.stderr if out is sys.stdout else sys.stdout
+    doc = None
+    try:
+        with contextlib.redirect_stdout(progress), _recording(args, "cli") as recorder:
+            doc = Document(args.documento, backend=ReplayBackend(snapshot))
+            doc.load()
+            writer = make_writer(args.formato, out)
+            doc.write_report(writer if recorder is None else MultiWriter([writer, recorder]),
+                             include_llm=not args.sin_llm, doi_index_path=args.indice_doi,
+                             check_links=args.enlaces, sections=sections, glossary_path=args.glosario)
+            if recorder is not None:
+                recorder.rule_run = doc.rule_run
+    finally:
+        if doc is not None:
+            doc.close()
+        if out is not sys.stdout:
+            out.close()
+            print(f"💾 Reporte guardado: {args.salida}")
+    if args.trace:
+        trace = os.path.splitext(args.salida or "silvina")[0] + "_trace.json"
+        TRACER.export_chrome(trace)
+        print(f"💾 Traza Chrome: {trace}", file=progress)
+    return 0
+
+
+def cmd_annotate(args):
+    from silvina.annotate import annotate
+    from silvina.documents import document_exists
+
+    if not document_exists(args.documento):
+        return 1
+    try:
+        result = annotate(args.documento, args.salida, include_llm=not args.sin_llm,
+                          doi_index_path=args.indice_doi, check_links=args.enlaces, glossary_path=args.glosario)
+    except (ValueError, OSError) as e:
+        print(f"✗ Error: {e}")
+        return 1
+    print(f"\n💬 {result.comments} comentarios escritos en {result.output}")
+    return 0
+
+
+def cmd_fix(args):
+    from silvina.autofix import FIXES, autofix
+    from silvina.documents import document_exists
+
+    fixes = args.solo.split(",") if args.solo else FIXES
+    unknown = [name for name in fixes if name not in FIXES]
+    if unknown:
+        print(f"✗ Correcciones desconocidas: {', '.join(unknown)} (disponibles: {', '.join(FIXES)})")
+        return 2
+    if not document_exists(args.documento):
+        return 1
+    try:
+        result, plan = autofix(args.documento, args.salida, tracked=args.cambios, fixes=fixes)
+    except (ValueError, OSError) as e:
+        print(f"✗ Error: {e}")
+        return 1
+    print(f"\n🛠️ {result.edits} correcciones" + (", bibliografía reordenada" if result.reordered else ""))
+    for rule, n in sorted(plan.by_rule().items()):
+        print(f"  • {rule}: {n}")
+    for edit, reason in plan.rejected:
+        print(f"  ⚠️ [¶{edit.paragraph}] {edit.rule}: {reason}")
+    if result.note:
+        print(f"  ⚠️ {result.note}")
+    print(f"💾 {'Copia con control de cambios' if result.tracked else 'Copia corregida'}: {result.output}")
+    return 0
+
+
+def _recording(args, source):
+    """History recording for a report run, or a no-op with --sin-historial.
+
+    Runs filtered with --secciones are not recorded either: a partial report
+    would count as a clean full run and skew the trends and rule statistics.
+    """
+    import contextlib
+    if args.sin_historial or args.secciones:
+        return contextlib.nullcontext()
+    from silvina.history import HistoryStore, recording
+    from silvina.pipeline import LLM_MODEL
+    return recording(args.documento, HistoryStore(), source, None if args.sin_llm else LLM_MODEL)
+
+
+def _batch_one(task):
+    """Worker: render one document's report; returns (path, text, error, history record)."""
+    path, fmt, include_llm, use_cache = task
+    import contextlib
+    import io
+    from report_writers import MultiWriter, make_writer
+    from silvina.history import recording
+    from silvina.pipeline import LLM_MODEL
+
+    buffer = io.StringIO()
+    recorder = None
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # keep progress prints out of the batch output
+            with recording(path, None, "lote", LLM_MODEL if include_llm else None) as recorder:
+                doc = _document(path, use_cache)
+                doc.load()
+                try:
+                    doc.write_report(MultiWriter([make_writer(fmt, buffer), recorder]), include_llm=include_llm)
+                    recorder.rule_run = doc.rule_run
+                finally:
+                    doc.close()
+        return path, buffer.getvalue(), None, recorder.record
+    except Exception as e:
+        return path, "", f"{type(e).__name__}: {e}", recorder.record if recorder else None
+
+
+def cmd_batch(args):
+    from document_backends import FIXTURE_SUFFIX
+
+    paths = _documents(args.documentos)
+    if not paths:
+        print("✗ No se encontraron documentos")
+        return 1
+    tasks = [(path, args.formato, not args.sin_llm, not args.sin_cache) for path in paths]
+    if args.jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_batch_one, tasks))
+    else:
+        results = [_batch_one(task) for task in tasks]
+
+    if not args.sin_historial:
+        from silvina.history import HistoryStore
+        with HistoryStore() as store:
+            store.add_many(record for *_, record in results if record is not None)
+
+    failed = 0
+    if args.formato == "jsonl":
+        # One record per manuscript in a single file
+        out = sys.stdout if args.salida == "-" else open(args.salida or "silvina_lote.jsonl", "w", encoding="utf-8")
+        try:
+            for _, text, error, _ in results:
+                out.write(text)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        # One report next to each manuscript
+        for path, text, error, _ in results:
+            if error:
+                continue
+            stem = path[:-len(FIXTURE_SUFFIX)] if path.endswith(FIXTURE_SUFFIX) else os.path.splitext(path)[0]
+            with open(f"{stem}.silvina.{args.formato}", "w", encoding="utf-8") as f:
+                f.write(text)
+    for path, _, error, _ in results:
+        if error:
+            failed += 1
+            print(f"✗ {os.path.basename(path)}: {error}")
+    print(f"✓ {len(results) - failed}/{len(results)} documentos procesados")
+    return 1 if failed else 0
+
+
+def cmd_history(args):
+    """Queries over the run history (silvina/history.py)."""
+    from silvina.history import HistoryStore, parse_since
+
+    try:
+        since = parse_since(args.desde)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    if args.consulta == "documento" and not args.documento:
+        print("✗ Indique el documento (ruta, hash o nombre)")
+        return 2
+    with HistoryStore(args.base) as store:
+        if args.consulta == "exportar":
+            out = sys.stdout if args.salida in (None, "-") else open(args.salida, "w", encoding="utf-8", newline="")
+            try:
+                count = store.export(args.tabla, out, args.formato, since)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            if out is not sys.stdout:
+                print(f"💾 {count:,} filas de '{args.tabla}' exportadas a {args.salida}")
+            return 0
+
+        if args.consulta == "resumen":
+            info = store.summary(since)
+            print(f"📊 Historial: {store.path}")
+            print(f"  • Corridas: {info['corridas']:,} ({info['documentos']:,} documentos distintos)")
+            if info['corridas']:
+                print(f"  • Duración media: {info['duracion_media'] or 0:.2f} s")
+                print(f"  • Problemas registrados: {info['problemas'] or 0:,}")
+                print(f"  • Corridas con error: {info['con_error'] or 0:,}")
+                print(f"  • Desde {_date(info['primera'])} hasta {_date(info['ultima'])}")
+        elif args.consulta == "errores":
+            rows = store.common_issues(since, args.regla, args.limite)
+            print(f"{'Regla':<28} {'Casos':>8} {'Corridas':>9} {'Documentos':>11}")
+            for row in rows:
+                print(f"{row['regla']:<28} {row['casos']:>8,} {row['corridas']:>9,} {row['documentos']:>11,}")
+        elif args.consulta == "tiempos":
+            rows = store.timings(args.periodo, args.etapa, since)
+            print(f"{'Período':<12} {'Corridas':>9} {'Media (s)':>10} {'Máx. (s)':>9}")
+            for row in rows:
+                print(f"{row['periodo']:<12} {row['corridas']:>9,} {row['segundos_media']:>10.2f} "
+                      f"{row['segundos_max']:>9.2f}")
+        elif args.consulta == "documento":
+            for row in store.document_runs(args.documento):
+                estado = f"❌ {row['error']}" if row['error'] else f"{row['issues_total'] or 0} problemas"
+                print(f"{_date(row['started_at'])}  {row['duration'] or 0:6.2f} s  {row['source']:<9} "
+                      f"{row['model'] or 'sin LLM':<20} {estado}")
+    return 0
+
+
+def _date(timestamp) -> str:
+    from datetime import datetime
+    return datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M") if timestamp else "-"
+
+
+def cmd_bench(args):
+    """Wall time of `python -m silvina check` on a cached document, plus the slowest imports."""
+    import statistics
+    import subprocess
+    import tempfile
+    import time
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SILVINA_CACHE=os.path.join(tmp, "cache"),
+                   PYTHONPATH=root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        document = args.documento
+        if document is None:
+            from docx_io import write_docx
+            from manuscript_generator import ManuscriptSpec, generate_manuscript
+            paragraphs, _ = generate_manuscript(ManuscriptSpec())
+            document = os.path.join(tmp, "manuscrito.docx")
+            write_docx(document, paragraphs)
+
+        command = [sys.executable, "-m", "silvina", "check", document]
+        subprocess.run(command, env=env, capture_output=True)  # first run fills the cache
+
+        def timed(cmd):
+            samples = []
+            for _ in range(args.repeticiones):
+                start = time.perf_counter()
+                subprocess.run(cmd, env=env, capture_output=True)
+                samples.append((time.perf_counter() - start) * 1000)
+            return statistics.median(samples)
+
+        interpreter = timed([sys.executable, "-c", "pass"])
+        check = timed(command)
+        imports = subprocess.run([sys.executable, "-X", "importtime", "-m", "silvina", "check", document],
+                                 env=env, capture_output=True, text=True).stderr
+
+    print("SILVINA - Arranque de la CLI (Benchmark)")
+    print("=" * 60)
+    print(f"  Intérprete vacío            : {interpreter:7.1f} ms")
+    print(f"  check (documento en caché)  : {check:7.1f} ms "
+          f"{'✅' if check < STARTUP_TARGET_MS else '⚠️'} objetivo < {STARTUP_TARGET_MS} ms")
+
+    rows = []
+    for line in imports.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            if not name.startswith("  "):  # top-level imports only
+                rows.append((int(parts[1]), name.strip()))
+    print("  Importaciones más costosas:")
+    for cumulative, name in sorted(rows, reverse=True)[:8]:
+        print(f"    {name:<28} {cumulative / 1000:6.1f} ms")
+    return 0 if check < STARTUP_TARGET_MS else 1
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="silvina", description="SILVINA - Asistente Editorial")
+    parser.add_argument("--version", action="version", version=f"silvina {__version__}")
+    sub = parser.add_subparsers(dest="comando", metavar="comando")
+
+    def add(name, func, help_text, document=True):
+        p = sub.add_parser(name, help=help_text)
+        if document:
+            p.add_argument("documento", help=".docx o fixture grabado (.silvina.json.gz)")
+        p.add_argument("--sin-cache", action="store_true", help="releer el documento aunque esté en caché")
+        p.set_defaults(func=func)
+        return p
+
+    for name, func, help_text in (("analyze", cmd_analyze, "citas en texto por tipo"),
+                                  ("check", cmd_check, "integridad citas-referencias")):
+        p = add(name, func, help_text)
+        p.add_argument("--procesos", type=int, default=1, metavar="N",
+                       help="extraer las citas con N procesos (los manuscritos cortos se analizan en línea)")
+    add("search", cmd_search, "párrafos con paréntesis")
+    p = add("debug", cmd_debug, "mostrar párrafos")
+    p.add_argument("--desde", type=int, default=0)
+    p.add_argument("--cantidad", type=int, default=20)
+
+    p = add("report", cmd_report, "reporte editorial completo (EUMIC, APA 7, LLM)")
+    p.add_argument("--formato", choices=REPORT_FORMATS, default="txt")
+    p.add_argument("--salida", help="archivo de salida ('-' o sin valor: consola)")
+    p.add_argument("--sin-llm", action="store_true")
+    p.add_argument("--indice-doi", help="índice DOI local (doi_index.py build)")
+    p.add_argument("--enlaces", action="store_true", help="verificar enlaces (requiere red)")
+    p.add_argument("--glosario", help="glosario de la revista (.csv variante,preferida)")
+    p.add_argument("--trace", action="store_true", help="exportar traza Chrome de las etapas")
+    p.add_argument("--secciones", help="solo estas secciones, separadas por comas (p. ej. referencias,duplicados); "
+                        "no se registra en el historial")
+    p.add_argument("--flujo", metavar="INFORME", help="análisis en flujo para documentos muy grandes")
+    p.add_argument("--sin-historial", action="store_true", help="no registrar la corrida en el historial")
+
+    p = add("annotate", cmd_annotate, "copia del .docx con los hallazgos como comentarios de Word")
+    p.add_argument("--salida", help="copia anotada (por defecto <documento>_anotado.docx)")
+    p.add_argument("--sin-llm", action="store_true")
+    p.add_argument("--indice-doi", help="índice DOI local (doi_index.py build)")
+    p.add_argument("--enlaces", action="store_true", help="verificar enlaces (requiere red)")
+    p.add_argument("--glosario", help="glosario de la revista (.csv variante,preferida)")
+
+    p = add("fix", cmd_fix, "copia del .docx con las correcciones mecánicas de la bibliografía")
+    p.add_argument("--salida", help="copia corregida (por defecto <documento>_corregido.docx)")
+    p.add_argument("--cambios", action="store_true", help="registrar las correcciones como control de cambios")
+    p.add_argument("--solo", help="solo estas correcciones, separadas por comas (conjuncion,recuperado_de,comillas,orden)")
+
+    p = add("batch", cmd_batch, "reportes de muchos documentos", document=False)
+    p.add_argument("documentos", nargs="+", help="archivos o carpetas")
+    p.add_argument("--formato", choices=REPORT_FORMATS, default="jsonl")
+    p.add_argument("--salida", help="archivo JSONL ('-': consola)")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--sin-llm", action="store_true")
+    p.add_argument("--sin-historial", action="store_true", help="no registrar las corridas en el historial")
+
+    p = sub.add_parser("historial", help="consultas sobre el historial de corridas")
+    p.add_argument("consulta", choices=("resumen", "errores", "tiempos", "documento", "exportar"))
+    p.add_argument("documento", nargs="?", help="documento, hash o nombre (consulta 'documento')")
+    p.add_argument("--desde", help="AAAA, AAAA-MM o AAAA-MM-DD")
+    p.add_argument("--regla", help="prefijo de regla, p. ej. 'apa.'")
+    p.add_argument("--limite", type=int, default=20)
+    p.add_argument("--periodo", choices=("dia", "semana", "mes"), default="mes")
+    p.add_argument("--etapa", help="tiempo de una etapa o regla (p. ej. regla:duplicados)")
+    p.add_argument("--tabla", choices=("runs", "issues", "metrics", "stages"), default="runs")
+    p.add_argument("--formato", choices=("csv", "jsonl"), default="csv")
+    p.add_argument("--salida", help="archivo de exportación ('-': consola)")
+    p.add_argument("--base", help="base SQLite (por defecto $SILVINA_HISTORIAL)")
+    p.set_defaults(func=cmd_history)
+
+    p = add("bench", cmd_bench, "tiempo de arranque de la CLI", document=False)
+    p.add_argument("documento", nargs="?", help="documento a usar (por defecto uno sintético)")
+    p.add_argument("--repeticiones", type=int, default=10)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 0
+    return args.func(args)
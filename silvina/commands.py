@@ -0,0 +1,215 @@
+# silvina/commands.py
+"""
+SILVINA Editorial Assistant - Citation Commands
+Citation analysis, integrity check, parenthesis search, paragraph debug
+and streaming report (formerly silvina_editorial_v0.6.py), on document
+snapshots instead of a live Word connection
+Universidad de la Defensa Nacional
+"""
+
+from typing import List, Optional
+import re
+
+from citations import Citation, CitationExtractor
+from silvina.documents import document_exists, open_snapshot, paragraph_texts, stream_paragraphs
+
+
+def _banner(title: str):
+    print("\n" + "=" * 60)
+    print(f"SILVINA - {title}")
+    print("=" * 60)
+
+
+def _extract(paragraphs: List[str], processes: int = 1) -> List[Citation]:
+    """Citations of `paragraphs`, chunked over `processes` for book-length manuscripts."""
+    if processes > 1:
+        from parallel_analysis import extract_citations
+        return extract_citations(paragraphs, workers=processes)
+    return CitationExtractor().extract_document(paragraphs)
+
+
+def analyze_citations(path: str, use_cache: bool = True, processes: int = 1) -> Optional[List[Citation]]:
+    """Extract all citations and print counts by type plus a sample."""
+    _banner("Análisis de Citas")
+    snapshot = open_snapshot(path, use_cache)
+    if snapshot is None:
+        return None
+    paragraphs = paragraph_texts(snapshot)
+    print(f"✓ Extraídos {len(paragraphs)} párrafos")
+    if not paragraphs:
+        print("✗ No se encontraron párrafos")
+        return []
+
+    print("\n📊 Extrayendo citas...")
+    all_citations = _extract(paragraphs, processes)
+
+    print(f"\n✓ Análisis completado")
+    print(f"  • Total citas: {len(all_citations)}")
+    print(f"  • Parentéticas: {sum(1 for c in all_citations if c.citation_type == 'parentética')}")
+    print(f"  • Narrativas: {sum(1 for c in all_citations if c.citation_type == 'narrativa')}")
+
+    if all_citations:
+        print(f"\n📋 Primeras {min(10, len(all_citations))} citas encontradas:")
+        for cit in all_citations[:10]:
+            print(f"  {cit}")
+    return all_citations
+
+
+def debug_paragraphs(path: str, start: int = 0, count: int = 20, use_cache: bool = True):
+    """Show `count` paragraphs from `start` to debug citation detection."""
+    _banner("Modo Debug: Visualización de Párrafos")
+    snapshot = open_snapshot(path, use_cache)
+    if snapshot is None:
+        return
+    paragraphs = paragraph_texts(snapshot)
+    if not paragraphs:
+        print("✗ No se encontraron párrafos")
+        return
+
+    shown = paragraphs[start:start + count]
+    print(f"\n📝 Mostrando {len(shown)} párrafos desde el {start} (de {len(paragraphs)}):\n")
+    for i, para in enumerate(shown, start):
+        print(f"--- Párrafo {i} ({len(para)} caracteres) ---")
+        print(para)
+        print()
+
+
+def search_parentheses(path: str, use_cache: bool = True):
+    """Find all paragraphs containing parentheses (potential citations)."""
+    _banner("Búsqueda de Paréntesis")
+    snapshot = open_snapshot(path, use_cache)
+    if snapshot is None:
+        return
+    paragraphs = paragraph_texts(snapshot)
+
+    print(f"\n🔍 Buscando párrafos con paréntesis...\n")
+    found_count = 0
+    for i, para in enumerate(paragraphs):
+        if '(' in para and ')' in para:
+            found_count += 1
+            print(f"--- Párrafo {i} ---")
+            matches = re.findall(r'\([^)]+\)', para)
+            if matches:
+                print(f"  Paréntesis encontrados: {len(matches)}")
+                for match in matches[:3]:
+                    print(f"    • {match}")
+            print(f"  Texto: {para[:200]}...")
+            print()
+
+    print(f"✓ Total: {found_count} párrafos con paréntesis de {len(paragraphs)} totales")
+
+
+def check_citation_integrity(path: str, use_cache: bool = True, processes: int = 1) -> Optional[bool]:
+    """
+    Cross-check in-text citations against the reference list.
+
+    Returns True when every citation resolves and every reference is
+    cited, False otherwise, None when the document could not be read.
+    """
+    from citation_integrity import check_integrity
+    from reference_segmenter import locate_references
+
+    _banner("Verificación de Integridad de Citas")
+    snapshot = open_snapshot(path, use_cache)
+    if snapshot is None:
+        return None
+    paragraphs = paragraph_texts(snapshot)
+
+    first_reference, references = locate_references(paragraphs)
+    reference_paragraphs = [(ref.paragraph_index, ref.text[:100]) for ref in references]
+    all_citations = _extract(paragraphs[:first_reference], processes)
+
+    print(f"\n📊 Resultados del Análisis:\n")
+    print(f"  • Total de párrafos: {len(paragraphs)}")
+    print(f"  • Citas en texto encontradas: {len(all_citations)}")
+    print(f"  • Referencias bibliográficas: {len(reference_paragraphs)}")
+
+    if reference_paragraphs and not all_citations:
+        print(f"\n🔴 CRÍTICO: Problema de Integridad de Citas Detectado")
+        print(f"\n  El documento tiene {len(reference_paragraphs)} referencias bibliográficas")
+        print(f"  pero NO tiene citas en el texto.")
+        print(f"\n  📋 Esto significa que:")
+        print(f"     • Las referencias nunca son citadas en el cuerpo del artículo")
+        print(f"     • No se puede verificar qué afirmaciones están respaldadas")
+        print(f"     • Viola normas APA y estándares académicos")
+
+        print(f"\n  ⚠️  Referencias encontradas (primeras 5):")
+        for i, (para_idx, ref_text) in enumerate(reference_paragraphs[:5]):
+            print(f"     {i+1}. [Párrafo {para_idx}] {ref_text}...")
+
+        print(f"\n  ✅ Solución requerida:")
+        print(f"     • Agregar citas en formato APA en el texto:")
+        print(f"       Ejemplo: (Gidney & Ekera, 2024)")
+        print(f"       Ejemplo: Según IBM Research (2024), ...")
+        return False
+
+    if all_citations and not reference_paragraphs:
+        print(f"\n🔴 CRÍTICO: Citas sin Lista de Referencias")
+        print(f"  El documento cita {len(all_citations)} fuentes pero no tiene")
+        print(f"  una sección de Referencias bibliográficas.")
+        return False
+
+    if not all_citations and not reference_paragraphs:
+        print(f"\n🟡 ADVERTENCIA: Sin Sistema de Citación")
+        print(f"  El documento no tiene citas ni referencias.")
+        print(f"  Si es un artículo académico, esto debe corregirse.")
+        return False
+
+    print(f"\n✅ Sistema de citación presente")
+    print(f"  • {len(all_citations)} citas en texto")
+    print(f"  • {len(reference_paragraphs)} referencias bibliográficas")
+
+    integrity = check_integrity(all_citations, references)
+    resolved = len(integrity.matches) - len(integrity.unresolved)
+    print(f"  • Citas con referencia: {resolved}/{len(integrity.matches)}")
+
+    if integrity.unresolved:
+        print(f"\n🔴 Citas sin referencia o ambiguas ({len(integrity.unresolved)}):")
+        for match in integrity.unresolved:
+            print(f"     [¶{match.citation.paragraph_index}] {match.citation.raw_text}")
+            for note in match.notes:
+                print(f"        → {note}")
+
+    if integrity.approximate:
+        print(f"\n🟡 Citas con posible error tipográfico ({len(integrity.approximate)}):")
+        for match in integrity.approximate:
+            print(f"     [¶{match.citation.paragraph_index}] {match.citation.raw_text} → {'; '.join(match.notes)}")
+
+    if integrity.uncited_references:
+        print(f"\n🟡 Referencias nunca citadas en el texto ({len(integrity.uncited_references)}):")
+        for position, para_idx, ref_text in integrity.uncited_references:
+            print(f"     {position}. [Párrafo {para_idx}] {ref_text[:100]}...")
+
+    notes = [m for m in integrity.matches if m.resolved and m.notes and m.status == 'exacta']
+    if notes:
+        print(f"\n🟡 Observaciones de formato ({len(notes)}):")
+        for match in notes:
+            print(f"     [¶{match.citation.paragraph_index}] {match.citation.raw_text} → {'; '.join(match.notes)}")
+
+    if integrity.is_consistent:
+        print(f"\n✅ Todas las citas tienen referencia y todas las referencias son citadas")
+    return integrity.is_consistent
+
+
+def stream_report(path: str, output_path: str):
+    """Bounded-memory findings report for very large documents."""
+    import zipfile
+    from xml.etree.ElementTree import ParseError
+    from streaming import StreamingReportWriter, analyze_stream
+
+    _banner("Análisis en Flujo")
+    if not document_exists(path):
+        return None
+    # Paragraphs come straight from the file: a snapshot would hold the whole document
+    try:
+        with open(output_path, "w", encoding="utf-8") as out:
+            summary = analyze_stream(stream_paragraphs(path), StreamingReportWriter(out, max_per_kind=500))
+    except (zipfile.BadZipFile, ParseError, KeyError, ValueError, OSError) as e:
+        print(f"✗ Error: {e}")
+        return None
+
+    print(f"\n✓ Informe escrito en {output_path}")
+    print(f"  • Párrafos: {summary.paragraphs:,}")
+    print(f"  • Citas en texto: {summary.citations:,} (sin referencia: {summary.unresolved_citations:,})")
+    print(f"  • Referencias: {summary.references:,} (no citadas: {summary.uncited_references:,})")
+    return summary
@@ -0,0 +1,118 @@
+# silvina/documents.py
+"""
+SILVINA Editorial Assistant - Document Loading
+One entry point for every command: recorded fixtures are replayed, and
+.docx files are read once (through Word when available) and cached as
+snapshots keyed by content hash, so later runs never touch COM
+Universidad de la Defensa Nacional
+"""
+
+from typing import Iterator, List, Optional
+import hashlib
+import os
+
+from document_backends import (FIXTURE_SUFFIX, HAS_WIN32, DocumentSnapshot, WordBackend,
+                               load_fixture, save_fixture, snapshot_from_docx)
+from reference_segmenter import ParagraphInfo
+
+
+CACHE_DIR = os.environ.get("SILVINA_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "silvina"))
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of the file contents (hex)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path: str) -> str:
+    """Snapshot location for a .docx; Word and XML snapshots are cached apart."""
+    source = "word" if HAS_WIN32 else "xml"
+    return os.path.join(CACHE_DIR, f"{content_hash(path)[:32]}-{source}{FIXTURE_SUFFIX}")
+
+
+def load_document(path: str, use_cache: bool = True) -> DocumentSnapshot:
+    """
+    Snapshot of a fixture or .docx.
+
+    The first read of a .docx goes through Word (pywin32) or the XML
+    reader; the snapshot is then cached so unchanged files load in
+    milliseconds. Edited files hash differently and are read again.
+    """
+    if path.endswith(FIXTURE_SUFFIX):
+        return load_fixture(path)
+
+    cached = cache_path(path) if use_cache else None
+    if cached and os.path.exists(cached):
+        snapshot = load_fixture(cached)
+        snapshot.source = os.path.basename(path)
+        return snapshot
+
+    if HAS_WIN32:
+        backend = WordBackend(path)
+        if not backend.open():
+            raise RuntimeError(f"No se pudo abrir en Word: {path}")
+        try:
+            snapshot = backend.snapshot()
+        finally:
+            backend.close()
+    else:
+        snapshot = snapshot_from_docx(path)
+
+    if cached:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        save_fixture(snapshot, cached)
+    return snapshot
+
+
+def iter_paragraphs(snapshot: DocumentSnapshot) -> Iterator[ParagraphInfo]:
+    """Non-empty paragraphs with their style, headings included."""
+    for i, record in enumerate(snapshot.paragraphs):
+        text = record.text.strip()
+        if text:
+            yield ParagraphInfo(text, i, record.style, record.first_line_indent, record.left_indent)
+
+
+def paragraph_texts(snapshot: DocumentSnapshot) -> List[str]:
+    """Body paragraph texts without title-styled lines (as v0.6 read them)."""
+    return [para.text for para in iter_paragraphs(snapshot)
+            if not para.style.startswith(("Título", "Title"))]
+
+
+def stream_paragraphs(path: str) -> Iterator[ParagraphInfo]:
+    """
+    Non-empty paragraphs read lazily, for bounded-memory analysis.
+
+    A .docx is parsed from its XML as it is consumed, with no snapshot
+    built or cached (Word is not involved); a fixture is replayed.
+    """
+    if path.endswith(FIXTURE_SUFFIX):
+        yield from iter_paragraphs(load_fixture(path))
+        return
+    from docx_io import iter_docx
+    for para in iter_docx(path):
+        text = para.text.strip()
+        if text:
+            yield ParagraphInfo(text, para.index, para.style, para.first_line_indent, para.left_indent)
+
+
+def document_exists(path: str) -> bool:
+    """For commands: prints the error when `path` is missing."""
+    if not os.path.exists(path):
+        print(f"✗ Error: Archivo no encontrado: {path}")
+        return False
+    return True
+
+
+def open_snapshot(path: str, use_cache: bool = True) -> Optional[DocumentSnapshot]:
+    """load_document for commands: prints the error and returns None on failure."""
+    if not document_exists(path):
+        return None
+    try:
+        return load_document(path, use_cache)
+    except (ImportError, RuntimeError, ValueError, OSError) as e:
+        print(f"✗ Error: {e}")
+        return None
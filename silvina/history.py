@@ -0,0 +1,503 @@
+# silvina/history.py
+"""
+SILVINA Editorial Assistant - Run History
+Local SQLite store written at the end of every report run: document
+hash, metrics, every issue with its rule id and location, stage timings
+and the model used; indexed for editorial analytics queries
+Universidad de la Defensa Nacional
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from report_writers import ReportSection, ReportWriter
+from tracing import TRACER
+
+
+HISTORY_PATH = os.environ.get("SILVINA_HISTORIAL") or os.path.join(
+    os.path.expanduser("~"), ".local", "share", "silvina", "historial.sqlite")
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,        -- Unix time
+    duration REAL,                   -- seconds, load + report
+    document TEXT NOT NULL,
+    doc_hash TEXT,                   -- SHA-256 of the file
+    source TEXT,                     -- cli, lote, servicio, v0.5
+    model TEXT,                      -- LLM model, NULL when the review was off
+    version TEXT,
+    article_type TEXT,
+    characters INTEGER,
+    references_total INTEGER,
+    issues_total INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    rule TEXT NOT NULL,
+    section TEXT,
+    position INTEGER,                -- reference number in the bibliography
+    paragraph INTEGER,               -- paragraph index in the document
+    message TEXT
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,             -- pipeline stage, or regla:<name> for a validator
+    calls INTEGER,
+    seconds REAL,
+    PRIMARY KEY (run_id, stage)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS runs_hash ON runs(doc_hash);
+CREATE INDEX IF NOT EXISTS runs_document ON runs(document);
+CREATE INDEX IF NOT EXISTS issues_rule ON issues(rule, run_id);
+CREATE INDEX IF NOT EXISTS issues_run ON issues(run_id);
+CREATE INDEX IF NOT EXISTS stages_stage ON stages(stage, run_id);
+"""
+
+EXPORT_TABLES = ("runs", "issues", "metrics", "stages")
+
+
+# ============================================================
+# RECORDS
+# ============================================================
+
+@dataclass
+class Issue:
+    rule: str
+    section: str
+    message: str = ""
+    position: Optional[int] = None
+    paragraph: Optional[int] = None
+
+
+@dataclass
+class RunRecord:
+    """Everything stored for one report run (picklable, so batch workers can return it)."""
+
+    document: str
+    started_at: float
+    duration: Optional[float] = None
+    doc_hash: Optional[str] = None
+    source: str = "cli"
+    model: Optional[str] = None
+    version: Optional[str] = None
+    article_type: Optional[str] = None
+    metrics: Dict[str, float] = field(default_factory=dict)
+    issues: List[Issue] = field(default_factory=list)
+    stages: List[Tuple[str, int, float]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+# ============================================================
+# ISSUES FROM REPORT SECTIONS
+# ============================================================
+
+# section key -> function(section data) -> issues; other modules add theirs
+ISSUE_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], Iterable[Issue]]] = {}
+
+
+def issue_extractor(section_key: str):
+    def decorator(func):
+        ISSUE_EXTRACTORS[section_key] = func
+        return func
+    return decorator
+
+
+@issue_extractor("tipo_articulo")
+def _issues_article_type(data):
+    if not data.get('cumple_limite', True):
+        yield Issue("eumic.extension", "tipo_articulo", data.get('mensaje', ''))
+
+
+@issue_extractor("detalle")
+def _issues_reference_detail(data):
+    for entry in data.get('referencias', []):
+        for code, problem in zip(entry.get('codigos', []), entry.get('problemas', [])):
+            yield Issue(code, "detalle", problem, position=entry['posicion'])
+        if (entry.get('doi_url') or {}).get('formato_antiguo'):
+            yield Issue("apa.recuperado_de", "detalle", "Usa formato antiguo 'Recuperado de' (debe omitirse)",
+                        position=entry['posicion'])
+
+
+@issue_extractor("orden_alfabetico")
+def _issues_order(data):
+    for problema in data.get('problemas', []):
+        yield Issue("apa.orden_alfabetico", "orden_alfabetico",
+                    f"Debería ir antes de: {problema['deberia_ir_antes_de']}", position=problema['posicion'])
+
+
+@issue_extractor("duplicados")
+def _issues_duplicates(data):
+    for dup in data.get('duplicados', []):
+        yield Issue("apa.duplicado", "duplicados", f"Similar a #{dup['ref2_index']} ({dup['similitud']})",
+                    position=dup['ref1_index'])
+
+
+@issue_extractor("comillas")
+def _issues_quotes(data):
+    for problema in data.get('problemas', []):
+        yield Issue("apa.comillas_inglesas", "comillas", problema['texto'], position=problema['posicion'])
+
+
+@issue_extractor("verificacion_doi")
+def _issues_doi(data):
+    for problema in data.get('problemas', []):
+        yield Issue(f"doi.{problema['estado']}", "verificacion_doi",
+                    "; ".join([problema['doi'] or ''] + list(problema['detalles'])), position=problema['posicion'])
+
+
+@issue_extractor("enlaces_rotos")
+def _issues_links(data):
+    for roto in data.get('rotos', []):
+        yield Issue("enlace.roto", "enlaces_rotos", f"{roto['url']} ({roto['detalle']})", position=roto['posicion'])
+
+
+@issue_extractor("tipografia")
+def _issues_typography(data):
+    for hallazgo in data.get('hallazgos', []):
+        yield Issue(f"tipografia.{hallazgo['regla']}", "tipografia", f"{hallazgo['area']}: «{hallazgo['texto']}»",
+                    paragraph=hallazgo['parrafo'])
+
+
+@issue_extractor("siglas")
+def _issues_acronyms(data):
+    for problema in data.get('problemas', []):
+        yield Issue(problema['regla'], "siglas", f"{problema['area']}: {problema['sigla']}", paragraph=problema['parrafo'])
+
+
+@issue_extractor("terminologia")
+def _issues_terminology(data):
+    for hallazgo in data.get('hallazgos', []):
+        yield Issue("terminologia.variante", "terminologia", f"«{hallazgo['texto']}» → «{hallazgo['preferida']}»",
+                    paragraph=hallazgo['parrafo'])
+
+
+def _metrics(key: str, data: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    """Top-level numeric values of a section's data, named <section>.<field>."""
+    for name, value in data.items():
+        if isinstance(value, (int, float)):  # bool included: stored as 0/1
+            yield f"{key}.{name}", float(value)
+
+
+# ============================================================
+# RECORDER (a report writer)
+# ============================================================
+
+class HistoryRecorder(ReportWriter):
+    """Collects the sections of one report; finish() turns them into a RunRecord."""
+
+    def __init__(self, path: str, source: str = "cli", model: Optional[str] = None,
+                 doc_hash: Optional[str] = None):
+        self.stream = None
+        self.path = path
+        self.source = source
+        self.model = model
+        self.doc_hash = doc_hash
+        self.started_at = time.time()
+        self.metadata: Dict[str, Any] = {}
+        self.sections: List[ReportSection] = []
+        self.rule_run = None  # set by the caller once the Document has run its rules
+        self.record: Optional[RunRecord] = None
+
+    def begin(self, metadata: Dict[str, Any]):
+        self.metadata = metadata
+
+    def section(self, section: ReportSection):
+        self.sections.append(section)
+
+    def end(self):
+        pass
+
+    def finish(self, stages: Iterable[Dict[str, Any]] = (), rule_run=None,
+               duration: Optional[float] = None, error: Optional[str] = None) -> RunRecord:
+        """
+        Args:
+            stages: TRACER.totals() rows of the run
+            rule_run: the Document's RuleRun, for the time of every validator
+        """
+        from silvina import __version__
+
+        record = RunRecord(
+            document=self.metadata.get('documento') or os.path.basename(self.path),
+            started_at=self.started_at,
+            duration=duration if duration is not None else time.time() - self.started_at,
+            doc_hash=self.doc_hash or file_hash(self.path),
+            source=self.source,
+            model=self.model,
+            version=__version__,
+            error=error or self.metadata.get('error'),
+        )
+        for section in self.sections:
+            record.metrics.update(_metrics(section.key, section.data))
+            extractor = ISSUE_EXTRACTORS.get(section.key)
+            if extractor is not None:
+                record.issues.extend(extractor(section.data))
+            if section.key == "tipo_articulo":
+                record.article_type = section.data.get('tipo')
+        record.stages = [(s['etapa'], s['llamadas'], s['segundos']) for s in stages]
+        if rule_run is not None:
+            names = {stage for stage, _, _ in record.stages}
+            record.stages.extend((f"regla:{t.name}", 1, t.seconds) for t in rule_run.timings.values()
+                                 if f"regla:{t.name}" not in names)
+        return record
+
+
+def file_hash(path: str) -> Optional[str]:
+    """Document hash stored with each run; None when the file is gone."""
+    from silvina.documents import content_hash
+    try:
+        return content_hash(path)
+    except OSError:
+        return None
+
+
+@contextmanager
+def recording(path: str, store: Optional["HistoryStore"] = None, source: str = "cli",
+              model: Optional[str] = None) -> Iterator[HistoryRecorder]:
+    """
+    Time a report run and build its RunRecord, stored in `store` when given.
+
+    Usage:
+        with recording(path, store) as recorder:
+            doc.load()
+            doc.write_report(MultiWriter([writer, recorder]))
+            recorder.rule_run = doc.rule_run
+        recorder.record  # also set when the run failed
+    """
+    recorder = HistoryRecorder(path, source, model)
+    start = time.perf_counter()
+    error = None
+    spans: List = []
+    try:
+        if TRACER.enabled:  # --trace keeps the spans in the global list for the Chrome export
+            yield recorder
+        else:
+            with TRACER.capture() as spans:
+                yield recorder
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stages = TRACER.totals() if TRACER.enabled else TRACER.totals(spans)
+        recorder.record = recorder.finish(stages, recorder.rule_run, time.perf_counter() - start, error)
+        if store is not None:
+            try:
+                store.add(recorder.record)
+            except sqlite3.Error as e:
+                print(f"⚠️ No se pudo guardar en el historial: {e}")
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+def parse_since(text: Optional[str]) -> Optional[float]:
+    """'2026', '2026-03' or '2026-03-15' -> Unix time of its start (local time)."""
+    if not text:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y-%m", "%Y"):
+        try:
+            return datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no válida: {text} (use AAAA, AAAA-MM o AAAA-MM-DD)")
+
+
+class HistoryStore:
+    """SQLite run history; one connection shared by threads behind a lock."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or HISTORY_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = WAL')  # readers never block the writer
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # --- Writing ---
+
+    def add(self, record: RunRecord) -> int:
+        return self.add_many([record])[0]
+
+    def add_many(self, records: Iterable[RunRecord]) -> List[int]:
+        """Insert runs in a single transaction; issues and stages go in with executemany."""
+        ids = []
+        issues, metrics, stages = [], [], []
+        with self._lock, self.conn:
+            for r in records:
+                cursor = self.conn.execute(
+                    'INSERT INTO runs (started_at, duration, document, doc_hash, source, model, version, '
+                    'article_type, characters, references_total, issues_total, error) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (r.started_at, r.duration, r.document, r.doc_hash, r.source, r.model, r.version,
+                     r.article_type, r.metrics.get('documento.caracteres'),
+                     r.metrics.get('referencias.total'), len(r.issues), r.error)
+                )
+                run_id = cursor.lastrowid
+                ids.append(run_id)
+                issues.extend((run_id, i.rule, i.section, i.position, i.paragraph, i.message) for i in r.issues)
+                metrics.extend((run_id, name, value) for name, value in r.metrics.items())
+                stages.extend((run_id, stage, calls, seconds) for stage, calls, seconds in r.stages)
+            self.conn.executemany('INSERT INTO issues VALUES (?, ?, ?, ?, ?, ?)', issues)
+            self.conn.executemany('INSERT OR REPLACE INTO metrics VALUES (?, ?, ?)', metrics)
+            self.conn.executemany('INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?)', stages)
+        return ids
+
+    # --- Queries ---
+
+    def _query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, row)) for row in cursor]
+
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        rows = self._query(
+            'SELECT COUNT(*) AS corridas, COUNT(DISTINCT COALESCE(doc_hash, document)) AS documentos, '
+            'AVG(duration) AS duracion_media, SUM(issues_total) AS problemas, '
+            'SUM(error IS NOT NULL) AS con_error, MIN(started_at) AS primera, MAX(started_at) AS ultima '
+            'FROM runs WHERE started_at >= ?', (since or 0,))
+        return rows[0]
+
+    def common_issues(self, since: Optional[float] = None, rule: Optional[str] = None,
+                      limit: int = 20) -> List[Dict[str, Any]]:
+        """Most frequent rules; `rule` filters by prefix ('apa.' for the APA checks)."""
+        return self._query(
+            'SELECT i.rule AS regla, COUNT(*) AS casos, COUNT(DISTINCT i.run_id) AS corridas, '
+            'COUNT(DISTINCT COALESCE(r.doc_hash, r.document)) AS documentos '
+            'FROM issues i JOIN runs r ON r.id = i.run_id '
+            'WHERE r.started_at >= ? AND i.rule LIKE ? '
+            'GROUP BY i.rule ORDER BY casos DESC LIMIT ?',
+            (since or 0, (rule or '') + '%', limit))
+
+    def timings(self, period: str = "mes", stage: Optional[str] = None,
+                since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Average run time (or of one stage) per day, week or month."""
+        pattern = {"dia": "%Y-%m-%d", "semana": "%Y-S%W", "mes": "%Y-%m"}[period]
+        bucket = f"strftime('{pattern}', r.started_at, 'unixepoch', 'localtime')"
+        if stage:
+            return self._query(
+                f'SELECT {bucket} AS periodo, COUNT(*) AS corridas, AVG(s.seconds) AS segundos_media, '
+                f'MAX(s.seconds) AS segundos_max FROM stages s JOIN runs r ON r.id = s.run_id '
+                f'WHERE s.stage = ? AND r.started_at >= ? GROUP BY periodo ORDER BY periodo',
+                (stage, since or 0))
+        return self._query(
+            f'SELECT {bucket} AS periodo, COUNT(*) AS corridas, AVG(r.duration) AS segundos_media, '
+            f'MAX(r.duration) AS segundos_max FROM runs r '
+            f'WHERE r.started_at >= ? GROUP BY periodo ORDER BY periodo', (since or 0,))
+
+    def document_runs(self, document: str) -> List[Dict[str, Any]]:
+        """Runs of one document, by path (hashed), hash or file name."""
+        key = file_hash(document) if os.path.exists(document) else document
+        return self._query(
+            'SELECT id, started_at, duration, document, source, model, article_type, '
+            'references_total, issues_total, error FROM runs '
+            'WHERE doc_hash = ? OR document = ? ORDER BY started_at', (key, os.path.basename(document)))
+
+    def export(self, table: str, out: TextIO, fmt: str = "csv", since: Optional[float] = None) -> int:
+        """Write a table (runs, issues, metrics, stages) as CSV or JSON Lines; returns rows written."""
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Tabla desconocida: {table} (opciones: {', '.join(EXPORT_TABLES)})")
+        if table == "runs":
+            sql = 'SELECT * FROM runs WHERE started_at >= ? ORDER BY id'
+        else:
+            sql = (f'SELECT t.* FROM {table} t JOIN runs r ON r.id = t.run_id '
+                   f'WHERE r.started_at >= ? ORDER BY t.run_id')
+        with self._lock:
+            cursor = self.conn.execute(sql, (since or 0,))
+            names = [d[0] for d in cursor.description]
+            count = 0
+            if fmt == "csv":
+                writer = csv.writer(out)
+                writer.writerow(names)
+                for row in cursor:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in cursor:
+                    out.write(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n")
+                    count += 1
+        return count
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(runs: int = 1000, issues_per_run: int = 50, batch: int = 100):
+    """Bulk insert throughput, as in a batch run, and the indexed queries on the result."""
+    import random
+    import tempfile
+
+    rules = ["apa.autor", "apa.año", "apa.conjuncion", "apa.orden_alfabetico", "apa.duplicado",
+             "apa.comillas_inglesas", "doi.desconocido", "enlace.roto", "eumic.extension"]
+    rng = random.Random(7)
+    now = time.time()
+    records = []
+    for n in range(runs):
+        record = RunRecord(f"manuscrito_{n % 300:03d}.docx", now - rng.random() * 365 * 86400,
+                           duration=rng.uniform(0.5, 8), doc_hash=f"{n % 300:064x}", source="lote",
+                           model="llama3-gradient:8b", version="bench", article_type="Científica")
+        record.metrics = {"documento.caracteres": 40000.0, "referencias.total": 40.0}
+        record.issues = [Issue(rng.choice(rules), "detalle", "problema de prueba", position=i % 40 + 1)
+                         for i in range(issues_per_run)]
+        record.stages = [("extraer", 1, 0.01), ("segmentar", 1, 0.02), ("regla:duplicados", 1, 0.4)]
+        records.append(record)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with HistoryStore(os.path.join(tmp, "historial.sqlite")) as store:
+            start = time.perf_counter()
+            for i in range(0, runs, batch):
+                store.add_many(records[i:i + batch])
+            elapsed = time.perf_counter() - start
+
+            queries = {
+                "errores más comunes (año)": lambda: store.common_issues(since=now - 365 * 86400),
+                "errores APA": lambda: store.common_issues(rule="apa."),
+                "tiempo medio por mes": lambda: store.timings("mes"),
+                "etapa duplicados por mes": lambda: store.timings("mes", stage="regla:duplicados"),
+                "corridas de un documento": lambda: store.document_runs("manuscrito_042.docx"),
+            }
+            print("SILVINA - Historial de Corridas (Benchmark)")
+            print("=" * 60)
+            total_issues = runs * issues_per_run
+            print(f"  Inserción: {runs:,} corridas, {total_issues:,} problemas en {elapsed:.2f} s "
+                  f"({total_issues / elapsed:,.0f} problemas/s)")
+            for name, query in queries.items():
+                start = time.perf_counter()
+                rows = query()
+                print(f"  {name:<28} {(time.perf_counter() - start) * 1000:7.1f} ms ({len(rows)} filas)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
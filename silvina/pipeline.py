@@ -0,0 +1,986 @@
+# silvina/pipeline.py
+"""
+SILVINA Editorial Assistant - Editorial Pipeline
+Document loading, EUMIC/APA 7 validators and the full editorial report
+(formerly the body of silvina_editorial_v0.5.py)
+Universidad de la Defensa Nacional
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+import io
+import os
+
+from acronyms import RULES as ACRONYM_RULES, index_document as index_acronyms
+from document_backends import open_backend
+from reference_segmenter import ParagraphInfo, segment_references
+from references import (Reference, detectar_duplicados, problema_comillas, problema_orden, resumen_comillas,
+                        resumen_orden, validar_comillas_espanolas, validar_orden_alfabetico)
+from report_writers import MultiWriter, ReportSection, TextWriter, reference_detail_section, render
+from section_index import SectionIndex
+from silvina.rules import EXPENSIVE, RULES, RuleScheduler
+from tracing import TRACER, span, traced
+from typography import RULES as TYPOGRAPHY_RULES, scan_document, summarize
+
+
+# === LLM SETTINGS ===
+LLM_MODEL = 'llama3-gradient:8b'
+LLM_KEEP_ALIVE = None  # e.g. '30m' keeps the model loaded between documents (Ollama default: 5m)
+
+
+# === RAE GRAMMAR RULES CONTEXT ===
+RAE_RULES_CONTEXT = """Reglas RAE para textos académicos (resumidas):
+
+ERRORES COMUNES A DETECTAR:
+1. Concordancia: sujeto-verbo, artículo-sustantivo
+   ❌ "Los datos es claro" → ✅ "Los datos son claros"
+
+2. Uso de comas: NO entre sujeto y verbo
+   ❌ "El sistema cuántico, permite cifrado" → ✅ "El sistema cuántico permite cifrado"
+
+3. Acentuación: palabras esdrújulas/sobresdrújulas
+   ❌ "metodo" → ✅ "método"
+
+4. Puntuación: punto después de abreviaturas
+   ❌ "Dr Sánchez" → ✅ "Dr. Sánchez"
+
+5. Gerundios incorrectos: NO para acciones posteriores
+   ❌ "Se realizó el experimento, obteniendo resultados" 
+   → ✅ "Se realizó el experimento y se obtuvieron resultados"
+
+SOLO menciona errores EVIDENTES que veas en el texto."""
+
+
+# === DOCUMENT CLASS ===
+class Document:
+    """Manages Word document loading and reference extraction."""
+    
+    def __init__(self, filepath, backend=None):
+        """Initialize with filepath; `backend` overrides the one chosen from the path."""
+        self.filepath = filepath #Stores the path to the Word file or recorded fixture.
+        self.backend = backend # Live Word (COM), replayed fixture or .docx read directly
+        self.doc = None # The opened backend, None when loading failed
+        self.text = ""
+        self.references = []
+        self.reference_paragraphs = []  # ParagraphInfo records of the reference section
+        self.section_index = None  # SectionIndex built while extracting references
+        self.paragraph_starts = []  # character offset of every paragraph (notes are anchored by offset)
+        self._notes = None  # (paragraph, text) of the footnotes and endnotes, read on first use
+        self.section_type = "Referencias"  # Default
+        self.rule_run = None  # RuleRun of the last report: results and time per rule
+    
+    def load(self):
+        """Load document and extract references."""
+        with span("conectar"):
+            self._open_backend()
+        with span("extraer") as s:
+            self._extract_referencias()
+            s.set(parrafos=len(self.section_index.paragraphs) if self.section_index else 0)
+        with span("segmentar") as s:
+            self._create_reference_objects()
+            s.set(referencias=len(self.references))
+    
+    def _open_backend(self):
+        """Open the document through Word, a recorded fixture or the .docx XML."""
+        try:
+            if self.backend is None:
+                self.backend = open_backend(self.filepath)
+            if self.backend.open():
+                self.doc = self.backend
+        except Exception as e:
+            print(f"❌ Connection Error: {e}")
+            self.doc = None
+    
+    def _extract_referencias(self):
+        """Extract Referencias/Bibliografía section."""
+        
+        if not self.doc:
+            print("⚠️ No document loaded")
+            return
+        
+        try:
+            char_count = self.get_character_count()
+            if char_count == 0:
+                print("⚠️ Document shows 0 characters - COM not ready")
+                return
+                
+            print(f"🔍 Characters: {char_count:,}")
+            
+            try:
+                records = self.doc.paragraphs()
+                print(f"🔍 Total paragraphs: {len(records)}")
+            except Exception as para_error:
+                print(f"❌ Cannot access Paragraphs: {para_error}")
+                return
+            
+            # Text and style of every paragraph; indents only inside the section
+            paragraphs = [ParagraphInfo(r.text, i, r.style) for i, r in enumerate(records)]
+            para_starts = self.paragraph_starts = [r.start for r in records]
+            
+            footnote_chars = self._footnote_chars_by_paragraph(para_starts)
+            self.section_index = SectionIndex(paragraphs, footnote_chars)
+            start, end, self.section_type = self.section_index.reference_section()
+            if start is None:
+                print("⚠️ No se encontró la sección Referencias/Bibliografía")
+                return
+            print(f"✅ Found {self.section_type} section")
+            
+            referencias_paras = []
+            for info in paragraphs[start:end]:
+                if not info.text.strip():
+                    continue
+                try:
+                    info.first_line_indent, info.left_indent = self.doc.paragraph_format(info.index)
+                except:
+                    pass
+                referencias_paras.append(info)
+            
+            self.reference_paragraphs = referencias_paras
+            self.text = '\n'.join(info.text.strip() for info in referencias_paras)
+            print(f"✅ Extracted {len(referencias_paras)} reference paragraphs")
+                            
+        except Exception as e:
+            print(f"❌ Extract error: {e}")
+            import traceback
+            traceback.print_exc()
+            self.text = ""
+    
+    def _footnote_chars_by_paragraph(self, para_starts):
+        """Footnote/endnote characters attributed to the paragraph holding each note mark."""
+        chars = [0] * len(para_starts)
+        if not para_starts:
+            return chars
+        try:
+            for notes in self.doc.notes():
+                for note in notes:
+                    pos = max(bisect_right(para_starts, note.anchor) - 1, 0)
+                    chars[pos] += len(note.text)
+        except Exception as e:
+            print(f"⚠️ No se pudieron asignar las notas al pie: {e}")
+        return chars
+    
+    def _create_reference_objects(self):
+        """Create Reference objects by segmenting the reference section paragraphs."""
+        if not self.reference_paragraphs:
+            return
+        
+        for entry in segment_references(self.reference_paragraphs):
+            self.references.append(Reference(entry.text))
+        
+        print(f"✅ Created {len(self.references)} Reference objects")
+    
+    def get_character_count(self):
+        """Get accurate Word character count."""
+        if not self.doc:
+            return 0
+        
+        try:
+            total = self.doc.character_count()
+            for notes in self.doc.notes():
+                total += sum(len(note.text) for note in notes)
+            return total
+        except:
+            return 0
+    
+    @traced()
+    def detectar_tipo_articulo(self, section_index=None):
+        """Detecta el tipo de artículo según caracteres y estructura (índice de secciones opcional)."""
+        if not self.doc:
+            return {
+                'tipo': 'Indeterminado',
+                'caracteres': 0,
+                'cumple_limite': False,
+                'mensaje': 'Documento no cargado'
+            }
+        
+        index = section_index or self.section_index
+        caracteres = self.get_character_count()
+        secciones = []
+        if index:
+            # IMRyD from actual section headings, not words anywhere in the prose
+            tiene_imryd = index.has_imryd()
+            secciones = [(s.title, n) for s, n in index.section_sizes()]
+        else:
+            texto_completo = self.doc.content_text().lower()
+            palabras_imryd = ['introducción', 'método', 'resultados', 'discusión', 'conclusión']
+            tiene_imryd = sum(1 for palabra in palabras_imryd if palabra in texto_completo) >= 4
+        
+        if tiene_imryd and 30000 <= caracteres <= 50000:
+            tipo = 'Científica'
+            cumple = True
+            mensaje = f'Artículo científico con {caracteres:,} caracteres (rango válido: 30,000-50,000)'
+        elif tiene_imryd and caracteres > 50000:
+            tipo = 'Científica'
+            cumple = False
+            mensaje = f'Excede límite científico: {caracteres:,} caracteres (máximo: 50,000)'
+        elif tiene_imryd and caracteres < 30000:
+            tipo = 'Científica'
+            cumple = False
+            mensaje = f'Debajo del mínimo científico: {caracteres:,} caracteres (mínimo: 30,000)'
+        elif caracteres <= 35000:
+            tipo = 'Divulgación'
+            cumple = abs(caracteres - 30000) <= 5000
+            if cumple:
+                mensaje = f'Artículo de divulgación con {caracteres:,} caracteres (objetivo: ~30,000)'
+            else:
+                mensaje = f'Divulgación con {caracteres:,} caracteres (objetivo: ~30,000 ± 5,000)'
+        else:
+            tipo = 'Indeterminado'
+            cumple = False
+            mensaje = f'No se detectó estructura IMRyD, pero tiene {caracteres:,} caracteres (fuera del rango de Divulgación)'
+        
+        return {
+            'tipo': tipo,
+            'caracteres': caracteres,
+            'cumple_limite': cumple,
+            'mensaje': mensaje,
+            'secciones': secciones
+        }
+    
+    def _report_cut_suggestions(self, caracteres, limite=50000):
+        """Report section with the largest contributors and a minimal set of paragraphs to cut."""
+        index = self.section_index
+        section = ReportSection("recorte", "SUGERENCIAS DE RECORTE")
+        mayores = sorted(index.leaf_sizes(), key=lambda item: -item[1])[:5]
+        
+        section.add("Secciones más extensas:")
+        for s, n in mayores:
+            section.add(f"  • {s.title[:50]}: {n:,} caracteres ({n / caracteres:.0%})")
+        
+        cuts = index.suggest_cuts(limite, total=caracteres)
+        if cuts.feasible:
+            section.add(f"\nEliminando o resumiendo estos {len(cuts.paragraphs)} párrafo(s) "
+                        f"se recortan {cuts.removed:,} caracteres (exceso: {cuts.excess:,}):")
+        else:
+            section.add(f"\n⚠️ Ni eliminando todos los párrafos del cuerpo se alcanza el límite "
+                        f"(exceso: {cuts.excess:,})")
+        for pos, n in cuts.paragraphs[:15]:
+            info = index.paragraphs[pos]
+            section.add(f"  ✂️ Párrafo {info.index + 1} ({index.section_at(pos).title[:30]}): {n:,} caracteres")
+            section.add(f"     \"{info.text.strip()[:70]}...\"")
+        if len(cuts.paragraphs) > 15:
+            section.add(f"  ... y {len(cuts.paragraphs) - 15} párrafo(s) más")
+        
+        section.data = {
+            'exceso': cuts.excess,
+            'recorte_sugerido': cuts.removed,
+            'secciones_mayores': [{'titulo': s.title, 'caracteres': n} for s, n in mayores],
+            'parrafos': [{'parrafo': index.paragraphs[pos].index + 1,
+                          'seccion': index.section_at(pos).title,
+                          'caracteres': n} for pos, n in cuts.paragraphs]
+        }
+        return section
+    
+    @traced()
+    def calcular_tokens(self, texto=None):
+        """Estima tokens para validar si documento cabe en contexto LLM."""
+        if texto is None:
+            texto = self.doc.content_text() if self.doc else ""
+        
+        caracteres = len(texto)
+        tokens_estimados = caracteres // 4
+        
+        MAX_CONTEXT = 8192
+        RESERVED_FOR_PROMPT = 500
+        RESERVED_FOR_RESPONSE = 500
+        
+        contexto_disponible = MAX_CONTEXT - RESERVED_FOR_PROMPT - RESERVED_FOR_RESPONSE
+        cabe = tokens_estimados <= contexto_disponible
+        
+        return {
+            'caracteres': caracteres,
+            'tokens_estimados': tokens_estimados,
+            'cabe_en_contexto': cabe,
+            'contexto_disponible': contexto_disponible,
+            'porcentaje_uso': (tokens_estimados / contexto_disponible) * 100
+        }
+    
+    @traced()
+    def validar_orden_alfabetico(self):
+        """Verifica si las referencias están en orden alfabético."""
+        return validar_orden_alfabetico(self.references)
+    
+    @traced()
+    def detectar_duplicados(self, references=None):
+        """Detecta referencias duplicadas o muy similares."""
+        return detectar_duplicados(self.references if references is None else references)
+    
+    @traced()
+    def validar_comillas_espanolas(self):
+        """Verifica uso de comillas españolas (« ») en vez de inglesas (" ")."""
+        return validar_comillas_espanolas(self.references)
+    
+    @staticmethod
+    def _texts_by_area(section_index):
+        """(body, references) as (paragraph index, text) lists, without the paragraph mark."""
+        paragraphs = section_index.paragraphs if section_index else []
+        start, end, _ = section_index.reference_section() if section_index else (None, None, "")
+        start, end = (start, end) if start is not None else (len(paragraphs), len(paragraphs))
+        texts = [(info.index, info.text[:-1] if info.text.endswith("\r") else info.text) for info in paragraphs]
+        return texts[:start] + texts[end:], texts[start:end]
+    
+    def _note_texts(self):
+        """(paragraph holding the mark, text) of every footnote and endnote; read once."""
+        if self._notes is None:
+            self._notes = []
+            try:
+                for group in self.doc.notes():
+                    for note in group:
+                        self._notes.append((max(bisect_right(self.paragraph_starts, note.anchor) - 1, 0), note.text))
+            except Exception as e:
+                print(f"⚠️ No se pudieron leer las notas al pie: {e}")
+        return self._notes
+    
+    @traced()
+    def escanear_tipografia(self, section_index=None, notes=None):
+        """Comillas, rayas, espacios y puntos suspensivos en cuerpo, notas y referencias."""
+        body, references = self._texts_by_area(section_index or self.section_index)
+        findings, counts = scan_document(body, self._note_texts() if notes is None else notes, references)
+        por_area = {}
+        for finding in findings:
+            por_area[finding.area] = por_area.get(finding.area, 0) + 1
+        return {
+            'total': len(findings),
+            'por_regla': summarize(findings),
+            'por_area': por_area,
+            'clases': counts,
+            'hallazgos': [{'area': f.area, 'parrafo': f.paragraph, 'inicio': f.start, 'fin': f.end,
+                           'regla': f.rule, 'mensaje': f.message, 'texto': f.text} for f in findings],
+        }
+    
+    @traced()
+    def indexar_siglas(self, section_index=None, notes=None):
+        """Primera definición y primer uso de cada sigla en el cuerpo y las notas."""
+        body, _ = self._texts_by_area(section_index or self.section_index)
+        entries, problems = index_acronyms(body, self._note_texts() if notes is None else notes)
+        
+        def where(occurrence):
+            return {'area': occurrence.area, 'parrafo': occurrence.paragraph, 'inicio': occurrence.start,
+                    'fin': occurrence.end} if occurrence else None
+        
+        return {
+            'total': len(problems),
+            'siglas': len(entries),
+            'definidas': sum(1 for entry in entries.values() if entry.definitions),
+            'por_regla': {rule: n for rule in ACRONYM_RULES
+                          if (n := sum(1 for problem in problems if problem.rule == rule))},
+            'problemas': [dict(where(p.occurrence), sigla=p.acronym, regla=p.rule, mensaje=p.message,
+                               definicion=where(p.definition)) for p in problems],
+            'indice': [{'sigla': entry.acronym, 'forma_larga': entry.long_form, 'usos': entry.uses,
+                        'definiciones': [where(d) for d in entry.definitions],
+                        'primer_uso': where(entry.first_use)} for entry in entries.values()],
+        }
+    
+    @traced()
+    def revisar_terminologia(self, glossary_path, section_index=None, notes=None):
+        """Variantes desaconsejadas del glosario de la revista en el cuerpo y las notas."""
+        from silvina.documents import CACHE_DIR
+        from terminology import load_glossary, scan_document as scan_terms, summarize as summarize_terms
+        
+        try:
+            engine = load_glossary(glossary_path, CACHE_DIR)
+        except (OSError, ValueError) as e:
+            return {'error': str(e)}
+        body, _ = self._texts_by_area(section_index or self.section_index)
+        findings = scan_terms(engine, body, self._note_texts() if notes is None else notes)
+        return {
+            'total': len(findings),
+            'glosario': os.path.basename(glossary_path),
+            'terminos': len(engine),
+            'por_variante': [{'variante': variante, 'preferida': preferida, 'casos': n}
+                             for (variante, preferida), n in summarize_terms(findings).items()],
+            'hallazgos': [{'area': f.area, 'parrafo': f.paragraph, 'inicio': f.start, 'fin': f.end,
+                           'texto': f.text, 'preferida': f.suggestion} for f in findings],
+        }
+    
+    @traced()
+    def verificar_dois(self, index_path, references=None):
+        """
+        Verifica los DOI de la bibliografía contra un índice local (sin red).
+        
+        Args:
+            index_path: Índice creado con `python doi_index.py build ...`, o un DoiIndex ya abierto
+            references: Referencias a verificar (por defecto, las del documento)
+        
+        Returns:
+            dict: {
+                'verificados': int,
+                'problemas': list of dicts with position, doi, estado, detalles
+            }
+        """
+        from doi_index import DoiIndex, verify_bibliography
+        
+        references = self.references if references is None else references
+        if isinstance(index_path, DoiIndex):
+            resultados = verify_bibliography(references, index_path)
+        else:
+            with DoiIndex(index_path) as index:
+                resultados = verify_bibliography(references, index)
+        
+        problemas = []
+        for resultado in resultados:
+            if resultado.status in ('mal_formado', 'desconocido', 'discrepancia'):
+                problemas.append({
+                    'posicion': resultado.position,
+                    'doi': resultado.doi,
+                    'estado': resultado.status,
+                    'detalles': resultado.mismatches
+                })
+        
+        return {
+            'verificados': sum(1 for r in resultados if r.status == 'coincide'),
+            'con_doi': sum(1 for r in resultados if r.status != 'sin_doi'),
+            'problemas': problemas
+        }
+    
+    @traced()
+    def verificar_enlaces(self, cache_path=None, references=None):
+        """
+        Verifica que las URL y DOI de las referencias respondan (enlaces rotos).
+        
+        Args:
+            cache_path: Caché en disco (por defecto en CACHE_DIR); enlaces compartidos
+                entre artículos se verifican una vez
+            references: Referencias a verificar (por defecto, las del documento)
+        
+        Returns:
+            dict: {
+                'total': int,
+                'activos': int,
+                'rotos': list of dicts with position, url and detail
+            }
+        """
+        from link_checker import LinkChecker
+        from reference_parser import parse_reference
+        
+        references = self.references if references is None else references
+        urls_por_referencia = [parse_reference(ref.text).urls for ref in references]
+        todas = [url for urls in urls_por_referencia for url in urls]
+        if not todas:
+            return {'total': 0, 'activos': 0, 'rotos': []}
+        
+        if cache_path is None:
+            from silvina.documents import CACHE_DIR
+            cache_path = os.path.join(CACHE_DIR, "enlaces.sqlite")
+        resultados = LinkChecker(cache_path=cache_path).check_urls(todas)
+        
+        rotos = []
+        for i, urls in enumerate(urls_por_referencia, 1):
+            for url in urls:
+                resultado = resultados[url]
+                if not resultado.ok:
+                    rotos.append({
+                        'posicion': i,
+                        'url': url,
+                        'detalle': f"HTTP {resultado.status}" if resultado.status else resultado.error
+                    })
+        
+        return {
+            'total': len(resultados),
+            'activos': sum(1 for r in resultados.values() if r.ok),
+            'rotos': rotos
+        }
+    
+    def close(self):
+        """Clean up Word connection."""
+        if self.doc:
+            self.doc.close()
+
+    def iter_report_sections(self, include_llm=True, doi_index_path=None, check_links=False, sections=None,
+                             glossary_path=None):
+        """
+        Yield report sections one by one, each as soon as its validators finish.
+        
+        Every section carries the readable lines of the .txt report and the
+        same results as structured data for the JSON/JSONL writers. With
+        `sections` (keys of REPORT_SECTIONS) only those sections are built
+        and only the rules they need are run.
+        """
+        wanted = (lambda key: True) if sections is None else set(sections).__contains__
+        options = {'include_llm': include_llm, 'doi_index_path': doi_index_path, 'check_links': check_links,
+                   'glossary_path': glossary_path}
+        loaders = {
+            'references': lambda: self.references,
+            'paragraphs': lambda: self.section_index.paragraphs if self.section_index else [],
+            'sections': lambda: self.section_index,
+            'notes': self._note_texts,
+            'text': lambda: self.doc.content_text() if self.doc else "",
+        }
+        run = self.rule_run = RuleScheduler().run(loaders, sections, options, owner=self)
+        
+        if wanted("documento"):
+            caracteres = self.get_character_count()
+            header = ReportSection("documento", "SILVINA - ASISTENTE EDITORIAL v0.5 COMPLETE")
+            header.add(f"\nDocumento: {os.path.basename(self.filepath)}")
+            header.add(f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+            header.add(f"Caracteres totales: {caracteres:,}")
+            header.data = {'caracteres': caracteres}
+            yield header
+        
+        # ARTICLE TYPE SECTION
+        info_tipo = run.get('tipo_articulo')
+        if wanted("tipo_articulo"):
+            tipo = ReportSection("tipo_articulo", "TIPO DE ARTÍCULO Y CUMPLIMIENTO EUMIC")
+            tipo.add(f"Tipo detectado: {info_tipo['tipo']}")
+            tipo.add(f"Caracteres: {info_tipo['caracteres']:,}")
+            tipo.add(f"{'✅' if info_tipo['cumple_limite'] else '⚠️'} {info_tipo['mensaje']}")
+            if info_tipo.get('secciones'):
+                tipo.add("\nCaracteres por sección:")
+                for titulo, n in info_tipo['secciones']:
+                    tipo.add(f"  • {titulo[:50]}: {n:,}")
+            tipo.data = dict(info_tipo, secciones=[{'titulo': titulo, 'caracteres': n}
+                                                   for titulo, n in info_tipo.get('secciones', [])])
+            yield tipo
+
+        # CUT SUGGESTIONS (only when over the scientific limit)
+        if wanted("recorte") and self.section_index and info_tipo['caracteres'] > 50000:
+            yield self._report_cut_suggestions(info_tipo['caracteres'])
+
+        # LLM REVIEW SECTION (WITHOUT token analysis - moved to end)
+        info_tokens = None
+        if 'revision_llm' in run:
+            llm = ReportSection("revision_llm", "REVISIÓN DE GRAMÁTICA Y ESTILO (LLM)")
+            try:
+                revision = run['revision_llm']
+                info_tokens = revision['tokens']
+                if revision['error']:
+                    llm.add(f"\n⚠️ {revision['error']}")
+                    llm.data = {'error': revision['error']}
+                else:
+                    llm.add(f"\n{revision['revision']}")
+                    llm.data = {'revision': revision['revision']}
+                    
+            except Exception as e:
+                llm.add(f"\n❌ Error en análisis LLM: {str(e)}")
+                llm.data = {'error': str(e)}
+                info_tokens = None  # Set to None if error
+            if wanted("revision_llm"):
+                yield llm
+        
+        # REFERENCES VALIDATION SECTION
+        if wanted("referencias"):
+            yield self._report_references(run, doi_index_path, check_links)
+        
+        if wanted("detalle"):
+            yield reference_detail_section(self.references, run['apa'])
+        
+        # ALPHABETICAL ORDER PROBLEMS DETAIL
+        orden_info = run.get('orden_alfabetico')
+        if wanted("orden_alfabetico") and not orden_info['ordenadas']:
+            orden = ReportSection("orden_alfabetico", "PROBLEMAS DE ORDEN ALFABÉTICO", major=False)
+            for problema in orden_info['problemas']:
+                orden.add(f"⚠️ Referencia #{problema['posicion']}:")
+                orden.add(f"   {problema['texto']}")
+                orden.add(f"   Debería ir ANTES de: {problema['deberia_ir_antes_de']}\n")
+            orden.data = {'problemas': orden_info['problemas']}
+            yield orden
+        
+        # DUPLICATE REFERENCES DETAIL
+        duplicados_info = run.get('duplicados')
+        if wanted("duplicados") and duplicados_info['tiene_duplicados']:
+            duplicados = ReportSection("duplicados", "POSIBLES REFERENCIAS DUPLICADAS", major=False)
+            for dup in duplicados_info['duplicados']:
+                duplicados.add(f"⚠️ Referencias #{dup['ref1_index']} y #{dup['ref2_index']} son {dup['similitud']} similares:")
+                duplicados.add(f"   #{dup['ref1_index']}: {dup['ref1_text']}")
+                duplicados.add(f"   #{dup['ref2_index']}: {dup['ref2_text']}\n")
+            duplicados.data = {'duplicados': duplicados_info['duplicados']}
+            yield duplicados
+        
+        # BROKEN LINKS DETAIL
+        enlaces_info = self._optional_result(run, 'enlaces')
+        if wanted("enlaces_rotos") and enlaces_info and enlaces_info['rotos']:
+            rotos = ReportSection("enlaces_rotos", "ENLACES ROTOS", major=False)
+            for roto in enlaces_info['rotos']:
+                rotos.add(f"⚠️ Referencia #{roto['posicion']}: {roto['url']}")
+                rotos.add(f"   No responde ({roto['detalle']})\n")
+            rotos.data = {'rotos': enlaces_info['rotos']}
+            yield rotos
+        
+        # DOI VERIFICATION DETAIL
+        doi_info = self._optional_result(run, 'dois')
+        if wanted("verificacion_doi") and doi_info and doi_info['problemas']:
+            dois = ReportSection("verificacion_doi", "VERIFICACIÓN DE DOI", major=False)
+            estados = {
+                'mal_formado': 'DOI mal formado',
+                'desconocido': 'DOI no encontrado en el índice',
+                'discrepancia': 'Datos no coinciden con el DOI'
+            }
+            for problema in doi_info['problemas']:
+                dois.add(f"⚠️ Referencia #{problema['posicion']}: {estados[problema['estado']]} ({problema['doi']})")
+                for detalle in problema['detalles']:
+                    dois.add(f"   • {detalle}")
+                dois.add("")
+            dois.data = {'problemas': doi_info['problemas']}
+            yield dois
+        
+        # SPANISH QUOTES PROBLEMS
+        comillas_info = run.get('comillas')
+        if wanted("comillas") and not comillas_info['usa_comillas_correctas']:
+            comillas = ReportSection("comillas", "PROBLEMAS DE COMILLAS", major=False)
+            for problema in comillas_info['problemas']:
+                comillas.add(f"⚠️ Referencia #{problema['posicion']} usa comillas inglesas:")
+                comillas.add(f"   {problema['texto']}")
+                comillas.add(f"   Debe usar comillas españolas (« »)\n")
+            comillas.data = {'problemas': comillas_info['problemas']}
+            yield comillas
+        
+        # TYPOGRAPHY (body, footnotes and references)
+        tipografia_info = run.get('tipografia')
+        if wanted("tipografia") and tipografia_info and tipografia_info['total']:
+            tipografia = ReportSection("tipografia", "TIPOGRAFÍA Y COMILLAS", major=False)
+            areas = ", ".join(f"{area}: {n}" for area, n in tipografia_info['por_area'].items())
+            tipografia.add(f"⚠️ {tipografia_info['total']} problemas ({areas})")
+            for regla, n in tipografia_info['por_regla'].items():
+                tipografia.add(f"   • {TYPOGRAPHY_RULES[regla]}: {n}")
+            tipografia.add("\nPrimeros casos:")
+            for hallazgo in tipografia_info['hallazgos'][:TYPOGRAPHY_EXAMPLES]:
+                tipografia.add(f"   [¶{hallazgo['parrafo']} {hallazgo['area']}] «{hallazgo['texto']}» → {hallazgo['mensaje']}")
+            tipografia.add("")
+            tipografia.data = tipografia_info
+            yield tipografia
+        
+        # ACRONYMS (first definition and first use, body and footnotes)
+        siglas_info = run.get('siglas')
+        if wanted("siglas") and siglas_info and siglas_info['siglas']:
+            siglas = ReportSection("siglas", "SIGLAS Y ACRÓNIMOS", major=False)
+            siglas.add(f"Siglas encontradas: {siglas_info['siglas']} ({siglas_info['definidas']} definidas)")
+            if siglas_info['total']:
+                siglas.add(f"⚠️ {siglas_info['total']} problemas")
+                for regla, n in siglas_info['por_regla'].items():
+                    siglas.add(f"   • {ACRONYM_RULES[regla]}: {n}")
+                siglas.add("")
+                for problema in siglas_info['problemas'][:ACRONYM_EXAMPLES]:
+                    definicion = problema['definicion']
+                    donde = f" (definida en ¶{definicion['parrafo']} {definicion['area']})" if definicion else ""
+                    siglas.add(f"   [¶{problema['parrafo']} {problema['area']}] {problema['sigla']}: "
+                               f"{problema['mensaje']}{donde}")
+            else:
+                siglas.add("✅ Todas las siglas se definen en su primer uso")
+            siglas.add("")
+            siglas.data = siglas_info
+            yield siglas
+        
+        # TERMINOLOGY (journal glossary, body and footnotes)
+        terminologia_info = run.get('terminologia')
+        if wanted("terminologia") and terminologia_info:
+            terminologia = ReportSection("terminologia", "TERMINOLOGÍA", major=False)
+            if 'error' in terminologia_info:
+                terminologia.add(f"⚠️ Glosario no disponible: {terminologia_info['error']}")
+            elif terminologia_info['total']:
+                terminologia.add(f"⚠️ {terminologia_info['total']} variantes desaconsejadas "
+                                 f"(glosario {terminologia_info['glosario']}, {terminologia_info['terminos']} términos)")
+                for variante in terminologia_info['por_variante']:
+                    terminologia.add(f"   • «{variante['variante']}» → «{variante['preferida']}»: {variante['casos']}")
+                terminologia.add("\nPrimeros casos:")
+                for hallazgo in terminologia_info['hallazgos'][:TERMINOLOGY_EXAMPLES]:
+                    terminologia.add(f"   [¶{hallazgo['parrafo']} {hallazgo['area']}] «{hallazgo['texto']}» → "
+                                     f"«{hallazgo['preferida']}»")
+            else:
+                terminologia.add(f"✅ Sin variantes desaconsejadas ({terminologia_info['terminos']} términos)")
+            terminologia.add("")
+            terminologia.data = terminologia_info
+            yield terminologia
+        
+        # TOKEN ANALYSIS (MOVED TO END - Technical info about Silvina)
+        if not wanted("capacidad_llm"):
+            tokens = None
+        elif include_llm and info_tokens:
+            tokens = ReportSection("capacidad_llm", "ANÁLISIS TÉCNICO - CAPACIDAD LLM")
+            tokens.add(f"Caracteres analizados: {info_tokens['caracteres']:,}")
+            tokens.add(f"Tokens estimados: {info_tokens['tokens_estimados']:,}")
+            tokens.add(f"Uso de contexto: {info_tokens['porcentaje_uso']:.1f}%")
+            
+            if not info_tokens['cabe_en_contexto']:
+                tokens.add(f"⚠️ Documento excede contexto LLM - análisis parcial")
+            else:
+                tokens.add(f"✅ Documento completo analizado")
+            tokens.data = dict(info_tokens)
+        elif TRACER.enabled:
+            tokens = ReportSection("capacidad_llm", "ANÁLISIS TÉCNICO - TIEMPOS")
+        else:
+            tokens = None
+        
+        # Timing breakdown of the stages traced so far (--trace)
+        if tokens is not None and TRACER.enabled:
+            tokens.add("\nDesglose de tiempos por etapa:")
+            for line in TRACER.summary_lines():
+                tokens.add(line)
+            tokens.data['tiempos'] = TRACER.totals()
+            rows = run.wait().timing_rows()
+            tokens.add("\nTiempo por regla:")
+            for row in rows:
+                tokens.add(f"  {row['regla']:<28} {row['ms']:9.1f} ms  ({row['costo']})")
+            tokens.data['reglas'] = rows
+        if tokens is not None:
+            yield tokens
+    
+    @staticmethod
+    def _optional_result(run, name):
+        """Result of an optional rule, None when it was not run or failed (reported elsewhere)."""
+        try:
+            return run.get(name)
+        except Exception:
+            return None
+    
+    def _report_references(self, run, doi_index_path, check_links):
+        """VALIDACIÓN DE REFERENCIAS APA: summary of every reference-list rule."""
+        refs = ReportSection("referencias", "VALIDACIÓN DE REFERENCIAS APA")
+        refs.add(f"Tipo de sección: {self.section_type}")
+        refs.add(f"Referencias encontradas: {len(self.references)}")
+        
+        # Count valid/invalid
+        reports = run['apa']
+        valid_count = sum(1 for rep in reports if rep['is_valid'])
+        invalid_count = len(self.references) - valid_count
+        
+        refs.add(f"✅ Válidas: {valid_count}")
+        refs.add(f"❌ Con problemas: {invalid_count}")
+        
+        # ADDITIONAL CHECKS
+        orden_info = run['orden_alfabetico']
+        duplicados_info = run['duplicados']
+        comillas_info = run['comillas']
+        
+        # Summary of additional validations
+        if orden_info['ordenadas']:
+            refs.add(f"✅ Referencias en orden alfabético")
+        else:
+            refs.add(f"⚠️ Referencias NO están en orden alfabético ({len(orden_info['problemas'])} problemas)")
+        
+        if not duplicados_info['tiene_duplicados']:
+            refs.add(f"✅ No se detectaron referencias duplicadas")
+        else:
+            refs.add(f"⚠️ Posibles duplicados encontrados: {len(duplicados_info['duplicados'])}")
+        
+        if comillas_info['usa_comillas_correctas']:
+            refs.add(f"✅ Comillas españolas correctas")
+        else:
+            refs.add(f"⚠️ Uso de comillas inglesas en {len(comillas_info['problemas'])} referencias")
+        
+        # DOI/URL Summary
+        refs_con_doi = sum(1 for rep in reports if rep['doi_url_info']['tiene_doi'])
+        refs_con_url = sum(1 for rep in reports if rep['doi_url_info']['tiene_url'])
+        refs_formato_antiguo = sum(1 for rep in reports if rep['doi_url_info']['formato_antiguo'])
+        
+        refs.add(f"📊 DOI: {refs_con_doi}/{len(self.references)} | URL: {refs_con_url}/{len(self.references)}")
+        if refs_formato_antiguo > 0:
+            refs.add(f"⚠️ {refs_formato_antiguo} referencias usan formato antiguo ('Recuperado de')")
+        
+        refs.data = {
+            'tipo_seccion': self.section_type,
+            'total': len(self.references),
+            'validas': valid_count,
+            'con_problemas': invalid_count,
+            'orden_alfabetico': orden_info['ordenadas'],
+            'duplicados': len(duplicados_info['duplicados']),
+            'comillas_inglesas': len(comillas_info['problemas']),
+            'con_doi': refs_con_doi,
+            'con_url': refs_con_url,
+            'formato_antiguo': refs_formato_antiguo
+        }
+        
+        # Offline DOI verification (only when a local index is available)
+        if doi_index_path:
+            try:
+                doi_info = run['dois']
+                refs.add(f"🔎 DOI verificados en índice local: {doi_info['verificados']}/{doi_info['con_doi']}")
+                if doi_info['problemas']:
+                    refs.add(f"⚠️ {len(doi_info['problemas'])} DOI mal formados, desconocidos o con datos discrepantes")
+                refs.data['doi_verificados'] = doi_info['verificados']
+            except Exception as e:
+                refs.add(f"⚠️ Verificación de DOI no disponible: {e}")
+        
+        # Link liveness (network access required)
+        if check_links:
+            try:
+                enlaces_info = run['enlaces']
+                refs.add(f"🔗 Enlaces activos: {enlaces_info['activos']}/{enlaces_info['total']}")
+                if enlaces_info['rotos']:
+                    refs.add(f"⚠️ {len(enlaces_info['rotos'])} enlaces rotos o sin respuesta")
+                refs.data['enlaces_activos'] = enlaces_info['activos']
+                refs.data['enlaces_total'] = enlaces_info['total']
+            except Exception as e:
+                refs.add(f"⚠️ Verificación de enlaces no disponible: {e}")
+        return refs
+    
+    def write_report(self, writer, include_llm=True, doi_index_path=None, check_links=False, sections=None,
+                     glossary_path=None):
+        """Stream the report through a report_writers writer (txt, md, json, jsonl)."""
+        metadata = {
+            'documento': os.path.basename(self.filepath),
+            'fecha': datetime.now().isoformat(timespec='seconds')
+        }
+        if not self.references:
+            metadata['error'] = "No references found."
+            writer.begin(metadata)
+            writer.end()
+            return
+        with span("reporte", formato=type(writer).__name__):
+            render(metadata, self.iter_report_sections(include_llm, doi_index_path, check_links, sections,
+                                                       glossary_path), writer)
+    
+    def generate_report(self, include_llm=True, doi_index_path=None, check_links=False, sections=None,
+                        glossary_path=None):
+        """Generate formatted validation report with optional LLM review, DOI, link and glossary checks."""
+        if not self.references:
+            return "No references found."
+        
+        buffer = io.StringIO()
+        self.write_report(TextWriter(buffer), include_llm, doi_index_path, check_links, sections, glossary_path)
+        return buffer.getvalue()
+   
+
+    def review_with_llm(self, info_tokens, full_text=None):
+        """Revisión gramatical con contexto RAE."""
+        try:
+            import ollama
+            
+            if full_text is None:
+                full_text = self.doc.content_text() if self.doc else ""
+            MAX_SAMPLE = 2000
+            sample = full_text[:MAX_SAMPLE]
+            
+            prompt = f"""Eres un corrector de textos académicos en español.
+
+INSTRUCCIÓN ÚNICA: Revisa este texto y lista SOLO errores gramaticales EVIDENTES.
+
+PROHIBIDO:
+- NO sugieras cambios de estilo
+- NO comentes sobre estructura
+- NO menciones títulos o keywords
+- NO des consejos generales
+
+Si NO HAY ERRORES, escribe EXACTAMENTE: "No se detectaron errores gramaticales."
+
+TEXTO:
+{sample}"""
+            
+            with span("llm_solicitud", tokens_prompt=len(prompt) // 4) as s:
+                extra = {'keep_alive': LLM_KEEP_ALIVE} if LLM_KEEP_ALIVE else {}
+                response = ollama.chat(
+                    model=LLM_MODEL,
+                    messages=[{'role': 'user', 'content': prompt}],
+                    options={
+                        'num_predict': 500,
+                        'temperature': 0.1
+                    },
+                    **extra
+                )
+                s.set(tokens_respuesta=response.get('eval_count', 0) or 0)
+            
+            return response['message']['content'], None
+        
+        except ImportError:
+            return None, "Módulo 'ollama' no instalado"
+        except Exception as e:
+            return None, f"Error LLM: {str(e)}"
+
+
+# === VALIDATION RULES ===
+# Report sections in order; `sections=` filters use these keys
+REPORT_SECTIONS = ("documento", "tipo_articulo", "recorte", "revision_llm", "referencias", "detalle",
+                   "orden_alfabetico", "duplicados", "enlaces_rotos", "verificacion_doi", "comillas",
+                   "tipografia", "siglas", "terminologia", "capacidad_llm")
+TYPOGRAPHY_EXAMPLES = 20  # cases listed in the text report; the data keeps them all
+ACRONYM_EXAMPLES = 20
+TERMINOLOGY_EXAMPLES = 20
+
+
+@RULES.item("apa", over="references", sections=("referencias", "detalle"),
+            finish=lambda reports, references: reports)
+def regla_apa(position, ref, references):
+    """Autor, año, conjunción y DOI/URL de cada referencia."""
+    return ref.get_validation_report()
+
+
+@RULES.item("orden_alfabetico", over="references", sections=("referencias", "orden_alfabetico"),
+            finish=resumen_orden)
+def regla_orden_alfabetico(position, ref, references):
+    if position + 1 < len(references):
+        return problema_orden(position + 1, ref, references[position + 1])
+    return None
+
+
+@RULES.item("comillas", over="references", sections=("referencias", "comillas"), finish=resumen_comillas)
+def regla_comillas(position, ref, references):
+    return problema_comillas(position + 1, ref)
+
+
+@RULES.rule("tipo_articulo", inputs=("sections",), sections=("tipo_articulo", "recorte"))
+def regla_tipo_articulo(inputs):
+    """EUMIC article type; reads the character count from the document itself."""
+    return inputs.owner.detectar_tipo_articulo(inputs.sections)
+
+
+@RULES.rule("tipografia", inputs=("sections", "notes"), sections=("tipografia",))
+def regla_tipografia(inputs):
+    """Footnotes are an input, read through the backend in the calling thread."""
+    return inputs.owner.escanear_tipografia(inputs.sections, inputs.notes)
+
+
+@RULES.rule("siglas", inputs=("sections", "notes"), sections=("siglas",))
+def regla_siglas(inputs):
+    return inputs.owner.indexar_siglas(inputs.sections, inputs.notes)
+
+
+@RULES.rule("terminologia", inputs=("sections", "notes"), sections=("terminologia",), option="glossary_path")
+def regla_terminologia(inputs):
+    return inputs.owner.revisar_terminologia(inputs.options['glossary_path'], inputs.sections, inputs.notes)
+
+
+@RULES.rule("duplicados", inputs=("references",), sections=("referencias", "duplicados"), cost=EXPENSIVE)
+def regla_duplicados(inputs):
+    return inputs.owner.detectar_duplicados(inputs.references)
+
+
+@RULES.rule("dois", inputs=("references",), sections=("referencias", "verificacion_doi"), cost=EXPENSIVE,
+            option="doi_index_path")
+def regla_dois(inputs):
+    return inputs.owner.verificar_dois(inputs.options['doi_index_path'], inputs.references)
+
+
+@RULES.rule("enlaces", inputs=("references",), sections=("referencias", "enlaces_rotos"), cost=EXPENSIVE,
+            option="check_links")
+def regla_enlaces(inputs):
+    print("\n🔗 Verificando enlaces...")
+    return inputs.owner.verificar_enlaces(references=inputs.references)
+
+
+@RULES.rule("revision_llm", inputs=("text",), sections=("revision_llm", "capacidad_llm"), cost=EXPENSIVE,
+            option="include_llm")
+def regla_revision_llm(inputs):
+    """Token estimate and LLM review; runs while the other sections are built."""
+    print("\n🤖 Analizando con LLM...")
+    info_tokens = inputs.owner.calcular_tokens(inputs.text)
+    with span("revision_llm", tokens=info_tokens['tokens_estimados']):
+        revision, error = inputs.owner.review_with_llm(info_tokens, inputs.text)
+    return {'tokens': info_tokens, 'revision': revision, 'error': error}
+
+
+def report_for(filepath, include_llm=True, history=True):
+    """
+    Load one document and return its text report (picklable for worker processes).
+    
+    With `history` the run is also recorded in the run history database.
+    """
+    if not history:
+        doc = Document(filepath)
+        doc.load()
+        try:
+            return doc.generate_report(include_llm=include_llm)
+        finally:
+            doc.close()
+    
+    from silvina.history import HistoryStore, recording
+    
+    with HistoryStore() as store, \
+            recording(filepath, store, "v0.5", LLM_MODEL if include_llm else None) as recorder:
+        doc = Document(filepath)
+        doc.load()
+        try:
+            buffer = io.StringIO()
+            doc.write_report(MultiWriter([TextWriter(buffer), recorder]), include_llm=include_llm)
+            recorder.rule_run = doc.rule_run
+            return buffer.getvalue() if doc.references else "No references found."
+        finally:
+            doc.close()
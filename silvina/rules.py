@@ -0,0 +1,286 @@
+# silvina/rules.py
+"""
+SILVINA Editorial Assistant - Validator Registry
+Rules declare their inputs, cost class and the report sections that use
+them; the scheduler fuses per-item rules into one pass over each input,
+runs expensive rules on a thread pool and skips rules no section needs
+Universidad de la Defensa Nacional
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import time
+
+from tracing import TRACER, span
+
+
+# Cost classes
+ITEM = "elemento"      # check(position, item, items) per element, fused with the other item rules
+GLOBAL = "global"      # check(inputs) over whole inputs; cheap, runs in the calling thread
+EXPENSIVE = "costosa"  # check(inputs); slow (quadratic, network, LLM), runs on the thread pool
+
+COSTS = (ITEM, GLOBAL, EXPENSIVE)
+INPUTS = ("references", "paragraphs", "sections", "notes", "text")
+DEFAULT_WORKERS = 4
+
+
+# ============================================================
+# RULES AND REGISTRY
+# ============================================================
+
+@dataclass
+class Rule:
+    """One validator and what it needs."""
+
+    name: str
+    check: Callable[..., Any]
+    inputs: Tuple[str, ...]
+    cost: str
+    sections: Tuple[str, ...]                     # report sections that consume the result
+    finish: Optional[Callable[[list, list], Any]] = None  # item rules: findings, items -> result
+    option: Optional[str] = None                  # report option that must be set (e.g. check_links)
+
+    @property
+    def over(self) -> Optional[str]:
+        """The input an item rule iterates."""
+        return self.inputs[0] if self.cost == ITEM else None
+
+
+class RuleRegistry:
+    """Named rules; decorators register module-level check functions."""
+
+    def __init__(self):
+        self._rules: Dict[str, Rule] = {}
+
+    def register(self, rule: Rule) -> Rule:
+        if rule.name in self._rules:
+            raise ValueError(f"Regla duplicada: {rule.name}")
+        if rule.cost not in COSTS:
+            raise ValueError(f"Costo desconocido para {rule.name}: {rule.cost}")
+        unknown = [name for name in rule.inputs if name not in INPUTS]
+        if unknown:
+            raise ValueError(f"Entradas desconocidas para {rule.name}: {', '.join(unknown)}")
+        if rule.cost == ITEM and (len(rule.inputs) != 1 or rule.finish is None):
+            raise ValueError(f"La regla por elemento {rule.name} necesita una entrada y un finish")
+        self._rules[rule.name] = rule
+        return rule
+
+    def item(self, name: str, over: str, sections: Iterable[str],
+             finish: Callable[[list, list], Any], option: Optional[str] = None):
+        """Register check(position, item, items) -> finding or None."""
+        def decorator(func):
+            self.register(Rule(name, func, (over,), ITEM, tuple(sections), finish, option))
+            return func
+        return decorator
+
+    def rule(self, name: str, inputs: Iterable[str], sections: Iterable[str],
+             cost: str = GLOBAL, option: Optional[str] = None):
+        """Register check(inputs) -> result."""
+        def decorator(func):
+            self.register(Rule(name, func, tuple(inputs), cost, tuple(sections), None, option))
+            return func
+        return decorator
+
+    def __getitem__(self, name: str) -> Rule:
+        return self._rules[name]
+
+    def __iter__(self):
+        return iter(self._rules.values())
+
+    def __len__(self):
+        return len(self._rules)
+
+    def select(self, sections: Optional[Iterable[str]] = None,
+               options: Optional[Dict[str, Any]] = None) -> List[Rule]:
+        """Rules feeding any of `sections` (all when None) whose option is enabled."""
+        wanted = None if sections is None else set(sections)
+        options = options or {}
+        return [rule for rule in self
+                if (wanted is None or wanted.intersection(rule.sections))
+                and (rule.option is None or options.get(rule.option))]
+
+
+# Process-wide registry; the pipeline registers the built-in validators
+RULES = RuleRegistry()
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class RuleInputs:
+    """Inputs fetched once, in the calling thread, for every scheduled rule."""
+
+    def __init__(self, values: Dict[str, Any], options: Dict[str, Any], owner: Any = None):
+        self.values = values
+        self.options = options
+        self.owner = owner  # the object the rules validate (the pipeline Document)
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["values"][name]
+        except KeyError:
+            raise AttributeError(f"Entrada no solicitada por la regla: {name}") from None
+
+
+@dataclass
+class RuleTiming:
+    name: str
+    cost: str
+    seconds: float
+    items: int = 0
+
+
+@dataclass
+class RuleRun:
+    """Results of one scheduled run; expensive results are awaited on first access."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    pending: Dict[str, Future] = field(default_factory=dict)
+    timings: Dict[str, RuleTiming] = field(default_factory=dict)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.results or name in self.pending
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self.pending:
+            self.results[name] = self.pending.pop(name).result()
+        return self.results[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self[name] if name in self else default
+
+    def wait(self) -> "RuleRun":
+        for name in list(self.pending):
+            try:
+                self[name]
+            except Exception:
+                pass  # re-raised when the section asks for it
+        return self
+
+    def timing_rows(self) -> List[Dict[str, Any]]:
+        return [{"regla": t.name, "costo": t.cost, "ms": round(t.seconds * 1000, 2), "elementos": t.items}
+                for t in sorted(self.timings.values(), key=lambda t: -t.seconds)]
+
+
+class RuleScheduler:
+    """Runs the rules selected for a report."""
+
+    def __init__(self, registry: RuleRegistry = RULES, workers: int = DEFAULT_WORKERS):
+        self.registry = registry
+        self.workers = workers
+
+    def run(self, loaders: Dict[str, Callable[[], Any]], sections: Optional[Iterable[str]] = None,
+            options: Optional[Dict[str, Any]] = None, owner: Any = None) -> RuleRun:
+        """
+        Schedule the rules that `sections` need.
+
+        `loaders` maps each input name to a zero-argument function; only the
+        inputs some selected rule declares are loaded.
+        """
+        options = options or {}
+        rules = self.registry.select(sections, options)
+        needed = {name for rule in rules for name in rule.inputs}
+        inputs = RuleInputs({name: loaders[name]() for name in INPUTS if name in needed}, options, owner)
+        run = RuleRun()
+
+        # Expensive rules start first so they overlap with everything below
+        expensive = [rule for rule in rules if rule.cost == EXPENSIVE]
+        if expensive:
+            pool = ThreadPoolExecutor(max_workers=min(self.workers, len(expensive)),
+                                      thread_name_prefix="silvina-regla")
+            for rule in expensive:
+                run.pending[rule.name] = pool.submit(TRACER.bind(self._timed), rule, inputs, run)
+            pool.shutdown(wait=False)
+
+        groups: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            if rule.cost == ITEM:
+                groups.setdefault(rule.over, []).append(rule)
+        for over, group in groups.items():
+            self._fused_pass(group, inputs.values[over], run)
+
+        for rule in rules:
+            if rule.cost == GLOBAL:
+                run.results[rule.name] = self._timed(rule, inputs, run)
+        return run
+
+    @staticmethod
+    def _timed(rule: Rule, inputs: RuleInputs, run: RuleRun) -> Any:
+        start = time.perf_counter()
+        try:
+            return rule.check(inputs)  # the pipeline methods behind the rules trace themselves
+        finally:
+            run.timings[rule.name] = RuleTiming(rule.name, rule.cost, time.perf_counter() - start)
+
+    @staticmethod
+    def _fused_pass(group: List[Rule], items: list, run: RuleRun):
+        """One traversal of `items` feeding every item rule of the group."""
+        findings: List[list] = [[] for _ in group]
+        elapsed = [0.0] * len(group)
+        clock = time.perf_counter
+        with span("reglas_por_elemento", elementos=len(items), reglas=len(group)):
+            for position, item in enumerate(items):
+                for k, rule in enumerate(group):
+                    start = clock()
+                    finding = rule.check(position, item, items)
+                    elapsed[k] += clock() - start
+                    if finding is not None:
+                        findings[k].append(finding)
+            for k, rule in enumerate(group):
+                start = clock()
+                run.results[rule.name] = rule.finish(findings[k], items)
+                run.timings[rule.name] = RuleTiming(rule.name, ITEM, elapsed[k] + clock() - start, len(items))
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(n_references: int = 200, repeats: int = 5):
+    """Scheduled rules versus the separate per-check loops they replace."""
+    import statistics
+    from report_writers import _synthetic_references
+    from silvina import pipeline, rules  # the registry the pipeline filled, also under `python -m`
+
+    references = _synthetic_references(n_references)
+    doc = pipeline.Document("sintetico.docx")
+    doc.references = references
+    sections = ["detalle", "orden_alfabetico", "comillas"]  # the per-reference rules only
+    loaders = {"references": lambda: references, "paragraphs": list, "sections": lambda: None,
+               "notes": list, "text": lambda: ""}
+
+    def separate():
+        sum(1 for ref in references if ref.is_valid())
+        sum(1 for ref in references if ref.tiene_doi_o_url()['tiene_doi'])
+        sum(1 for ref in references if ref.tiene_doi_o_url()['tiene_url'])
+        sum(1 for ref in references if ref.tiene_doi_o_url()['formato_antiguo'])
+        doc.validar_orden_alfabetico()
+        doc.validar_comillas_espanolas()
+        [ref.get_validation_report() for ref in references]
+
+    def scheduled():
+        return rules.RuleScheduler().run(loaders, sections, owner=doc).wait()
+
+    def measure(func):
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
+
+    before, after = measure(separate), measure(scheduled)
+    print("SILVINA - Registro de Reglas (Benchmark)")
+    print("=" * 60)
+    print(f"  Referencias: {n_references} | reglas registradas: {len(rules.RULES)}")
+    print(f"  Recorridos separados : {before * 1000:8.1f} ms")
+    print(f"  Pasada fusionada     : {after * 1000:8.1f} ms ({before / after:.1f}x)")
+    print("\n  Tiempo por regla:")
+    for row in scheduled().timing_rows():
+        print(f"    {row['regla']:<22} {row['costo']:<9} {row['ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark()
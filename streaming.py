@@ -0,0 +1,330 @@
+# streaming.py
+"""
+SILVINA Editorial Assistant - Streaming Pipeline
+Bounded-memory analysis: lazy paragraph readers, per-paragraph validators
+and an incremental report writer for journal-issue-sized documents
+Universidad de la Defensa Nacional
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from citation_integrity import citation_key
+from citations import PLAIN_SENTENCES, SAMPLE_SENTENCES, CitationExtractor
+from reference_parser import normalize_name, parse_reference
+from reference_segmenter import ParagraphInfo, iter_references, reference_heading_type
+from references import Reference
+
+
+ENGLISH_QUOTES = ('"', '“', '”')
+
+CitedKey = Tuple[str, str, str]
+
+
+# ============================================================
+# READERS (generators; nothing is materialized)
+# ============================================================
+
+def iter_text_file(path: str, encoding: str = "utf-8") -> Iterator[ParagraphInfo]:
+    """One ParagraphInfo per line of a plain-text export."""
+    with open(path, encoding=encoding) as f:
+        for i, line in enumerate(f):
+            yield ParagraphInfo(line.rstrip("\n"), i)
+
+
+def as_paragraph_infos(paragraphs: Iterable[Union[str, ParagraphInfo]]) -> Iterator[ParagraphInfo]:
+    """Accept plain strings or ParagraphInfo records."""
+    for i, para in enumerate(paragraphs):
+        yield para if isinstance(para, ParagraphInfo) else ParagraphInfo(para, i)
+
+
+def _until_heading(paragraphs: Iterator[ParagraphInfo], stopper: List[ParagraphInfo]) -> Iterator[ParagraphInfo]:
+    """Yield paragraphs up to the next heading-styled one, which goes to `stopper`."""
+    for para in paragraphs:
+        if para.is_heading:
+            stopper.append(para)
+            return
+        yield para
+
+
+# ============================================================
+# INCREMENTAL REPORT WRITER
+# ============================================================
+
+class StreamingReportWriter:
+    """
+    Writes findings as soon as they are produced.
+
+    Findings come in document order, tagged with their paragraph; only
+    per-section counters are kept, so the report never sits in memory.
+    """
+
+    def __init__(self, stream: TextIO, max_per_kind: Optional[int] = None):
+        self.stream = stream
+        self.max_per_kind = max_per_kind
+        self.counts: Dict[str, int] = {}
+
+    def header(self, title: str):
+        self.stream.write("=" * 70 + "\n")
+        self.stream.write(f"{title}\n")
+        self.stream.write("=" * 70 + "\n")
+
+    def finding(self, kind: str, paragraph: int, message: str):
+        count = self.counts.get(kind, 0) + 1
+        self.counts[kind] = count
+        if self.max_per_kind is None or count <= self.max_per_kind:
+            self.stream.write(f"[¶{paragraph}] {kind}: {message}\n")
+
+    def line(self, text: str = ""):
+        self.stream.write(f"{text}\n")
+
+
+# ============================================================
+# CITATION LEDGER
+# ============================================================
+
+class CitationLedger:
+    """
+    Cited (surname, year, suffix) keys, resolved as references stream by.
+
+    Memory grows with the number of distinct cited sources, not with
+    document length. References follow the body, so by the time an entry
+    arrives every citation has been seen and it can be judged at once.
+    """
+
+    def __init__(self):
+        self.cited: Dict[CitedKey, List] = {}  # key -> [count, first paragraph, raw text, resolved]
+        self.by_year: Dict[Tuple[str, str], List[CitedKey]] = {}
+
+    def cite(self, citation):
+        author = citation.authors[0] if citation.authors else ""
+        key = citation_key(author, citation.year)
+        entry = self.cited.get(key)
+        if entry is None:
+            self.cited[key] = [1, citation.paragraph_index, citation.raw_text, False]
+            self.by_year.setdefault(key[:2], []).append(key)
+        else:
+            entry[0] += 1
+
+    def resolve_reference(self, text: str) -> bool:
+        """Mark the citations this entry satisfies; False if none cite it."""
+        parsed = parse_reference(text)
+        if not parsed.first_author:
+            return True  # cannot tell; not reported as uncited
+        surname = normalize_name(parsed.first_author)
+        year = parsed.year or "s.f."
+        cited = False
+        for key in self.by_year.get((surname, year), []):
+            if not key[2] or not parsed.year_suffix or key[2] == parsed.year_suffix:
+                self.cited[key][3] = True
+                cited = True
+        return cited
+
+    def unresolved(self) -> Iterator[Tuple[CitedKey, List]]:
+        return ((key, entry) for key, entry in self.cited.items() if not entry[3])
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
+
+@dataclass
+class StreamSummary:
+    paragraphs: int = 0
+    characters: int = 0
+    citations: int = 0
+    references: int = 0
+    invalid_references: int = 0
+    uncited_references: int = 0
+    unresolved_citations: int = 0
+    quote_paragraphs: int = 0
+    section_type: Optional[str] = None
+
+
+def _counted(paragraphs: Iterator[ParagraphInfo], summary: StreamSummary) -> Iterator[ParagraphInfo]:
+    for para in paragraphs:
+        summary.paragraphs += 1
+        summary.characters += len(para.text)
+        yield para
+
+
+def analyze_stream(paragraphs: Iterable[Union[str, ParagraphInfo]],
+                   writer: StreamingReportWriter) -> StreamSummary:
+    """
+    Analyze a paragraph stream in one pass with bounded memory.
+
+    Body paragraphs go through the citation extractor and text checks;
+    after the first references heading, paragraphs are segmented lazily
+    by iter_references and each entry is validated and matched against
+    the citations seen so far. The reference section ends at the next
+    heading style (annexes), after which body analysis resumes. Unlike
+    locate_references, a section without a heading cannot be detected
+    in a single forward pass.
+    """
+    extractor = CitationExtractor()
+    ledger = CitationLedger()
+    summary = StreamSummary()
+    stream = _counted(as_paragraph_infos(paragraphs), summary)
+
+    writer.header("SILVINA - ANÁLISIS EN FLUJO")
+    for para in stream:
+        section_type = reference_heading_type(para)
+        if section_type and summary.section_type is None:
+            summary.section_type = section_type
+            stopper: List[ParagraphInfo] = []
+            for position, entry in enumerate(iter_references(_until_heading(stream, stopper)), 1):
+                _check_reference(position, entry.paragraph_index, entry.text, ledger, writer, summary)
+            continue  # a closing heading (annex) has no citations to scan
+
+        for citation in extractor.scan(para.text, para.index):
+            summary.citations += 1
+            ledger.cite(citation)
+        if any(quote in para.text for quote in ENGLISH_QUOTES):
+            summary.quote_paragraphs += 1
+            writer.finding("comillas", para.index, "usar comillas españolas « » en lugar de \" \"")
+
+    for _, (count, paragraph, raw_text, _) in ledger.unresolved():
+        summary.unresolved_citations += 1
+        writer.finding("cita sin referencia", paragraph, f"{raw_text} ({count} aparición/es)")
+
+    _write_summary(writer, summary)
+    return summary
+
+
+def _check_reference(position: int, paragraph: int, text: str, ledger: CitationLedger,
+                     writer: StreamingReportWriter, summary: StreamSummary):
+    summary.references += 1
+    report = Reference(text).get_validation_report()
+    problems = []
+    if not report['valid_author']:
+        problems.append("autor")
+    if not report['valid_year']:
+        problems.append("año")
+    if not report['valid_conjuncion']:
+        problems.append(report['error_conjuncion'] or "conjunción")
+    if problems:
+        summary.invalid_references += 1
+        writer.finding("referencia", paragraph, f"#{position} {', '.join(problems)} → {report['text']}")
+    if not ledger.resolve_reference(text):
+        summary.uncited_references += 1
+        writer.finding("referencia no citada", paragraph, f"#{position} {report['text']}")
+
+
+def _write_summary(writer: StreamingReportWriter, summary: StreamSummary):
+    writer.line()
+    writer.header("RESUMEN")
+    if summary.section_type is None and summary.citations:
+        writer.line("⚠️ No se encontró el título Referencias/Bibliografía")
+    writer.line(f"Párrafos: {summary.paragraphs:,} | Caracteres: {summary.characters:,}")
+    writer.line(f"Citas en texto: {summary.citations:,} | "
+                f"sin referencia: {summary.unresolved_citations:,}")
+    writer.line(f"Referencias: {summary.references:,} | con errores: {summary.invalid_references:,} | "
+                f"no citadas: {summary.uncited_references:,}")
+    writer.line(f"Párrafos con comillas inglesas: {summary.quote_paragraphs:,}")
+    hidden = {kind: n - writer.max_per_kind for kind, n in writer.counts.items()
+              if writer.max_per_kind is not None and n > writer.max_per_kind}
+    for kind, n in hidden.items():
+        writer.line(f"  ({n:,} hallazgos más de tipo '{kind}' no listados)")
+
+
+def stream_file_report(input_path: str, output_path: str,
+                       max_per_kind: Optional[int] = None) -> StreamSummary:
+    """Plain-text manuscript in, report file out, one paragraph at a time."""
+    with open(output_path, "w", encoding="utf-8") as out:
+        return analyze_stream(iter_text_file(input_path), StreamingReportWriter(out, max_per_kind))
+
+
+# ============================================================
+# BENCHMARK (constant memory)
+# ============================================================
+
+BENCH_REFERENCES = [
+    "García, M. (2020). Disuasión convencional. Editorial UNDEF.",
+    "López, A., Pérez, B. y Ruiz, C. (2019). El problema. Revista Visión Conjunta, 3(1), 1-9.",
+    "Pérez, J. (2021). Estudios. Revista, 2(1), 1-5.",
+    "Gidney, C. y Ekera, M. (2024). Factoring RSA. Quantum, 5, 1-20.",
+    "IBM Research. (2024). Quantum roadmap. https://www.ibm.com/quantum",
+    "Núñez, P. (2018a). Logística I. Editorial UNDEF.",
+    "Núñez, P. (2018b). Logística II. Editorial UNDEF.",
+]
+
+
+def write_synthetic_manuscript(path: str, n_chars: int, seed: int = 5) -> int:
+    """Write a body of about `n_chars` characters plus a reference list, line by line."""
+    rng = random.Random(seed)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while written < n_chars:
+            sentences = [rng.choice(SAMPLE_SENTENCES) if rng.random() < 0.3
+                         else rng.choice(PLAIN_SENTENCES) for _ in range(5)]
+            if rng.random() < 0.02:
+                sentences.append('El término "disuasión" se usa en sentido amplio.')
+            line = " ".join(sentences)
+            f.write(line + "\n")
+            written += len(line) + 1
+        f.write("Referencias\n")
+        for entry in BENCH_REFERENCES:
+            f.write(entry + "\n")
+            written += len(entry) + 1
+    return written
+
+
+def _peak_of(func) -> Tuple[object, int, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def run_benchmark(sizes=(1_000_000, 5_000_000, 20_000_000)):
+    print("SILVINA - Pipeline en Flujo (Benchmark de memoria)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "manuscrito.txt")
+        report = os.path.join(tmp, "informe.txt")
+        for size in sizes:
+            write_synthetic_manuscript(source, size)
+
+            summary, peak, elapsed = _peak_of(lambda: stream_file_report(source, report))
+
+            def materialized():
+                with open(source, encoding="utf-8") as f:
+                    paragraphs = f.read().split("\n")
+                return CitationExtractor().extract_document(paragraphs)
+            _, full_peak, _ = _peak_of(materialized)
+
+            print(f"  {size / 1e6:4.0f}M caracteres: pico en flujo {peak / 2**20:6.2f} MiB "
+                  f"| materializado {full_peak / 2**20:7.1f} MiB "
+                  f"| {summary.citations:,} citas en {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark()
+    elif len(sys.argv) > 2:
+        result = stream_file_report(sys.argv[1], sys.argv[2], max_per_kind=200)
+        print(f"✓ Informe escrito en {sys.argv[2]} ({result.paragraphs:,} párrafos)")
+    else:
+        demo = [
+            "La disuasión convencional sigue vigente (García, 2020, p. 45).",
+            "Según López et al. (2019) el término \"ciberdefensa\" es ambiguo.",
+            "Varios estudios (Pérez, 2021) lo confirman (Martínez, 2018).",
+            ParagraphInfo("Referencias", 3, "Título 1"),
+            ParagraphInfo("García, M. (2020). Disuasión. Editorial UNDEF.", 4),
+            ParagraphInfo("López, A., Pérez, B. & Ruiz, C. (2019). El problema. Revista, 3(1), 1-9.", 5),
+            ParagraphInfo("Pérez, J. (2021). Estudios. Revista, 2(1), 1-5.", 6),
+            ParagraphInfo("Sosa, L. (2017). Nunca citado. Editorial UNDEF.", 7),
+            ParagraphInfo("Anexo I", 8, "Título 1"),
+            ParagraphInfo("Cuestionario aplicado.", 9),
+        ]
+        analyze_stream(demo, StreamingReportWriter(sys.stdout))
+        print("\n💡 Uso: python streaming.py manuscrito.txt informe.txt | --bench")
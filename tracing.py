@@ -0,0 +1,282 @@
+# tracing.py
+"""
+SILVINA Editorial Assistant - Stage Tracing
+Timed spans with counters around each pipeline stage, exportable as
+Chrome trace JSON (chrome://tracing, Perfetto) and as a text summary
+Universidad de la Defensa Nacional
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+
+# ============================================================
+# SPANS
+# ============================================================
+
+@dataclass
+class Span:
+    """One timed stage; `args` holds its counters (paragraphs, references...)."""
+
+    name: str
+    start: float
+    duration: float = 0.0
+    thread: int = 0
+    depth: int = 0
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **counters):
+        self.args.update(counters)
+
+
+class _ActiveSpan:
+    """Context manager that times a span and records it on exit."""
+
+    __slots__ = ('tracer', 'span')
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.tracer._depth.value = self.span.depth + 1
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.duration = time.perf_counter() - self.span.start
+        if exc_type is not None:
+            self.span.args['error'] = exc_type.__name__
+        self.tracer._depth.value = self.span.depth
+        captured = getattr(self.tracer._capture, 'spans', None)
+        if captured is not None:
+            captured.append(self.span)
+        else:
+            with self.tracer._lock:
+                self.tracer.spans.append(self.span)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is off (no allocation per call)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **counters):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+# ============================================================
+# TRACER
+# ============================================================
+
+class Tracer:
+    """
+    Collects spans while enabled; costs one attribute check when disabled.
+
+    Usage:
+        with TRACER.span("extraer", parrafos=n) as s:
+            ...
+            s.set(referencias=len(refs))
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._depth = threading.local()
+        self._capture = threading.local()
+        self._capturing = 0  # threads inside capture(); keeps the disabled path cheap
+
+    def enable(self):
+        self.enabled = True
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.spans = []
+        self.origin = time.perf_counter()
+
+    def span(self, name: str, **counters):
+        if not self.enabled and (not self._capturing or getattr(self._capture, 'spans', None) is None):
+            return NULL_SPAN
+        depth = getattr(self._depth, 'value', 0)
+        return _ActiveSpan(self, Span(name, 0.0, thread=threading.get_ident(),
+                                      depth=depth, args=counters))
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator form of span() for functions and methods."""
+        def decorator(func):
+            label = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled and (not self._capturing or getattr(self._capture, 'spans', None) is None):
+                    return func(*args, **kwargs)
+                with self.span(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def capture(self) -> Iterator[List[Span]]:
+        """
+        Collect the spans of the current thread into a private list.
+
+        Works with tracing disabled and keeps the global list untouched,
+        so concurrent jobs in a long-running process are timed apart.
+        """
+        spans: List[Span] = []
+        previous = getattr(self._capture, 'spans', None)
+        self._capture.spans = spans
+        with self._lock:
+            self._capturing += 1
+        try:
+            yield spans
+        finally:
+            self._capture.spans = previous
+            with self._lock:
+                self._capturing -= 1
+
+    def bind(self, func: Callable) -> Callable:
+        """
+        Wrap `func` to run in another thread with this thread's capture().
+
+        Spans of work handed to a pool then land in the job's private list.
+        """
+        spans = getattr(self._capture, 'spans', None)
+        if spans is None:
+            return func
+
+        @wraps(func)
+        def bound(*args, **kwargs):
+            previous = getattr(self._capture, 'spans', None)
+            self._capture.spans = spans
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._capture.spans = previous
+        return bound
+
+    # --- Export ---
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format: complete ('X') events in microseconds."""
+        pid = os.getpid()
+        events = [{
+            "name": span.name,
+            "cat": "silvina",
+            "ph": "X",
+            "ts": round((span.start - self.origin) * 1e6, 1),
+            "dur": round(span.duration * 1e6, 1),
+            "pid": pid,
+            "tid": span.thread,
+            "args": span.args,
+        } for span in sorted(self.spans, key=lambda s: s.start)]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+
+    def totals(self, spans: Optional[List[Span]] = None) -> List[Dict[str, Any]]:
+        """Per stage: calls, total seconds and merged counters, in pipeline order."""
+        stages: Dict[str, Dict[str, Any]] = {}
+        for span in sorted(self.spans if spans is None else spans, key=lambda s: s.start):
+            stage = stages.setdefault(span.name, {"etapa": span.name, "llamadas": 0,
+                                                  "segundos": 0.0, "depth": span.depth,
+                                                  "contadores": {}})
+            stage["llamadas"] += 1
+            stage["segundos"] += span.duration
+            stage["depth"] = min(stage["depth"], span.depth)
+            for key, value in span.args.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage["contadores"][key] = stage["contadores"].get(key, 0) + value
+        return list(stages.values())
+
+    def summary_lines(self) -> List[str]:
+        """Timing breakdown as report lines; shares are of the time elapsed since tracing began."""
+        stages = self.totals()
+        total = (time.perf_counter() - self.origin) or 1e-9
+        lines = []
+        for stage in stages:
+            counters = ", ".join(f"{k}={v:,}" for k, v in stage["contadores"].items())
+            lines.append(f"  {'  ' * stage['depth']}{stage['etapa']:<{28 - 2 * stage['depth']}} "
+                         f"{stage['segundos'] * 1000:9.1f} ms {stage['segundos'] / total:6.1%}"
+                         f"{'  ×' + str(stage['llamadas']) if stage['llamadas'] > 1 else ''}"
+                         f"{'  (' + counters + ')' if counters else ''}")
+        return lines
+
+
+# Process-wide tracer; turned on by --trace or SILVINA_TRACE=1
+TRACER = Tracer(enabled=os.environ.get("SILVINA_TRACE", "") not in ("", "0"))
+span = TRACER.span
+traced = TRACER.traced
+
+
+# ============================================================
+# OVERHEAD BENCHMARK
+# ============================================================
+
+def run_benchmark(n: int = 1_000_000):
+    print("SILVINA - Trazado por Etapas (Benchmark de sobrecarga)")
+    print("=" * 60)
+    tracer = Tracer(enabled=False)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        pass
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n):
+        with tracer.span("x"):
+            pass
+    disabled = time.perf_counter() - start
+
+    tracer.enable()
+    start = time.perf_counter()
+    for _ in range(n // 10):
+        with tracer.span("x", n=1):
+            pass
+    enabled = (time.perf_counter() - start) * 10
+
+    print(f"  Desactivado: {(disabled - baseline) / n * 1e9:6.0f} ns por span")
+    print(f"  Activado   : {(enabled - baseline) / n * 1e9:6.0f} ns por span")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        run_benchmark()
+    else:
+        TRACER.enable()
+        with span("conectar"):
+            time.sleep(0.02)
+        with span("extraer", parrafos=120) as s:
+            for i in range(3):
+                with span("validador", referencias=10):
+                    time.sleep(0.005)
+            s.set(referencias=30)
+        print("\n".join(TRACER.summary_lines()))
+        # Optional output path; by default the demo leaves nothing in the working directory
+        out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tempfile.gettempdir(), "silvina_trace_demo.json")
+        TRACER.export_chrome(out)
+        print(f"\n💾 Traza Chrome: {out} (abrir en chrome://tracing o ui.perfetto.dev)")
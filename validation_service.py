@@ -0,0 +1,610 @@
+# validation_service.py
+"""
+SILVINA Editorial Assistant - Validation Service
+Long-running local daemon with an HTTP/JSON API: manuscripts are queued
+by priority, validated by a bounded pool of warm workers, and their
+reports polled or streamed section by section
+Universidad de la Defensa Nacional
+"""
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+import io
+import itertools
+import json
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+
+from document_backends import FIXTURE_SUFFIX, HAS_WIN32, open_backend, start_word
+from report_writers import MultiWriter, ReportSection, ReportWriter, TextWriter
+from silvina.history import HistoryRecorder, HistoryStore, file_hash
+from tracing import TRACER
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE = 100
+LLM_KEEP_ALIVE = "30m"
+MAX_FINISHED_JOBS = 500   # finished jobs kept for polling; older ones are dropped
+STATS_WINDOW = 500        # latest samples per stage for the latency percentiles
+
+PRIORITIES = {"interactiva": 0, "normal": 1, "lote": 2}
+FINAL_STATES = ("terminado", "fallido", "cancelado")
+
+
+def load_pipeline():
+    """The editorial pipeline module (imported once per process)."""
+    from silvina import pipeline
+    return pipeline
+
+
+# ============================================================
+# JOBS
+# ============================================================
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    """One manuscript in the queue; sections accumulate as validators finish."""
+
+    id: str
+    path: str
+    priority: str = "normal"
+    llm: bool = True
+    uploaded: bool = False  # the service owns the file and deletes it afterwards
+    state: str = "en_cola"
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+    report: str = ""
+    error: Optional[str] = None
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    cancel_requested: bool = False
+    on_finish: Optional[Callable[["Job"], None]] = field(default=None, repr=False)
+    changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def summary(self) -> Dict[str, Any]:
+        info = {
+            "id": self.id,
+            "documento": os.path.basename(self.path).split("_", 1)[-1] if self.uploaded
+                         else os.path.basename(self.path),
+            "prioridad": self.priority,
+            "estado": self.state,
+            "secciones": len(self.sections),
+        }
+        if self.started:
+            info["espera_s"] = round(self.started - self.submitted, 3)
+        if self.finished and self.started:
+            info["duracion_s"] = round(self.finished - self.started, 3)
+        if self.error:
+            info["error"] = self.error
+        if self.stages:
+            info["tiempos_ms"] = {s["etapa"]: round(s["segundos"] * 1000, 1) for s in self.stages}
+        return info
+
+
+class _JobWriter(ReportWriter):
+    """Publishes each section to the job (and its streamers) and renders the text report."""
+
+    def __init__(self, job: Job):
+        self.buffer = io.StringIO()
+        super().__init__(self.buffer)
+        self.job = job
+        self.text = TextWriter(self.buffer)
+
+    def section(self, section: ReportSection):
+        if self.job.cancel_requested:
+            raise JobCancelled()
+        self.text.section(section)
+        with self.job.changed:
+            self.job.sections.append({"clave": section.key, "titulo": section.title,
+                                      "lineas": section.lines, "datos": section.data})
+            self.job.changed.notify_all()
+
+    def end(self):
+        self.text.end()
+        self.job.report = self.buffer.getvalue()
+
+
+# ============================================================
+# LATENCY STATISTICS
+# ============================================================
+
+class StageStats:
+    """Rolling per-stage latency samples, summarized as mean, p50 and p95."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self.window = window
+        self.samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(stage, deque(maxlen=self.window)).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {stage: sorted(values) for stage, values in self.samples.items()}
+        result = {}
+        for stage, values in snapshot.items():
+            n = len(values)
+            result[stage] = {
+                "n": n,
+                "media_ms": round(sum(values) / n * 1000, 1),
+                "p50_ms": round(values[n // 2] * 1000, 1),
+                "p95_ms": round(values[min(int(n * 0.95), n - 1)] * 1000, 1),
+            }
+        return result
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class ValidationService:
+    """
+    Priority queue plus a bounded pool of worker threads.
+
+    Loaded once and kept warm for the life of the process: the pipeline
+    module and its compiled patterns, the DOI Bloom filter, one Word
+    instance per worker (COM is per thread) and the Ollama model.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_QUEUE,
+                 doi_index_path: Optional[str] = None, check_links: bool = False,
+                 llm: bool = True, pipeline=None, history: bool = True, history_path: Optional[str] = None):
+        self.workers = workers
+        self.doi_index_path = doi_index_path
+        self.check_links = check_links
+        self.llm = llm
+        self.pipeline = pipeline or load_pipeline()
+        self.queue: "queue.PriorityQueue" = queue.PriorityQueue(maxsize=max_queue)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.stats = StageStats()
+        self.counts = {state: 0 for state in FINAL_STATES}
+        self.upload_dir = tempfile.mkdtemp(prefix="silvina_servicio_")
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._doi_index = None
+        self.history = HistoryStore(history_path) if history else None  # shared by the workers
+
+        if doi_index_path:
+            from doi_index import DoiIndex
+            self._doi_index = DoiIndex(doi_index_path)  # one Bloom filter, a connection per thread
+
+    # --- Lifecycle ---
+
+    def start(self):
+        if self.llm:
+            threading.Thread(target=self._warm_llm, daemon=True).start()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"silvina-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Running jobs finish; queued ones are cancelled instead of drained."""
+        while True:
+            try:
+                _, _, job = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                with job.changed:
+                    if not job.done:
+                        job.cancel_requested = True
+                        self._finish(job, "cancelado")
+        for _ in self._threads:
+            self.queue.put((-1, next(self._seq), None))  # ahead of anything submitted meanwhile
+        for thread in self._threads:
+            thread.join()
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+        if self._doi_index is not None:
+            self._doi_index.close()
+        if self.history is not None:
+            self.history.close()
+
+    def _warm_llm(self):
+        """Load the model now and keep it resident between documents."""
+        self.pipeline.LLM_KEEP_ALIVE = LLM_KEEP_ALIVE
+        try:
+            import ollama
+            ollama.generate(model=self.pipeline.LLM_MODEL, prompt="", keep_alive=LLM_KEEP_ALIVE)
+            print(f"🔥 Modelo {self.pipeline.LLM_MODEL} cargado (keep_alive={LLM_KEEP_ALIVE})")
+        except ImportError:
+            print("⚠️ Módulo 'ollama' no instalado - revisión LLM deshabilitada")
+        except Exception as e:
+            print(f"⚠️ No se pudo precargar el modelo: {e}")
+
+    # --- Jobs ---
+
+    def submit(self, path: str, priority: str = "normal", llm: Optional[bool] = None,
+               uploaded: bool = False, on_finish: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Queue a manuscript; raises queue.Full when the queue is at capacity.
+
+        `on_finish(job)` runs once the job ends in any final state.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridad desconocida: {priority} (opciones: {', '.join(PRIORITIES)})")
+        job = Job(uuid.uuid4().hex[:12], path, priority, self.llm if llm is None else llm and self.llm,
+                  uploaded, on_finish=on_finish)
+        self.queue.put_nowait((PRIORITIES[priority], next(self._seq), job))
+        with self._lock:
+            self.jobs[job.id] = job
+        return job
+
+    def save_upload(self, name: str, data: bytes) -> str:
+        safe = re.sub(r"[^\w.\-]", "_", os.path.basename(name)) or "manuscrito.docx"
+        path = os.path.join(self.upload_dir, f"{uuid.uuid4().hex[:8]}_{safe}")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Queued jobs are dropped; running jobs stop at the next section boundary."""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+        with job.changed:
+            job.cancel_requested = True
+            if job.state == "en_cola":
+                self._finish(job, "cancelado")
+        return job
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = [job for job in self.jobs.values() if job.state == "en_cola"]
+            running = self._running
+        return {
+            "trabajadores": self.workers,
+            "en_ejecucion": running,
+            "cola": len(queued),
+            "cola_por_prioridad": {p: sum(1 for j in queued if j.priority == p) for p in PRIORITIES},
+            "capacidad_cola": self.queue.maxsize,
+            "finalizados": dict(self.counts),
+            "word": HAS_WIN32,
+            "latencias": self.stats.summary(),
+        }
+
+    def _finish(self, job: Job, state: str, error: Optional[str] = None):
+        """Must be called holding job.changed."""
+        job.state = state
+        job.error = error
+        job.finished = time.time()
+        job.changed.notify_all()
+        if job.on_finish is not None:
+            try:
+                job.on_finish(job)
+            except Exception as e:
+                print(f"⚠️ Error al cerrar el trabajo {job.id}: {e}")
+        if job.uploaded:
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+        with self._lock:
+            self.counts[state] += 1
+            finished = [j.id for j in self.jobs.values() if j.done]
+            for old in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+                del self.jobs[old]
+
+    def _record_history(self, job: Job, recorder: HistoryRecorder, rule_run):
+        record = recorder.finish(job.stages, rule_run, job.finished - job.started, job.error)
+        record.started_at = job.started
+        record.document = job.summary()["documento"]
+        try:
+            self.history.add(record)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar en el historial: {e}")
+
+    # --- Workers ---
+
+    def _worker(self):
+        word = None
+        while True:
+            _, _, job = self.queue.get()
+            if job is None:
+                break
+            with job.changed:
+                # Checked under the same lock as cancel(), so a cancelled job is never revived
+                if job.done or job.cancel_requested:
+                    continue
+                job.state = "en_proceso"
+                job.started = time.time()
+                job.changed.notify_all()
+            with self._lock:
+                self._running += 1
+
+            doc = None
+            recorder = None
+            if self.history is not None:
+                # Hash now: uploaded files are deleted as soon as the job finishes
+                recorder = HistoryRecorder(job.path, "servicio", self.pipeline.LLM_MODEL if job.llm else None,
+                                           doc_hash=file_hash(job.path))
+            try:
+                if HAS_WIN32 and not job.path.endswith(FIXTURE_SUFFIX) and word is None:
+                    word = start_word()
+                writer = _JobWriter(job) if recorder is None else MultiWriter([_JobWriter(job), recorder])
+                with TRACER.capture() as spans:
+                    doc = self.pipeline.Document(job.path, backend=open_backend(job.path, word))
+                    doc.load()
+                    doc.write_report(writer, include_llm=job.llm,
+                                     doi_index_path=self._doi_index, check_links=self.check_links)
+                job.stages = TRACER.totals(spans)
+                with job.changed:
+                    self._finish(job, "terminado")
+            except JobCancelled:
+                with job.changed:
+                    self._finish(job, "cancelado")
+            except Exception as e:
+                if word is not None:
+                    # A failed COM call may leave Word unusable; start a fresh one next time
+                    try:
+                        word.Quit()
+                    except Exception:
+                        pass
+                    word = None
+                with job.changed:
+                    self._finish(job, "fallido", f"{type(e).__name__}: {e}")
+            finally:
+                if doc is not None:
+                    doc.close()
+                with self._lock:
+                    self._running -= 1
+
+            self.stats.record("espera", job.started - job.submitted)
+            self.stats.record("total", job.finished - job.started)
+            for stage in job.stages:
+                self.stats.record(stage["etapa"], stage["segundos"])
+            if recorder is not None and job.state != "cancelado":
+                self._record_history(job, recorder, doc.rule_run if doc is not None else None)
+
+        if word is not None:
+            word.Quit()
+
+
+# ============================================================
+# HTTP API
+# ============================================================
+
+def make_handler(service: ValidationService):
+    """
+    Routes:
+        GET    /estado                    queue depth, workers, stage latencies
+        POST   /trabajos                  JSON {"ruta", "prioridad", "llm"} or the raw
+                                          .docx body with ?nombre=...&prioridad=...&llm=0
+        GET    /trabajos/<id>             state; structured sections once finished
+        GET    /trabajos/<id>/reporte     text report
+        GET    /trabajos/<id>/eventos     JSON Lines stream, one line per section
+        DELETE /trabajos/<id>             cancel
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "SilvinaServicio/1.0"
+
+        def _json(self, status: int, payload: Any):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            self._json(status, {"error": message})
+
+        def _job(self, parts) -> Optional[Job]:
+            job = service.get(parts[1]) if len(parts) > 1 else None
+            if job is None:
+                self._error(404, "Trabajo no encontrado")
+            return job
+
+        def do_GET(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            if parts == ["estado"]:
+                return self._json(200, service.status())
+            if parts[0] != "trabajos":
+                return self._error(404, "Ruta desconocida")
+            job = self._job(parts)
+            if job is None:
+                return
+            if len(parts) == 2:
+                info = job.summary()
+                if job.done:
+                    info["resultado"] = job.sections
+                return self._json(200, info)
+            if parts[2] == "reporte":
+                if job.state != "terminado":
+                    return self._error(409, f"Trabajo {job.state}")
+                body = job.report.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            if parts[2] == "eventos":
+                return self._stream(job)
+            self._error(404, "Ruta desconocida")
+
+        def _stream(self, job: Job):
+            # No Content-Length: the body ends when the connection closes
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.end_headers()
+            sent = 0
+            try:
+                while True:
+                    with job.changed:
+                        while sent == len(job.sections) and not job.done:
+                            job.changed.wait(timeout=30)
+                        pending = job.sections[sent:]
+                        done = job.done
+                    for section in pending:
+                        line = json.dumps({"evento": "seccion", **section}, ensure_ascii=False, default=str)
+                        self.wfile.write(line.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                    sent += len(pending)
+                    if done and sent == len(job.sections):
+                        end = json.dumps({"evento": "fin", **job.summary()}, ensure_ascii=False)
+                        self.wfile.write(end.encode("utf-8") + b"\n")
+                        return
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/trabajos":
+                return self._error(404, "Ruta desconocida")
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            data = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                try:
+                    request = json.loads(data or b"{}")
+                except json.JSONDecodeError:
+                    return self._error(400, "JSON inválido")
+                if not isinstance(request, dict):
+                    return self._error(400, "JSON inválido: se esperaba un objeto con 'ruta'")
+                path, uploaded = request.get("ruta", ""), False
+                if not isinstance(path, str) or not os.path.isfile(path):
+                    return self._error(400, f"Archivo no encontrado: {path}")
+            else:
+                request = params
+                name = params.get("nombre", "manuscrito.docx")
+                if not data:
+                    return self._error(400, "Cuerpo vacío: enviar el .docx o JSON con 'ruta'")
+                path, uploaded = service.save_upload(name, data), True
+
+            if not path.lower().endswith((".docx", FIXTURE_SUFFIX)):
+                return self._error(400, "Solo se aceptan .docx o fixtures grabados")
+            llm = request.get("llm")
+            if isinstance(llm, str):
+                llm = llm not in ("0", "no", "false")
+            try:
+                job = service.submit(path, request.get("prioridad", "normal"), llm, uploaded)
+            except ValueError as e:
+                return self._error(400, str(e))
+            except queue.Full:
+                if uploaded:
+                    os.remove(path)
+                return self._error(503, "Cola llena, reintentar más tarde")
+            self._json(202, job.summary())
+
+        def do_DELETE(self):
+            parts = urlparse(self.path).path.strip("/").split("/")
+            if parts[0] != "trabajos" or len(parts) != 2:
+                return self._error(404, "Ruta desconocida")
+            job = service.cancel(parts[1])
+            if job is None:
+                return self._error(404, "Trabajo no encontrado")
+            self._json(200, job.summary())
+
+    return Handler
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options):
+    service = ValidationService(**options)
+    service.start()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    print(f"✓ Servicio SILVINA en http://{host}:{port} ({service.workers} trabajadores)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Deteniendo servicio...")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+def submit_and_stream(url: str, path: str, priority: str = "normal", llm: bool = True):
+    """Upload a manuscript and print the report sections as the service completes them."""
+    with open(path, "rb") as f:
+        data = f.read()
+    query = f"nombre={quote(os.path.basename(path))}&prioridad={priority}&llm={int(llm)}"
+    request = urllib.request.Request(f"{url}/trabajos?{query}", data=data, method="POST",
+                                     headers={"Content-Type": "application/octet-stream"})
+    with urllib.request.urlopen(request) as response:
+        job = json.load(response)
+    print(f"✓ Trabajo {job['id']} en cola ({priority})")
+
+    with urllib.request.urlopen(f"{url}/trabajos/{job['id']}/eventos") as response:
+        for line in response:
+            event = json.loads(line)
+            if event["evento"] == "seccion":
+                print(f"\n{event['titulo']}")
+                print("\n".join(event["lineas"]))
+            else:
+                print(f"\n✓ {event['estado']} en {event.get('duracion_s', 0):.1f} s")
+                return event
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SILVINA - Servicio de validación")
+    sub = parser.add_subparsers(dest="comando", metavar="comando")
+
+    def add(name, help_text):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--host", default=DEFAULT_HOST)
+        p.add_argument("--puerto", type=int, default=DEFAULT_PORT)
+        return p
+
+    p = add("servir", "iniciar el servicio (comando por defecto)")
+    p.add_argument("--trabajadores", type=int, default=DEFAULT_WORKERS)
+    p.add_argument("--cola", type=int, default=DEFAULT_QUEUE, help="trabajos en espera antes de responder 503")
+    p.add_argument("--indice-doi", help="índice DOI local (doi_index.py build)")
+    p.add_argument("--enlaces", action="store_true", help="verificar enlaces (requiere red)")
+    p.add_argument("--sin-llm", action="store_true")
+    p.add_argument("--historial", help="base del historial de corridas")
+    p.add_argument("--sin-historial", action="store_true", help="no registrar las corridas en el historial")
+    p = add("enviar", "enviar un documento y mostrar el reporte a medida que avanza")
+    p.add_argument("documento")
+    p.add_argument("--prioridad", choices=PRIORITIES, default="interactiva")
+    p.add_argument("--sin-llm", action="store_true")
+    add("estado", "estado del servicio en JSON")
+    args = parser.parse_args()
+    if args.comando is None:
+        args = parser.parse_args(["servir"])
+
+    if args.comando == "servir":
+        serve(args.host, args.puerto, workers=args.trabajadores, max_queue=args.cola,
+              doi_index_path=args.indice_doi, check_links=args.enlaces, llm=not args.sin_llm,
+              history=not args.sin_historial, history_path=args.historial)
+    elif args.comando == "enviar":
+        submit_and_stream(f"http://{args.host}:{args.puerto}", args.documento, args.prioridad, not args.sin_llm)
+    else:
+        with urllib.request.urlopen(f"http://{args.host}:{args.puerto}/estado") as response:
+            print(json.dumps(json.load(response), ensure_ascii=False, indent=2))
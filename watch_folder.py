@@ -0,0 +1,348 @@
+# watch_folder.py
+"""
+SILVINA Editorial Assistant - Watch-Folder Intake
+Watches a shared intake directory (inotify on Linux, polling elsewhere),
+debounces partial writes, skips manuscripts whose content is unchanged
+and writes the report and JSON results next to each one
+Universidad de la Defensa Nacional
+"""
+
+from typing import Dict, List, Set, Tuple
+import ctypes
+import ctypes.util
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+import zipfile
+
+from silvina.documents import content_hash
+from validation_service import Job, ValidationService
+
+
+DEFAULT_DEBOUNCE = 2.0   # seconds without events before a file is considered complete
+STATE_FILE = ".silvina_intake.json"
+REPORT_SUFFIX = ".silvina.txt"
+RESULT_SUFFIX = ".silvina.json"
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def is_manuscript(name: str) -> bool:
+    """.docx files, excluding Word's '~$' lock files and hidden temporaries."""
+    return name.lower().endswith(".docx") and not name.startswith(("~$", "."))
+
+
+# ============================================================
+# WATCHERS
+# ============================================================
+
+class InotifyWatcher:
+    """Kernel change notifications for one directory through libc (Linux)."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+    def __init__(self, directory: str):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falló: {directory}")
+        self.directory = directory
+
+    def changes(self, timeout: float) -> Tuple[Set[str], bool]:
+        """(names with events, overflowed) — on overflow the caller rescans."""
+        names: Set[str] = set()
+        overflow = False
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return names, overflow
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                if length:
+                    names.add(os.fsdecode(buffer[offset:offset + length].rstrip(b"\0")))
+                offset += length
+        return names, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback: compares (size, mtime) of every file between scans."""
+
+    def __init__(self, directory: str, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self.seen = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, float]]:
+        state = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    state[entry.name] = (stat.st_size, stat.st_mtime)
+        return state
+
+    def changes(self, timeout: float) -> Tuple[Set[str], bool]:
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        names = {name for name, sig in current.items() if self.seen.get(name) != sig}
+        self.seen = current
+        return names, False
+
+    def close(self):
+        pass
+
+
+def make_watcher(directory: str):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify no disponible ({e}); se usa sondeo")
+    return PollingWatcher(directory)
+
+
+# ============================================================
+# INTAKE
+# ============================================================
+
+class IntakeFolder:
+    """
+    Feeds manuscripts from a directory into a ValidationService.
+
+    A file is submitted once it has been quiet for `debounce` seconds and
+    opens as a complete ZIP package; its SHA-256 is compared with the
+    last processed version so unchanged files are never re-run. When the
+    service queue is full, ready files wait here and are fed as slots free.
+    """
+
+    def __init__(self, directory: str, service: ValidationService,
+                 debounce: float = DEFAULT_DEBOUNCE, priority: str = "lote"):
+        self.directory = os.path.abspath(directory)
+        self.service = service
+        self.debounce = debounce
+        self.priority = priority
+        self.state_path = os.path.join(self.directory, STATE_FILE)
+        self.processed: Dict[str, str] = self._load_state()  # name -> hash
+        self.pending: Dict[str, float] = {}                  # name -> last event time
+        self.ready: List[Tuple[str, str]] = []               # (name, hash) waiting for a queue slot
+        self.in_flight: Dict[str, str] = {}                  # name -> hash being processed
+        self.completed = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _load_state(self) -> Dict[str, str]:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        """Must be called holding self._lock."""
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.processed, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_path)
+
+    # --- Event handling ---
+
+    def _touch(self, names, now: float):
+        for name in names:
+            if is_manuscript(name):
+                self.pending[name] = now
+
+    def _settle(self, now: float):
+        """Move quiet, complete and changed files from pending to ready."""
+        for name, last in list(self.pending.items()):
+            if now - last < self.debounce:
+                continue
+            del self.pending[name]
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            if not zipfile.is_zipfile(path):
+                self.pending[name] = now  # still being copied; look again later
+                continue
+            digest = content_hash(path)
+            with self._lock:
+                if self.processed.get(name) == digest or self.in_flight.get(name) == digest:
+                    self.skipped += 1
+                    continue
+            self.ready = [(n, h) for n, h in self.ready if n != name]
+            self.ready.append((name, digest))
+
+    def _feed(self):
+        while self.ready:
+            name, digest = self.ready[0]
+            path = os.path.join(self.directory, name)
+            try:
+                self.service.submit(path, self.priority,
+                                    on_finish=lambda job, n=name, h=digest: self._finished(job, n, h))
+            except queue.Full:
+                return
+            self.ready.pop(0)
+            with self._lock:
+                self.in_flight[name] = digest
+
+    def _finished(self, job: Job, name: str, digest: str):
+        """Write results next to the manuscript (atomically) and remember its hash."""
+        stem = os.path.join(self.directory, name[:-len(".docx")])
+        if job.state == "terminado":
+            _write_atomic(stem + REPORT_SUFFIX, job.report)
+        result = dict(job.summary(), resultado=job.sections)
+        _write_atomic(stem + RESULT_SUFFIX, json.dumps(result, ensure_ascii=False, indent=2, default=str))
+        with self._lock:
+            if self.in_flight.get(name) == digest:
+                del self.in_flight[name]
+            if job.state != "cancelado":
+                self.processed[name] = digest
+                self._save_state()
+            self.completed += 1
+
+    # --- Loop ---
+
+    def run(self, poll: float = 0.25):
+        """Process existing files, then watch until stop() is called."""
+        watcher = make_watcher(self.directory)
+        try:
+            self._touch(os.listdir(self.directory), time.monotonic() - self.debounce)
+            while not self._stop.is_set():
+                names, overflow = watcher.changes(poll)
+                now = time.monotonic()
+                if overflow:
+                    names |= set(os.listdir(self.directory))
+                self._touch(names, now)
+                self._settle(now)
+                self._feed()
+        finally:
+            watcher.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not (self.pending or self.ready or self.in_flight)
+
+
+def _write_atomic(path: str, text: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def run_benchmark(n_files: int = 100, workers: int = 2):
+    """Drop `n_files` manuscripts at once (written in two chunks) and time the intake."""
+    import contextlib
+    import tempfile
+    from docx_io import write_docx
+    from manuscript_generator import ManuscriptSpec, generate_manuscript
+    from silvina import documents
+
+    print("SILVINA - Carpeta de Entrada (Benchmark)")
+    print("=" * 60)
+    user_cache = documents.CACHE_DIR
+    with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as intake:
+        documents.CACHE_DIR = os.path.join(source, "cache")  # keep the user's cache and history clean
+        for i in range(n_files):
+            paragraphs, _ = generate_manuscript(ManuscriptSpec(body_chars=20_000, n_references=15, seed=i))
+            write_docx(os.path.join(source, f"envio_{i:03d}.docx"), paragraphs)
+
+        def drop_all():
+            for name in sorted(os.listdir(source)):
+                with open(os.path.join(source, name), "rb") as f:
+                    data = f.read()
+                with open(os.path.join(intake, name), "wb") as f:  # a slow copy: two chunks
+                    f.write(data[:len(data) // 2])
+                    f.flush()
+                    f.write(data[len(data) // 2:])
+
+        service = ValidationService(workers=workers, max_queue=16, llm=False, history=False)
+        service.start()
+        folder = IntakeFolder(intake, service, debounce=0.5)
+        thread = threading.Thread(target=folder.run, daemon=True)
+        thread.start()
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            drop_all()
+            while folder.completed < n_files:
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - start
+
+            # Same bytes again: every file must be skipped by hash
+            drop_all()
+            time.sleep(folder.debounce + 1.0)
+        print(f"  {n_files} manuscritos: {elapsed:.1f} s ({n_files / elapsed:.1f}/s, {workers} trabajadores)")
+        print(f"  Reescritos sin cambios: {folder.skipped} omitidos, {folder.completed - n_files} reprocesados")
+        latencies = service.status()["latencias"]
+        print(f"  Espera en cola p50/p95: {latencies['espera']['p50_ms']:.0f}/{latencies['espera']['p95_ms']:.0f} ms")
+
+        folder.stop()
+        thread.join()
+        service.stop()
+        documents.CACHE_DIR = user_cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SILVINA - Carpeta de recepción vigilada")
+    parser.add_argument("carpeta", nargs="?", help="carpeta compartida donde se depositan los manuscritos")
+    parser.add_argument("--trabajadores", type=int, default=2, help="validaciones simultáneas (por defecto 2)")
+    parser.add_argument("--espera", type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"segundos sin cambios antes de procesar un archivo (por defecto {DEFAULT_DEBOUNCE})")
+    parser.add_argument("--sin-llm", action="store_true")
+    parser.add_argument("--bench", nargs="?", type=int, const=100, metavar="ARCHIVOS",
+                        help="benchmark de recepción con ARCHIVOS manuscritos (por defecto 100)")
+    args = parser.parse_args()
+
+    if args.bench is not None:
+        run_benchmark(args.bench)
+    elif args.carpeta:
+        service = ValidationService(workers=args.trabajadores, llm=not args.sin_llm)
+        service.start()
+        folder = IntakeFolder(args.carpeta, service, args.espera)
+        print(f"👀 Vigilando {folder.directory} (Ctrl+C para salir)")
+        try:
+            folder.run()
+        except KeyboardInterrupt:
+            print("\n✓ Deteniendo...")
+        finally:
+            service.stop()
+    else:
+        parser.print_help()